@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import os
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'time_tracking.middleware.ServerTimingMiddleware',
+    'time_tracking.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,6 +86,98 @@ DATABASES = {
     }
 }
 
+# Tryb produkcyjny SQLite (SQLITE_PRODUCTION_MODE=1 w .env):
+# - WAL – odczyty raportów nie blokują zapisów z tabletów,
+# - transakcje BEGIN IMMEDIATE + busy timeout – piszący czekają w kolejce zamiast "database is locked",
+# - pragmy ustawiane na każdym nowym połączeniu.
+SQLITE_PRODUCTION_MODE = os.getenv('SQLITE_PRODUCTION_MODE', '0') == '1'
+
+if SQLITE_PRODUCTION_MODE:
+    DATABASES['default']['OPTIONS'] = {
+        'timeout': 30,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA busy_timeout=30000;'
+            'PRAGMA cache_size=-65536;'
+            'PRAGMA temp_store=MEMORY;'
+            'PRAGMA mmap_size=268435456;'
+        ),
+    }
+
+# Jeden (procesowy) pas zapisu zdarzeń – wątki czekają na lock zamiast walczyć o blokadę bazy
+SQLITE_WRITE_LANE = SQLITE_PRODUCTION_MODE
+
+# Ile razy register_event liczy stan od nowa po konflikcie numeru sekwencji
+# (równoległy skan tego samego pracownika z innego workera)
+EVENT_REGISTER_MAX_ATTEMPTS = 5
+
+# Write-behind zdarzeń (EVENT_WRITE_BEHIND=1 w .env): skan potwierdzany po zapisie w dzienniku,
+# do bazy trafia paczką co EVENT_FLUSH_INTERVAL_MS lub po EVENT_FLUSH_MAX_EVENTS zdarzeniach.
+# Bufor jest procesowy – dziennik blokowany na wyłączność, drugi proces przyjmujący skany
+# dostaje ImproperlyConfigured (uruchamiać z jednym workerem).
+EVENT_WRITE_BEHIND = os.getenv('EVENT_WRITE_BEHIND', '0') == '1'
+EVENT_JOURNAL_PATH = BASE_DIR / 'event-journal.jsonl'
+EVENT_FLUSH_INTERVAL_MS = 200
+EVENT_FLUSH_MAX_EVENTS = 100
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Dni raportów czasu pracy (time_tracking.services.report_cache)
+    # ~2000 pracowników x 100 dni; najdawniej używane wpisy są usuwane po przekroczeniu limitu.
+    # Cache jest procesowy: zmianę zapisaną przez inny worker ten proces zobaczy najpóźniej
+    # po TIMEOUT – stąd krótki czas życia (powtarzane raporty i tak trafiają w cache)
+    'attendance': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'attendance-days',
+        'TIMEOUT': 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 200_000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+REPORT_CACHE_ALIAS = 'attendance'
+
+# Raporty dla wielu pracowników liczone w puli procesów (REPORT_WORKERS=16 w .env);
+# 1 = zawsze szeregowo. Mniejsze raporty niż REPORT_PARALLEL_MIN_EMPLOYEES pracowników
+# liczone są szeregowo. Procesy startowane metodą spawn (bezpieczną przy wątkach serwera).
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', '1'))
+REPORT_PARALLEL_MIN_EMPLOYEES = 200
+REPORT_WORKER_START_METHOD = 'spawn'
+
+# Raporty w tle (/api/admin/reports/jobs/): lokalna pula wątków procesu, gotowe pliki
+# w REPORT_JOB_DIR. Zadania procesu, który nie żyje (restart), są przerywane przy starcie puli
+# i przy kolejnym zleceniu; liczone bez postępu przez REPORT_JOB_STALE_SECONDS także.
+# Stare zadania i pliki: manage.py purge_report_jobs
+REPORT_JOB_DIR = BASE_DIR / 'report-jobs'
+REPORT_JOB_WORKERS = 2
+REPORT_JOB_STALE_SECONDS = 15 * 60
+REPORT_JOB_TTL_HOURS = 24
+
+# Procesowy cache pracowników po qr_token i urządzeń po device_id
+# (time_tracking.services.lookup_cache); nieznane tokeny pamiętane krócej
+LOOKUP_CACHE_SIZE = 5000
+LOOKUP_CACHE_TTL_SECONDS = 300
+LOOKUP_CACHE_NEGATIVE_TTL_SECONDS = 10
+
+# Panel live (SSE): co ile sekund sprawdzać zdarzenia zapisane przez inne procesy
+LIVE_FEED_POLL_SECONDS = 2
+
+# Paczki zdarzeń z tabletów (/api/tablet/events/batch/)
+TABLET_BATCH_MAX_EVENTS = 500
+TABLET_BATCH_CLOCK_SKEW_SECONDS = 120
+
+# Klucze idempotencji ponowień z tabletów (czyszczenie: manage.py purge_idempotency_keys)
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -122,6 +217,29 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Archiwum zdarzeń: zamknięte miesiące przenoszone z TimeEvent do plików segmentów
+# (komenda archive_events); w tabeli zostaje bieżący i poprzedni miesiąc
+EVENT_ARCHIVE_DIR = BASE_DIR / 'archive'
+EVENT_ARCHIVE_KEEP_MONTHS = 2
+
+# Budżety zapytań SQL widoków (query_budget): "warn" – ostrzeżenie w logu,
+# "raise" – wyjątek (testy), "off" – bez pomiaru. Domyślnie "warn" przy DEBUG.
+QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'warn' if DEBUG else 'off')
+
+# Metryki procesu (histogramy i liczniki gorących ścieżek) pod /api/metrics/ w formacie Prometheusa;
+# endpoint dostępny tylko bezpośrednio z adresów METRICS_ALLOWED_IPS (bez nagłówków reverse proxy),
+# a po ustawieniu METRICS_TOKEN – z dowolnego adresu z nagłówkiem "Authorization: Bearer <token>"
+METRICS_ENABLED = True
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Nagłówek Server-Timing (db / compute / render / total) w odpowiedziach
+SERVER_TIMING_ENABLED = True
+
+# Listy API stronicowane po kluczu (grafik, zdarzenia) – domyślny i maksymalny ?limit=
+LISTING_PAGE_SIZE = 100
+LISTING_MAX_PAGE_SIZE = 1000
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from time_tracking.models import WorkSchedule, TimeEvent
+from time_tracking.models import WorkSchedule, ShiftPattern, ShiftPatternDay, TimeEvent, DailyAttendance
 
 
 @admin.register(WorkSchedule)
@@ -19,6 +19,31 @@ class WorkScheduleAdmin(admin.ModelAdmin):
     ordering = ("date",)
 
 
+class ShiftPatternDayInline(admin.TabularInline):
+    model = ShiftPatternDay
+    extra = 0
+    ordering = ("day_index",)
+
+
+@admin.register(ShiftPattern)
+class ShiftPatternAdmin(admin.ModelAdmin):
+    list_display = (
+        "employee",
+        "name",
+        "valid_from",
+        "valid_to",
+        "cycle_days",
+    )
+    list_filter = ("cycle_days",)
+    search_fields = (
+        "employee__first_name",
+        "employee__last_name",
+        "name",
+    )
+    ordering = ("employee", "valid_from")
+    inlines = [ShiftPatternDayInline]
+
+
 @admin.register(TimeEvent)
 class TimeEventAdmin(admin.ModelAdmin):
     list_display = (
@@ -40,3 +65,24 @@ class TimeEventAdmin(admin.ModelAdmin):
         "device__device_id",
     )
     ordering = ("-timestamp",)
+
+
+@admin.register(DailyAttendance)
+class DailyAttendanceAdmin(admin.ModelAdmin):
+    list_display = (
+        "employee",
+        "date",
+        "day_type",
+        "planned_minutes",
+        "worked_minutes",
+        "break_minutes",
+        "absence",
+    )
+    list_filter = ("day_type", "absence", "date")
+    search_fields = (
+        "employee__first_name",
+        "employee__last_name",
+    )
+    ordering = ("-date",)
+    # wiersze utrzymywane automatycznie – tylko podgląd
+    readonly_fields = [f.name for f in DailyAttendance._meta.fields]
@@ -0,0 +1,113 @@
+"""
+Natywne widoki async (ASGI) dla tabletów – te same odpowiedzi co TabletEventView
+i TabletStatusView, bez blokowania wątku workera na czas odczytu z bazy.
+
+DRF nie obsługuje widoków async, więc to zwykłe widoki Django z JsonResponse.
+Odczyty idą przez async ORM; zapis zdarzenia (transakcja, write lane, sygnały)
+pozostaje synchroniczny i wykonywany jest w wątku przez sync_to_async.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from time_tracking.api.views import tablet_status_payload
+from time_tracking.services.event_service import register_event
+from time_tracking.services.idempotency import (
+    EVENT_ENDPOINT,
+    InvalidIdempotencyKey,
+    aget_stored_response,
+    execute_once,
+    idempotency_scope,
+    replay,
+    request_hash,
+)
+from time_tracking.services.lookup_cache import aget_employee_by_qr
+from time_tracking.services.tablet_state import aget_employee_state
+
+
+@require_GET
+async def tablet_status_async_view(request):
+    qr = request.GET.get("qr")
+    device_id = request.GET.get("device")
+
+    if not qr:
+        return JsonResponse({"detail": "Missing qr"}, status=400)
+    if not device_id:
+        return JsonResponse({"detail": "Missing device"}, status=400)
+
+    employee = await aget_employee_by_qr(qr)
+    if employee is None:
+        return JsonResponse({"detail": "Employee not found"}, status=404)
+
+    st = await aget_employee_state(employee)
+    return JsonResponse(tablet_status_payload(employee, st))
+
+
+def _request_data(request):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+def _register(employee, event_type, device_id, scope, body_hash):
+    """
+    Zapis zdarzenia (i odpowiedzi pod kluczem idempotencji) – jak IdempotentPostMixin.
+    Zwraca (status, body, replayed).
+    """
+    def handler():
+        event, message = register_event(employee=employee, event_type=event_type, device_id=device_id)
+        # ważne: 200 OK dla komunikatów informacyjnych
+        return 201 if event else 200, {"message": message}
+
+    result, stored = execute_once(scope, body_hash, handler, lambda r: r)
+    if stored is not None:
+        return replay(stored, body_hash)
+    return (*result, False)
+
+
+def _response(response_status, body, replayed):
+    response = JsonResponse(body, status=response_status)
+    if replayed:
+        response["Idempotent-Replayed"] = "true"
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def tablet_event_async_view(request):
+    data = _request_data(request)
+    if data is None:
+        return JsonResponse({"message": "Brak danych"}, status=400)
+
+    qr = data.get("qr")
+    event_type = data.get("event_type")
+    device_id = data.get("device_id")
+
+    key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+    try:
+        scope = idempotency_scope(EVENT_ENDPOINT, key, device_id)
+    except InvalidIdempotencyKey as exc:
+        return JsonResponse({"message": str(exc)}, status=400)
+
+    body_hash = None
+    if scope:
+        body_hash = request_hash(data)
+        stored = await aget_stored_response(*scope)
+        if stored:
+            return _response(*replay(stored, body_hash))
+
+    if not qr or not event_type or not device_id:
+        return JsonResponse({"message": "Brak danych"}, status=400)
+
+    employee = await aget_employee_by_qr(qr)
+    if employee is None:
+        return JsonResponse({"message": "Nie znaleziono pracownika"}, status=404)
+
+    return _response(*await sync_to_async(_register)(employee, event_type, device_id, scope, body_hash))
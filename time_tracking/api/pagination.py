@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def _get_page_size(request):
+    default = int(getattr(settings, "LISTING_PAGE_SIZE", 100))
+    maximum = int(getattr(settings, "LISTING_MAX_PAGE_SIZE", 1000))
+
+    raw = request.query_params.get("limit")
+    if not raw:
+        return default
+    try:
+        size = int(raw)
+    except ValueError:
+        raise ValidationError({"limit": "Must be an integer."})
+    return max(1, min(size, maximum))
+
+
+def _encode_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(value, kind):
+    if kind == "date":
+        return parse_date(value)
+    if kind == "datetime":
+        return parse_datetime(value)
+    return int(value)
+
+
+class KeysetPagination:
+    """
+    Stronicowanie po kluczu (keyset / seek) – kolejna strona to WHERE (klucz) > (ostatni klucz)
+    z limitem, a nie OFFSET. Koszt strony nie rośnie z jej numerem, a wstawiane w trakcie
+    wiersze nie przesuwają kolejnych stron.
+
+    fields: pary (pole, rodzaj) rosnącego, unikalnego klucza, np. (("date", "date"), ("id", "int")).
+    Kursor to base64 z JSON-em wartości klucza ostatniego wiersza strony.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def _decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            decoded = [_decode_value(v, kind) for v, (_, kind) in zip(values, self.fields, strict=True)]
+        except (ValueError, TypeError):
+            decoded = None
+        if decoded is None or None in decoded:
+            raise ValidationError({"cursor": "Invalid cursor."})
+        return decoded
+
+    def _encode_cursor(self, row):
+        values = [_encode_value(row[name]) for name, _ in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def _after(self, values):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condition = Q()
+        equal = {}
+        for (name, _), value in zip(self.fields, values):
+            condition |= Q(**equal, **{f"{name}__gt": value})
+            equal[name] = value
+        return condition
+
+    def paginate(self, request, qs):
+        """
+        qs: queryset .values(...) zawierający pola klucza. Zwraca (wiersze, next_url).
+        """
+        size = _get_page_size(request)
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            qs = qs.filter(self._after(self._decode_cursor(cursor)))
+
+        rows = list(qs.order_by(*(name for name, _ in self.fields))[:size + 1])
+        if len(rows) <= size:
+            return rows, None
+
+        rows = rows[:size]
+        params = request.query_params.copy()
+        params["cursor"] = self._encode_cursor(rows[-1])
+        return rows, request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
@@ -2,7 +2,6 @@ from rest_framework import serializers
 
 from core.models import Employee, Device
 from time_tracking.models import TimeEvent
-from time_tracking.models import WorkSchedule
 
 
 class TabletEventSerializer(serializers.Serializer):
@@ -29,18 +28,3 @@ class TabletEventSerializer(serializers.Serializer):
         attrs["employee"] = attrs.pop("employee_qr_token")
         attrs["device"] = attrs.pop("device_id")
         return attrs
-
-
-class WorkScheduleSerializer(serializers.ModelSerializer):
-    employee = serializers.StringRelatedField()
-
-    class Meta:
-        model = WorkSchedule
-        fields = [
-            "id",
-            "employee",
-            "date",
-            "day_type",
-            "planned_start",
-            "planned_end",
-        ]
@@ -1,19 +1,44 @@
 from django.urls import path
+from time_tracking.api.async_views import tablet_event_async_view, tablet_status_async_view
 from time_tracking.api.views import (
     TabletEventView,
+    TabletEventBatchView,
     AttendanceReportView,
     AttendanceReportCSVView,
     WorkScheduleListView,
+    EffectiveScheduleListView,
+    ScheduleImportView,
+    TimeEventListView,
     TabletStatusView,
+    ReportCacheStatsView,
+    ReportJobView,
+    ReportJobDetailView,
+    ReportJobDownloadView,
+    metrics_view,
 )
 
 urlpatterns = [
     # TABLET – API
     path("tablet/events/", TabletEventView.as_view(), name="tablet-events"),
+    path("tablet/events/batch/", TabletEventBatchView.as_view(), name="tablet-events-batch"),
     path("tablet/status/", TabletStatusView.as_view(), name="tablet-status"),
 
+    # TABLET – API async (serwer ASGI)
+    path("tablet/async/events/", tablet_event_async_view, name="tablet-events-async"),
+    path("tablet/async/status/", tablet_status_async_view, name="tablet-status-async"),
+
     # ADMIN – API
     path("admin/schedules/", WorkScheduleListView.as_view(), name="work-schedules"),
+    path("admin/schedules/effective/", EffectiveScheduleListView.as_view(), name="effective-schedules"),
+    path("admin/schedules/import/", ScheduleImportView.as_view(), name="schedule-import"),
+    path("admin/events/", TimeEventListView.as_view(), name="time-events"),
     path("admin/reports/attendance/", AttendanceReportView.as_view(), name="attendance-report"),
     path("admin/reports/attendance.csv/", AttendanceReportCSVView.as_view(), name="attendance-report-csv"),
+    path("admin/reports/jobs/", ReportJobView.as_view(), name="report-jobs"),
+    path("admin/reports/jobs/<uuid:job_id>/", ReportJobDetailView.as_view(), name="report-job"),
+    path("admin/reports/jobs/<uuid:job_id>/download/", ReportJobDownloadView.as_view(), name="report-job-download"),
+    path("admin/reports/cache-stats/", ReportCacheStatsView.as_view(), name="attendance-report-cache-stats"),
+
+    # MONITORING – metryki procesu (Prometheus)
+    path("metrics/", metrics_view, name="metrics"),
 ]
@@ -1,25 +1,87 @@
-from datetime import date
-
-from django.http import HttpResponse
+import hmac
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET
 from rest_framework import status
-from rest_framework.generics import ListAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from core.models import Employee
-from time_tracking.api.serializers import WorkScheduleSerializer
-from time_tracking.models import WorkSchedule
-from time_tracking.services.event_service import register_event
-from time_tracking.services.report_csv import build_attendance_csv
+from time_tracking.api.pagination import KeysetPagination
+from time_tracking.models import ReportJob, TimeEvent, WorkSchedule
+from time_tracking.services.event_service import register_event, register_events_batch
+from time_tracking.services.idempotency import (
+    BATCH_ENDPOINT,
+    EVENT_ENDPOINT,
+    InvalidIdempotencyKey,
+    execute_once,
+    get_stored_response,
+    idempotency_scope,
+    replay,
+    request_hash,
+)
+from time_tracking.services.lookup_cache import get_employee_by_qr
+from time_tracking.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from time_tracking.services.query_budget import QueryBudget
+from time_tracking.services.report_cache import get_report_cache_stats
+from time_tracking.services.report_csv import iter_attendance_csv
+from time_tracking.services.report_jobs import artifact_path, submit_report_job
 from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.schedule_import import detect_format, import_schedules, iter_rows
+from time_tracking.services.schedule_resolver import load_effective_schedules
 from time_tracking.services.tablet_state import get_employee_state
 
 
-class TabletEventView(APIView):
+class IdempotentPostMixin:
+    """
+    Klucz idempotencji (nagłówek Idempotency-Key lub pole idempotency_key) dla POST.
+
+    Klucz obowiązuje w obrębie endpointu (idempotency_endpoint) i urządzenia (device_id).
+    Ponowienie z tym samym kluczem i tą samą treścią dostaje zapisaną odpowiedź – jedno
+    zapytanie po indeksie, bez ponownej walidacji i zapisu; z inną treścią – 422. Zapis
+    odpowiedzi idzie w tej samej transakcji co zdarzenie.
+    """
+
+    idempotency_endpoint = None
+
+    def post(self, request):
+        key = request.headers.get("Idempotency-Key") or request.data.get("idempotency_key")
+        try:
+            scope = idempotency_scope(self.idempotency_endpoint, key, request.data.get("device_id"))
+        except InvalidIdempotencyKey as exc:
+            return Response({"message": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if scope is None:
+            return self.handle_post(request)
+
+        body_hash = request_hash(request.data)
+        stored = get_stored_response(*scope)
+        if stored is None:
+            response, stored = execute_once(
+                scope, body_hash, lambda: self.handle_post(request), lambda r: (r.status_code, r.data)
+            )
+            if stored is None:
+                return response
+
+        response_status, body, replayed = replay(stored, body_hash)
+        response = Response(body, status=response_status)
+        if replayed:
+            response["Idempotent-Replayed"] = "true"
+        return response
+
+
+class TabletEventView(IdempotentPostMixin, APIView):
     authentication_classes = []
     permission_classes = []
+    idempotency_endpoint = EVENT_ENDPOINT
+    query_budget = QueryBudget(queries=11)
 
-    def post(self, request):
+    def handle_post(self, request):
         qr = request.data.get("qr")
         event_type = request.data.get("event_type")
         device_id = request.data.get("device_id")
@@ -30,9 +92,8 @@ class TabletEventView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            employee = Employee.objects.get(qr_token=qr)
-        except Employee.DoesNotExist:
+        employee = get_employee_by_qr(qr)
+        if employee is None:
             return Response(
                 {"message": "Nie znaleziono pracownika"},
                 status=status.HTTP_404_NOT_FOUND
@@ -57,8 +118,48 @@ class TabletEventView(APIView):
         )
 
 
+class TabletEventBatchView(IdempotentPostMixin, APIView):
+    """
+    Paczka zdarzeń z tabletu (kolejka offline) – wynik per pozycja.
+    """
+    authentication_classes = []
+    permission_classes = []
+    idempotency_endpoint = BATCH_ENDPOINT
+    query_budget = QueryBudget(queries=10)
+
+    def handle_post(self, request):
+        device_id = request.data.get("device_id")
+        events = request.data.get("events")
+
+        if not device_id or not isinstance(events, list):
+            return Response(
+                {"message": "Brak danych"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results, error = register_events_batch(device_id=device_id, items=events)
+        if error:
+            return Response(
+                {"message": error},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        accepted = sum(1 for r in results if r["status"] == "accepted")
+        return Response(
+            {
+                "accepted": accepted,
+                "rejected": len(results) - accepted,
+                "results": results,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
 class AttendanceReportView(APIView):
     permission_classes = []
+    # lista pracowników + paczka pracowników (report_service.iter_report_chunks): wersje wzorców,
+    # podsumowania dni i wzorce zmian przy zimnym cache
+    query_budget = QueryBudget(queries=1, per_chunk=3)
 
     def get(self, request):
         d_from = request.query_params.get("from")
@@ -102,6 +203,9 @@ class AttendanceReportView(APIView):
 
 class AttendanceReportCSVView(APIView):
     permission_classes = []
+    # lista pracowników + paczka pracowników (report_service.iter_report_chunks): wersje wzorców,
+    # podsumowania dni i wzorce zmian przy zimnym cache
+    query_budget = QueryBudget(queries=1, per_chunk=3)
 
     def get(self, request):
         d_from = request.query_params.get("from")
@@ -133,46 +237,354 @@ class AttendanceReportCSVView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        csv_content = build_attendance_csv(
+        # strumieniowo: pierwsze linie wychodzą zanim policzymy cały raport
+        rows = iter_attendance_csv(
             date_from=date_from,
             date_to=date_to,
             employee_id=emp_id_int,
         )
 
-        response = HttpResponse(csv_content, content_type="text/csv")
+        response = StreamingHttpResponse(rows, content_type="text/csv")
         response["Content-Disposition"] = (
             f'attachment; filename="attendance_{date_from}_{date_to}.csv"'
         )
         return response
 
 
-class WorkScheduleListView(ListAPIView):
-    serializer_class = WorkScheduleSerializer
+def _report_job_payload(request, job):
+    payload = {
+        "id": str(job.id),
+        "status": job.status,
+        "format": job.format,
+        "range": {"from": str(job.date_from), "to": str(job.date_to)},
+        "employee_id": job.employee_id,
+        "progress": {"processed": job.processed, "total": job.total},
+        "error": job.error or None,
+        "download": None,
+    }
+    if job.status == ReportJob.DONE:
+        payload["download"] = request.build_absolute_uri(reverse("report-job-download", args=[job.id]))
+    return payload
+
+
+class ReportJobView(APIView):
+    """
+    Zlecenie raportu w tle: POST {from, to, employee_id?, format: json|csv} -> 202 z id zadania.
+    Identyczne zlecenie w toku dostaje to samo zadanie.
+    """
+    permission_classes = []
+
+    def post(self, request):
+        d_from = request.data.get("from")
+        d_to = request.data.get("to")
+        employee_id = request.data.get("employee_id")
+        fmt = request.data.get("format", ReportJob.JSON)
+
+        if not d_from or not d_to:
+            return Response(
+                {"error": "Fields 'from' and 'to' are required (YYYY-MM-DD)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            date_from = date.fromisoformat(d_from)
+            date_to = date.fromisoformat(d_to)
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if date_to < date_from:
+            return Response(
+                {"error": "'to' must be >= 'from'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if fmt not in (ReportJob.JSON, ReportJob.CSV):
+            return Response(
+                {"error": "format must be 'json' or 'csv'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        emp_id_int = None
+        if employee_id not in (None, ""):
+            try:
+                emp_id_int = int(employee_id)
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "employee_id must be an integer."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if emp_id_int < 1:
+                return Response(
+                    {"error": "employee_id must be a positive integer."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        job, _ = submit_report_job(fmt=fmt, date_from=date_from, date_to=date_to, employee_id=emp_id_int)
+        return Response(_report_job_payload(request, job), status=status.HTTP_202_ACCEPTED)
+
+
+class ReportJobDetailView(APIView):
+    """
+    Stan zadania: status, postęp (processed / total pracowników) i link do pliku po zakończeniu.
+    """
     permission_classes = []
 
-    def get_queryset(self):
-        qs = WorkSchedule.objects.select_related("employee").order_by("date")
+    def get(self, request, job_id):
+        job = get_object_or_404(ReportJob, id=job_id)
+        return Response(_report_job_payload(request, job), status=status.HTTP_200_OK)
 
-        employee_id = self.request.query_params.get("employee_id")
-        date = self.request.query_params.get("date")
-        date_from = self.request.query_params.get("from")
-        date_to = self.request.query_params.get("to")
+
+class ReportJobDownloadView(APIView):
+    permission_classes = []
+
+    def get(self, request, job_id):
+        job = get_object_or_404(ReportJob, id=job_id)
+        if job.status != ReportJob.DONE:
+            return Response(
+                {"error": "Report is not ready.", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        path = artifact_path(job)
+        if not path.exists():
+            return Response({"error": "Report file no longer exists."}, status=status.HTTP_410_GONE)
+
+        content_type = "text/csv" if job.format == ReportJob.CSV else "application/json"
+        return FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=f"attendance_{job.date_from}_{job.date_to}.{job.format}",
+            content_type=content_type,
+        )
+
+
+class ReportCacheStatsView(APIView):
+    permission_classes = []
+
+    def get(self, request):
+        return Response(get_report_cache_stats(), status=status.HTTP_200_OK)
+
+
+# nagłówki dokładane przez reverse proxy – za proxy na localhost REMOTE_ADDR to zawsze 127.0.0.1
+PROXY_HEADERS = ("HTTP_X_FORWARDED_FOR", "HTTP_X_REAL_IP", "HTTP_FORWARDED")
+
+
+def _metrics_allowed(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        return hmac.compare_digest(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}")
+    if any(header in request.META for header in PROXY_HEADERS):
+        return False
+    return request.META.get("REMOTE_ADDR") in getattr(settings, "METRICS_ALLOWED_IPS", ["127.0.0.1", "::1"])
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Metryki procesu w formacie tekstowym Prometheusa. Z METRICS_TOKEN – tylko z nagłówkiem
+    "Authorization: Bearer <token>"; bez niego – bezpośrednio z adresów METRICS_ALLOWED_IPS
+    (żądania przekazane przez reverse proxy są odrzucane).
+    """
+    if not _metrics_allowed(request):
+        raise Http404
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+
+def _parse_listing_filters(request):
+    """
+    Wspólne filtry list: employee_id oraz zakres from/to (YYYY-MM-DD).
+    """
+    employee_id = request.query_params.get("employee_id")
+    d_from = request.query_params.get("from")
+    d_to = request.query_params.get("to")
+
+    try:
+        employee_id = int(employee_id) if employee_id else None
+    except ValueError:
+        raise ValidationError({"employee_id": "Must be an integer."})
+
+    try:
+        date_from = date.fromisoformat(d_from) if d_from else None
+        date_to = date.fromisoformat(d_to) if d_to else None
+    except ValueError:
+        raise ValidationError({"error": "Invalid date format. Use YYYY-MM-DD."})
+
+    return employee_id, date_from, date_to
+
+
+class WorkScheduleListView(APIView):
+    """
+    Grafik pracy stronicowany po (date, id) – ?cursor= z pola "next", ?limit= rozmiar strony.
+    """
+    permission_classes = []
+    query_budget = QueryBudget(queries=2)
+    pagination = KeysetPagination((("date", "date"), ("id", "int")))
+
+    def get(self, request):
+        employee_id, date_from, date_to = _parse_listing_filters(request)
+        qs = WorkSchedule.objects.all()
 
         if employee_id:
             qs = qs.filter(employee_id=employee_id)
 
-        if date:
-            qs = qs.filter(date=date)
+        day = request.query_params.get("date")
+        if day:
+            try:
+                qs = qs.filter(date=date.fromisoformat(day))
+            except ValueError:
+                raise ValidationError({"error": "Invalid date format. Use YYYY-MM-DD."})
 
         if date_from and date_to:
             qs = qs.filter(date__gte=date_from, date__lte=date_to)
 
-        return qs
+        # values() zamiast serializera modelu – bez obiektów i StringRelatedField per wiersz
+        rows, next_url = self.pagination.paginate(request, qs.values(
+            "id", "employee_id", "employee__first_name", "employee__last_name",
+            "date", "day_type", "planned_start", "planned_end",
+        ))
+
+        return Response({
+            "next": next_url,
+            "results": [
+                {
+                    "id": row["id"],
+                    # jak Employee.__str__
+                    "employee": f"{row['employee__first_name']} {row['employee__last_name']}",
+                    "employee_id": row["employee_id"],
+                    "date": row["date"],
+                    "day_type": row["day_type"],
+                    "planned_start": row["planned_start"],
+                    "planned_end": row["planned_end"],
+                }
+                for row in rows
+            ],
+        })
+
+
+class ScheduleImportView(APIView):
+    """
+    Import grafiku: POST multipart z plikiem "file" (CSV lub JSONL), opcjonalnie
+    "format" (csv|jsonl, domyślnie z rozszerzenia) i "dry_run". Upsert po (employee, date),
+    odpowiedź z liczbą utworzonych / zaktualizowanych dni i błędami per wiersz.
+    """
+    permission_classes = []
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "Field 'file' is required (CSV or JSONL)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fmt = detect_format(upload.name, request.data.get("format"))
+        if fmt is None:
+            return Response(
+                {"error": "format must be 'csv' or 'jsonl'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+        result = import_schedules(iter_rows(upload.file, fmt), dry_run=dry_run)
+        return Response({"dry_run": dry_run, **result})
+
+
+class EffectiveScheduleListView(APIView):
+    """
+    Efektywny grafik (wyjątki WorkSchedule + wzorce zmian) dla zakresu ?from=&to=,
+    stronicowany po pracownikach (id) – ?cursor= z pola "next", ?limit= pracowników na stronę.
+    """
+    permission_classes = []
+    pagination = KeysetPagination((("id", "int"),))
+    MAX_RANGE_DAYS = 366
+
+    def get(self, request):
+        employee_id, date_from, date_to = _parse_listing_filters(request)
+        if not date_from or not date_to:
+            raise ValidationError({"error": "Query params 'from' and 'to' are required (YYYY-MM-DD)."})
+        if date_to < date_from or (date_to - date_from).days >= self.MAX_RANGE_DAYS:
+            raise ValidationError(
+                {"error": f"'to' must be >= 'from' and the range at most {self.MAX_RANGE_DAYS} days."}
+            )
+
+        qs = Employee.objects.all()
+        if employee_id:
+            qs = qs.filter(id=employee_id)
+
+        rows, next_url = self.pagination.paginate(request, qs.values("id", "first_name", "last_name"))
+        schedules = load_effective_schedules([row["id"] for row in rows], date_from, date_to)
+        days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+
+        results = []
+        for row in rows:
+            employee_days = []
+            for d in days:
+                schedule = schedules.get(row["id"], d)
+                if schedule is None:
+                    continue
+                employee_days.append({
+                    "date": d,
+                    "day_type": schedule.day_type,
+                    "planned_start": schedule.planned_start,
+                    "planned_end": schedule.planned_end,
+                    "source": "exception" if isinstance(schedule, WorkSchedule) else "pattern",
+                })
+            results.append({
+                "employee_id": row["id"],
+                "employee": f"{row['first_name']} {row['last_name']}",
+                "days": employee_days,
+            })
+
+        return Response({"next": next_url, "results": results})
+
+
+class TimeEventListView(APIView):
+    """
+    Surowe zdarzenia (np. synchronizacja z systemem płacowym) stronicowane po (timestamp, id).
+    """
+    permission_classes = []
+    pagination = KeysetPagination((("timestamp", "datetime"), ("id", "int")))
+
+    def get(self, request):
+        employee_id, date_from, date_to = _parse_listing_filters(request)
+        qs = TimeEvent.objects.all()
+
+        if employee_id:
+            qs = qs.filter(employee_id=employee_id)
+        if date_from:
+            qs = qs.filter(local_date__gte=date_from)
+        if date_to:
+            qs = qs.filter(local_date__lte=date_to)
+
+        rows, next_url = self.pagination.paginate(request, qs.values(
+            "id", "employee_id", "device__device_id", "event_type", "timestamp", "local_date", "sequence",
+        ))
+
+        return Response({
+            "next": next_url,
+            "results": [
+                {
+                    "id": row["id"],
+                    "employee_id": row["employee_id"],
+                    "device_id": row["device__device_id"],
+                    "event_type": row["event_type"],
+                    "timestamp": row["timestamp"],
+                    "local_date": row["local_date"],
+                    "sequence": row["sequence"],
+                }
+                for row in rows
+            ],
+        })
 
 
 class TabletStatusView(APIView):
     authentication_classes = []  # na MVP (potem można dodać token urządzenia)
     permission_classes = []
+    query_budget = QueryBudget(queries=2)
 
     def get(self, request):
         qr = request.query_params.get("qr")
@@ -183,30 +595,32 @@ class TabletStatusView(APIView):
         if not device_id:
             return Response({"detail": "Missing device"}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            employee = Employee.objects.get(qr_token=qr)
-        except Employee.DoesNotExist:
+        employee = get_employee_by_qr(qr)
+        if employee is None:
             return Response({"detail": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
 
         st = get_employee_state(employee)
-
-        # dostępne akcje zależnie od stanu (frontend ma tylko rysować)
-        if st.state == "OFF_DUTY":
-            actions = ["CHECK_IN"]
-        elif st.state == "WORKING":
-            actions = ["BREAK_START", "CHECK_OUT"]
-        else:  # ON_BREAK
-            actions = ["BREAK_END", "CHECK_OUT"]
-
-        return Response({
-            "employee": {
-                "id": employee.id,
-                "name": str(employee),
-            },
-            "state": st.state,
-            "started_at": st.started_at,
-            "work_minutes": st.work_minutes,
-            "last_event_type": st.last_event_type,
-            "last_action": st.last_action,
-            "actions": actions,
-        })
+        return Response(tablet_status_payload(employee, st))
+
+
+def tablet_status_payload(employee, st):
+    # dostępne akcje zależnie od stanu (frontend ma tylko rysować)
+    if st.state == "OFF_DUTY":
+        actions = ["CHECK_IN"]
+    elif st.state == "WORKING":
+        actions = ["BREAK_START", "CHECK_OUT"]
+    else:  # ON_BREAK
+        actions = ["BREAK_END", "CHECK_OUT"]
+
+    return {
+        "employee": {
+            "id": employee.id,
+            "name": str(employee),
+        },
+        "state": st.state,
+        "started_at": st.started_at,
+        "work_minutes": st.work_minutes,
+        "last_event_type": st.last_event_type,
+        "last_action": st.last_action,
+        "actions": actions,
+    }
@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class TimeTrackingConfig(AppConfig):
     name = 'time_tracking'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from time_tracking import signals  # noqa: F401
+        from time_tracking.services.query_budget import install_query_recording
+
+        # pomiar zapytań żądania (budżety, Server-Timing) – także pod ASGI
+        connection_created.connect(install_query_recording, dispatch_uid="time_tracking.query_recording")
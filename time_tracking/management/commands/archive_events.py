@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from time_tracking.models import TimeEvent
+from time_tracking.services.event_archive import (
+    archive_month,
+    month_start,
+    next_month,
+    previous_month,
+    segment_path,
+)
+
+
+def _default_cutoff():
+    # w tabeli zostaje EVENT_ARCHIVE_KEEP_MONTHS ostatnich miesięcy (łącznie z bieżącym)
+    month = month_start(timezone.localdate())
+    for _ in range(int(getattr(settings, "EVENT_ARCHIVE_KEEP_MONTHS", 2)) - 1):
+        month = previous_month(month)
+    return month
+
+
+class Command(BaseCommand):
+    help = (
+        "Przenosi zdarzenia zamkniętych miesięcy z TimeEvent do skompresowanych plików segmentów "
+        "(EVENT_ARCHIVE_DIR). Raporty czytają zarchiwizowane miesiące z segmentów."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            default=None,
+            help="YYYY-MM – archiwizuj miesiące wcześniejsze niż podany (domyślnie wg EVENT_ARCHIVE_KEEP_MONTHS)",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Tylko pokaż, co zostałoby przeniesione.")
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                cutoff = date.fromisoformat(f"{options['before']}-01")
+            except ValueError:
+                raise CommandError("Invalid month format. Use YYYY-MM.")
+        else:
+            cutoff = _default_cutoff()
+
+        if cutoff > month_start(timezone.localdate()):
+            raise CommandError("Cannot archive the current month.")
+
+        oldest = TimeEvent.objects.filter(local_date__lt=cutoff).aggregate(m=Min("local_date"))["m"]
+        if oldest is None:
+            self.stdout.write(f"No events before {cutoff:%Y-%m}.")
+            return
+
+        total = 0
+        month = month_start(oldest)
+        while month < cutoff:
+            if options["dry_run"]:
+                count = TimeEvent.objects.filter(local_date__gte=month, local_date__lt=next_month(month)).count()
+            else:
+                count = archive_month(month)
+            if count:
+                self.stdout.write(f"{month:%Y-%m}: {count} event(s) -> {segment_path(month).name}")
+            total += count
+            month = next_month(month)
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} event(s) before {cutoff:%Y-%m}."))
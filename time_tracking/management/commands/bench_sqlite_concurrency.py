@@ -0,0 +1,164 @@
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+
+from core.models import Device, Employee
+from time_tracking.models import TimeEvent, WorkSchedule
+from time_tracking.services.daily_attendance import refresh_daily_attendance
+from time_tracking.services.event_service import register_event
+from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.tablet_state import get_employee_state
+
+# Kolejne akcje skanującego zależnie od stanu pracownika
+NEXT_ACTION = {
+    "OFF_DUTY": TimeEvent.CHECK_IN,
+    "WORKING": TimeEvent.CHECK_OUT,
+    "ON_BREAK": TimeEvent.BREAK_END,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark współbieżności SQLite: skany z tabletów równolegle z raportami. "
+        "Działa na tymczasowej bazie – porównaj wyniki z SQLITE_PRODUCTION_MODE=0 i =1."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=200)
+        parser.add_argument("--history-days", type=int, default=30)
+        parser.add_argument("--scanners", type=int, default=8, help="Wątki symulujące tablety")
+        parser.add_argument("--reporters", type=int, default=2, help="Wątki liczące raporty")
+        parser.add_argument("--seconds", type=float, default=10.0)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        tmp_dir = tempfile.mkdtemp(prefix="bench-sqlite-")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = str(Path(tmp_dir) / "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            self.stdout.write(
+                f"SQLITE_PRODUCTION_MODE={getattr(settings, 'SQLITE_PRODUCTION_MODE', False)} "
+                f"journal_mode={self._journal_mode()}"
+            )
+            employee_ids = self._seed(options["employees"], options["history_days"], random.Random(options["seed"]))
+            self._run(employee_ids, options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _journal_mode(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            return cursor.fetchone()[0]
+
+    def _seed(self, employees_count, history_days, rnd):
+        device = Device.objects.create(name="Bench tablet", device_id="bench-01")
+        employees = Employee.objects.bulk_create([
+            Employee(first_name=f"Bench{i}", last_name="Employee", qr_token=f"bench-{i:06d}")
+            for i in range(employees_count)
+        ])
+
+        today = timezone.localdate()
+        schedules = []
+        events = []
+        for emp in employees:
+            for offset in range(1, history_days + 1):
+                d = today - timedelta(days=offset)
+                schedules.append(WorkSchedule(
+                    employee=emp, date=d, day_type=WorkSchedule.WORK,
+                    planned_start=dtime(8, 0), planned_end=dtime(16, 0),
+                ))
+                start = timezone.make_aware(datetime.combine(d, dtime(8, rnd.randint(0, 20))))
+                for sequence, (event_type, minutes) in enumerate(
+                    ((TimeEvent.CHECK_IN, 0), (TimeEvent.CHECK_OUT, 480)), start=1
+                ):
+                    ts = start + timedelta(minutes=minutes)
+                    events.append(TimeEvent(
+                        employee=emp, device=device, event_type=event_type,
+                        timestamp=ts, local_date=timezone.localdate(ts), sequence=sequence,
+                    ))
+
+        WorkSchedule.objects.bulk_create(schedules, batch_size=2000)
+        TimeEvent.objects.bulk_create(events, batch_size=2000)
+        refresh_daily_attendance({(s.employee_id, s.date) for s in schedules})
+        return [emp.id for emp in employees]
+
+    def _run(self, employee_ids, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        scan_latencies = []
+        report_latencies = []
+        errors = {"locked": 0}
+        today = timezone.localdate()
+
+        def scanner(seed):
+            rnd = random.Random(seed)
+            try:
+                while not stop.is_set():
+                    employee = Employee.objects.get(id=rnd.choice(employee_ids))
+                    event_type = NEXT_ACTION[get_employee_state(employee).state]
+                    started = time.perf_counter()
+                    try:
+                        register_event(employee=employee, event_type=event_type, device_id="bench-01")
+                    except OperationalError:
+                        with lock:
+                            errors["locked"] += 1
+                        continue
+                    with lock:
+                        scan_latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        def reporter():
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        build_attendance_report(
+                            date_from=today - timedelta(days=options["history_days"]),
+                            date_to=today,
+                            source="events",
+                        )
+                    except OperationalError:
+                        with lock:
+                            errors["locked"] += 1
+                        continue
+                    with lock:
+                        report_latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=scanner, args=(i,)) for i in range(options["scanners"])]
+        threads += [threading.Thread(target=reporter) for _ in range(options["reporters"])]
+
+        for t in threads:
+            t.start()
+        time.sleep(options["seconds"])
+        stop.set()
+        for t in threads:
+            t.join()
+
+        seconds = options["seconds"]
+        self.stdout.write(f"scans:   {len(scan_latencies)} ({len(scan_latencies) / seconds:.1f}/s) "
+                          f"{_percentiles(scan_latencies)}")
+        self.stdout.write(f"reports: {len(report_latencies)} ({len(report_latencies) / seconds:.2f}/s) "
+                          f"{_percentiles(report_latencies)}")
+        self.stdout.write(f"'database is locked' errors: {errors['locked']}")
+
+
+def _percentiles(latencies):
+    if not latencies:
+        return "-"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50={statistics.median(ordered) * 1000:.1f}ms p95={p95 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
@@ -0,0 +1,77 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from time_tracking.services.benchmark import BenchSize, compare_results, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark serwisów i endpointów (czas, liczba zapytań, pamięć) na tymczasowej bazie. "
+        "Wynik jako JSON; z --baseline kończy się błędem przy regresji."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=200)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--events-per-day", type=int, default=4)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--only", action="append", help="Tylko przypadki o tym prefiksie (można powtarzać)")
+        parser.add_argument("--output", help="Plik na wyniki JSON (domyślnie stdout)")
+        parser.add_argument("--baseline", help="Wyniki JSON do porównania")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Dozwolony wzrost czasu / pamięci")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                baseline = json.loads(Path(options["baseline"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline: {exc}")
+
+        size = BenchSize(
+            employees=options["employees"], days=options["days"], events_per_day=options["events_per_day"],
+        )
+
+        tmp_dir = tempfile.mkdtemp(prefix="bench-suite-")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = str(Path(tmp_dir) / "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = run_suite(
+                size, repeat=options["repeat"], seed=options["seed"], only=options["only"],
+                progress=self._progress,
+            )
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        payload = json.dumps(results, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(payload + "\n")
+        else:
+            self.stdout.write(payload)
+
+        if baseline is None:
+            return
+
+        try:
+            regressions = compare_results(results, baseline, tolerance=options["tolerance"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for r in regressions:
+            self.stderr.write(f"REGRESSION {r['case']} {r['metric']}: {r['baseline']} -> {r['current']}")
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}.")
+        self.stderr.write("No regressions against baseline.")
+
+    def _progress(self, name, result):
+        # postęp na stderr – stdout zostaje czystym JSON-em
+        self.stderr.write(
+            f"{name:<22} median={result['wall_ms']['median']:>9.1f}ms "
+            f"queries={result['queries']:>5} peak={result['peak_kib']:>9.1f}KiB"
+        )
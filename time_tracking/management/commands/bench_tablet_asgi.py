@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from core.models import Device, Employee
+
+# Ścieżki wersji sync (DRF) i async tych samych endpointów tabletu
+VARIANTS = {
+    "sync": ("/api/tablet/status/", "/api/tablet/events/"),
+    "async": ("/api/tablet/async/status/", "/api/tablet/async/events/"),
+}
+
+NEXT_ACTION = {
+    "OFF_DUTY": "CHECK_IN",
+    "WORKING": "CHECK_OUT",
+    "ON_BREAK": "BREAK_END",
+}
+
+
+async def _asgi_request(app, method, path, query=None, body=None):
+    """
+    Jedno żądanie HTTP wprost do aplikacji ASGI (jak z uvicorna) – bez sieci.
+    Zwraca (status, body).
+    """
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}).encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    disconnected = asyncio.Event()
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnected.set()
+    return response["status"], response["body"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark endpointów tabletu pod ASGI: wersje sync (DRF) vs async przy tym samym "
+        "obciążeniu (N równoległych tabletów: status -> zdarzenie). Działa na tymczasowej bazie."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=32, help="Równoległe tablety")
+        parser.add_argument("--scans", type=int, default=400, help="Skanów (status + zdarzenie) na wariant")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        tmp_dir = tempfile.mkdtemp(prefix="bench-asgi-")
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = str(Path(tmp_dir) / "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        # błędy 500 ("database is locked") liczymy sami – bez tracebacków w wyjściu
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+
+        try:
+            self.stdout.write(f"SQLITE_PRODUCTION_MODE={getattr(settings, 'SQLITE_PRODUCTION_MODE', False)}")
+            device = Device.objects.create(name="Bench tablet", device_id="bench-01")
+            employees = Employee.objects.bulk_create([
+                Employee(first_name=f"Bench{i}", last_name="Employee", qr_token=f"bench-{i:06d}")
+                for i in range(options["employees"])
+            ])
+            qr_tokens = [emp.qr_token for emp in employees]
+            connections.close_all()
+
+            app = get_asgi_application()
+            for name, paths in VARIANTS.items():
+                result = asyncio.run(self._run(app, paths, qr_tokens, device.device_id, options))
+                self._report(name, result)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    async def _run(self, app, paths, qr_tokens, device_id, options):
+        status_path, events_path = paths
+        rnd = random.Random(options["seed"])
+        remaining = [options["scans"]]
+        latencies = {"status": [], "event": []}
+        errors = [0]
+
+        async def tablet():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                qr = rnd.choice(qr_tokens)
+
+                started = time.perf_counter()
+                code, body = await _asgi_request(app, "GET", status_path, query={"qr": qr, "device": device_id})
+                latencies["status"].append(time.perf_counter() - started)
+                if code != 200:
+                    errors[0] += 1
+                    continue
+
+                event_type = NEXT_ACTION[json.loads(body)["state"]]
+                started = time.perf_counter()
+                code, _ = await _asgi_request(app, "POST", events_path, body={
+                    "qr": qr, "device_id": device_id, "event_type": event_type,
+                })
+                latencies["event"].append(time.perf_counter() - started)
+                if code not in (200, 201):
+                    errors[0] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(tablet() for _ in range(options["concurrency"])))
+        return latencies, errors[0], time.perf_counter() - started
+
+    def _report(self, name, result):
+        latencies, errors, seconds = result
+        scans = len(latencies["event"])
+        self.stdout.write(f"[{name}] {scans} scans in {seconds:.2f}s ({scans / seconds:.1f}/s), errors: {errors}")
+        self.stdout.write(f"  status: {_percentiles(latencies['status'])}")
+        self.stdout.write(f"  event:  {_percentiles(latencies['event'])}")
+
+
+def _percentiles(latencies):
+    if not latencies:
+        return "-"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50={statistics.median(ordered) * 1000:.1f}ms p95={p95 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
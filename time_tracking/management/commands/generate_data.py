@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from time_tracking.services.synthetic_data import BATCH_SIZE, DataConfig, clear_data, generate_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Generuje dane syntetyczne (pracownicy, grafik, zdarzenia, podsumowania dni) w zadanej skali – "
+        "np. --employees 1000 --days 365 to ok. miliona zdarzeń."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=50)
+        parser.add_argument("--days", type=int, default=30, help="Dni wstecz od --to (domyślnie dziś)")
+        parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD (zamiast --days)")
+        parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--devices", type=int, default=5)
+
+        # odsetki dni roboczych, 0..1
+        parser.add_argument("--late-rate", type=float, default=0.1)
+        parser.add_argument("--absence-rate", type=float, default=0.03)
+        parser.add_argument("--anomaly-rate", type=float, default=0.02)
+        parser.add_argument("--break-rate", type=float, default=0.8)
+        parser.add_argument("--leave-rate", type=float, default=0.03)
+        parser.add_argument("--no-schedule-rate", type=float, default=0.01)
+
+        parser.add_argument("--clear", action="store_true", help="Najpierw usuń istniejące dane")
+        parser.add_argument("--no-summaries", action="store_true", help="Bez DailyAttendance")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            date_to = date.fromisoformat(options["date_to"]) if options["date_to"] else timezone.localdate()
+            date_from = (
+                date.fromisoformat(options["date_from"]) if options["date_from"]
+                else date_to - timedelta(days=options["days"] - 1)
+            )
+        except ValueError:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+
+        if date_to < date_from:
+            raise CommandError("'to' must be >= 'from'.")
+
+        rates = ("late_rate", "absence_rate", "anomaly_rate", "break_rate", "leave_rate", "no_schedule_rate")
+        if any(not 0 <= options[rate] <= 1 for rate in rates):
+            raise CommandError("Rates must be between 0 and 1.")
+
+        config = DataConfig(
+            employees=options["employees"],
+            date_from=date_from,
+            date_to=date_to,
+            seed=options["seed"],
+            devices=options["devices"],
+            **{rate: options[rate] for rate in rates},
+        )
+
+        if options["clear"]:
+            try:
+                clear_data()
+            except ImproperlyConfigured as exc:
+                # dziennik write-behind trzyma działający serwer – jego zdarzeń nie usuwamy
+                raise CommandError(str(exc))
+
+        stats = generate_data(
+            config,
+            summaries=not options["no_summaries"],
+            batch_size=options["batch_size"],
+            progress=lambda counts: self.stderr.write(f"  {counts['events']} events...", ending="\r"),
+        )
+
+        self.stderr.write("")
+        self.stdout.write(
+            f"Created {stats['employees']} employees, {stats['schedules']} schedule rows, "
+            f"{stats['events']} events, {stats['summaries']} daily summaries in {stats['seconds']}s."
+        )
+        self.stdout.write("Days: " + ", ".join(f"{kind}={count}" for kind, count in sorted(stats["days"].items())))
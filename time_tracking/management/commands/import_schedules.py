@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from time_tracking.services.schedule_import import CSV, JSONL, detect_format, import_schedules, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Importuje grafik z pliku CSV / JSONL (upsert po pracowniku i dniu) i wypisuje raport błędów."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Plik CSV (z nagłówkiem) albo JSONL")
+        parser.add_argument("--format", choices=(CSV, JSONL), help="Domyślnie z rozszerzenia pliku")
+        parser.add_argument("--dry-run", action="store_true", help="Tylko walidacja, bez zapisu")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Wierszy na transakcję")
+
+        # raport błędów jako JSON Lines (wiersz + komunikaty)
+        parser.add_argument("--errors", help="Plik na raport błędów (JSONL)")
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options["path"], options["format"])
+        if fmt is None:
+            raise CommandError("Cannot detect file format, use --format csv|jsonl.")
+
+        kwargs = {"dry_run": options["dry_run"]}
+        if options["chunk_size"]:
+            kwargs["chunk_size"] = options["chunk_size"]
+
+        try:
+            with open(options["path"], "rb") as f:
+                result = import_schedules(iter_rows(f, fmt), **kwargs)
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        if options["errors"]:
+            with open(options["errors"], "w", encoding="utf-8") as f:
+                for error in result["errors"]:
+                    f.write(json.dumps(error) + "\n")
+        else:
+            for error in result["errors"][:20]:
+                self.stderr.write(f"row {error['row']}: {'; '.join(error['errors'])}")
+
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}Created {result['created']}, updated {result['updated']}, "
+            f"rejected {result['error_count']} row(s)."
+        )
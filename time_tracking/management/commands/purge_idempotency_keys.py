@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from time_tracking.services.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Usuwa wygasłe klucze idempotencji zdarzeń z tabletów."
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(f"Deleted {deleted} expired idempotency key(s).")
@@ -0,0 +1,15 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from time_tracking.services.report_jobs import purge_finished_jobs
+
+
+class Command(BaseCommand):
+    help = "Usuwa zakończone zadania raportów w tle (i ich pliki) starsze niż REPORT_JOB_TTL_HOURS."
+
+    def handle(self, *args, **options):
+        ttl = timedelta(hours=int(getattr(settings, "REPORT_JOB_TTL_HOURS", 24)))
+        deleted = purge_finished_jobs(ttl)
+        self.stdout.write(f"Deleted {deleted} report job(s).")
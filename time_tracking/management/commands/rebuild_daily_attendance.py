@@ -0,0 +1,58 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from time_tracking.services.daily_attendance import iter_windows, rebuild_daily_attendance
+from time_tracking.services.report_service import build_attendance_report
+
+
+class Command(BaseCommand):
+    help = "Przebudowuje DailyAttendance dla zakresu dat i porównuje z raportem liczonym ze zdarzeń."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", required=True, help="YYYY-MM-DD")
+        parser.add_argument("--to", dest="date_to", required=True, help="YYYY-MM-DD")
+        parser.add_argument("--employee-id", type=int, default=None)
+        parser.add_argument(
+            "--check-only",
+            action="store_true",
+            help="Tylko porównaj istniejące podsumowania ze zdarzeniami, bez przebudowy.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options["date_from"])
+            date_to = date.fromisoformat(options["date_to"])
+        except ValueError:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+
+        if date_to < date_from:
+            raise CommandError("'to' must be >= 'from'.")
+
+        employee_id = options["employee_id"]
+
+        if not options["check_only"]:
+            rebuilt = rebuild_daily_attendance(date_from, date_to, employee_id)
+            self.stdout.write(f"Rebuilt {rebuilt} employee-days.")
+
+        mismatches = 0
+        for w_from, w_to in iter_windows(date_from, date_to):
+            mismatches += self._check_window(w_from, w_to, employee_id)
+
+        if mismatches:
+            raise CommandError(f"{mismatches} employee-day(s) differ from event replay.")
+
+        self.stdout.write(self.style.SUCCESS("DailyAttendance matches event replay."))
+
+    def _check_window(self, date_from, date_to, employee_id):
+        kwargs = {"date_from": date_from, "date_to": date_to, "employee_id": employee_id}
+        expected = build_attendance_report(source="events", **kwargs)
+        actual = build_attendance_report(source="summary", **kwargs)
+
+        mismatches = 0
+        for exp_emp, act_emp in zip(expected["employees"], actual["employees"]):
+            for exp_day, act_day in zip(exp_emp["days"], act_emp["days"]):
+                if exp_day != act_day:
+                    mismatches += 1
+                    self.stderr.write(f"Mismatch: {exp_emp['employee']['name']} {exp_day['date']}")
+        return mismatches
@@ -0,0 +1,16 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from time_tracking.services.event_buffer import event_buffer
+
+
+class Command(BaseCommand):
+    help = "Zapisuje do bazy zdarzenia z dziennika write-behind (np. po awarii procesu)."
+
+    def handle(self, *args, **options):
+        try:
+            replayed = event_buffer.recover()
+        except ImproperlyConfigured as exc:
+            # dziennik trzyma działający serwer – odtworzy go sam
+            raise CommandError(str(exc))
+        self.stdout.write(f"Replayed {replayed} journal event(s).")
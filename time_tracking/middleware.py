@@ -0,0 +1,194 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from time_tracking.services.metrics import HTTP_REQUEST_SECONDS, metrics_enabled
+from time_tracking.services.query_budget import OFF, QueryRecorder, check_budget, get_query_budget_mode, recording
+
+
+def _view_budget(view_func):
+    # widok funkcyjny (with_query_budget) albo APIView.as_view() z atrybutem klasy
+    budget = getattr(view_func, "query_budget", None)
+    if budget is None:
+        budget = getattr(getattr(view_func, "view_class", None), "query_budget", None)
+    return budget
+
+
+def _recorded(content, recorder):
+    # treść strumienia generowana jest po wyjściu z middleware – pomiar przy każdym kawałku
+    iterator = iter(content)
+    while True:
+        with recording(recorder):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+class QueryBudgetMiddleware:
+    """
+    Liczy zapytania SQL żądań do widoków z zadeklarowanym budżetem (services.query_budget).
+
+    Zapytania liczone są przez recording() także pod ASGI (widok synchroniczny wykonuje się
+    w wątku sync_to_async) i w widokach async. Odpowiedzi strumieniowe (CSV) liczone są
+    do końca wysyłania treści.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+
+        if get_query_budget_mode() == OFF:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with recording(recorder):
+            response = self.get_response(request)
+        return self._check(request, response, recorder)
+
+    async def _acall(self, request):
+        if get_query_budget_mode() == OFF:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        with recording(recorder):
+            response = await self.get_response(request)
+        return self._check(request, response, recorder)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = _view_budget(view_func)
+
+    def _check(self, request, response, recorder):
+        budget = getattr(request, "_query_budget", None)
+        if budget is None:
+            return response
+
+        label = f"{request.method} {request.path}"
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._counted(response.streaming_content, recorder, label, budget)
+        elif not response.streaming:
+            check_budget(label, budget, recorder)
+        return response
+
+    def _counted(self, content, recorder, label, budget):
+        yield from _recorded(content, recorder)
+        check_budget(label, budget, recorder)
+
+
+def server_timing_enabled():
+    return getattr(settings, "SERVER_TIMING_ENABLED", True)
+
+
+class _SqlTimer:
+    """
+    Rejestrator zapytań (query_budget.recording) – tylko liczba i łączny czas zapytań.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class _RequestTiming:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql = _SqlTimer()
+        # początek renderowania odpowiedzi (TemplateResponse / DRF Response) i czas SQL do niego
+        self.render_started = None
+        self.sql_before_render = 0.0
+
+    def header(self, total):
+        db = self.sql.seconds
+        render = 0.0
+        if self.render_started is not None:
+            # zapytania wykonane w trakcie renderowania liczą się do db, nie do render
+            render = max(0.0, self.started + total - self.render_started - (db - self.sql_before_render))
+        compute = max(0.0, total - db - render)
+        return ", ".join([
+            f'db;dur={db * 1000:.2f};desc="{self.sql.count} queries"',
+            f"compute;dur={compute * 1000:.2f}",
+            f"render;dur={render * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ])
+
+
+def _view_label(request):
+    match = getattr(request, "resolver_match", None)
+    # tylko nazwy URL – ograniczona liczba serii w metrykach
+    return match.url_name if match is not None and match.url_name else "unmatched"
+
+
+class ServerTimingMiddleware:
+    """
+    Nagłówek Server-Timing z podziałem żądania na db (SQL), compute (widok bez SQL)
+    i render (TemplateResponse / Response DRF), plus histogram czasu żądania per nazwa URL
+    (services.metrics).
+
+    Zapytania mierzone są przez query_budget.recording(), więc podział działa pod WSGI i ASGI,
+    także dla widoków async. Treść odpowiedzi strumieniowej wysyłana jest po nagłówkach,
+    więc nie wchodzi w pomiar.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+
+        if not (server_timing_enabled() or metrics_enabled()):
+            return self.get_response(request)
+
+        timing = request._server_timing = _RequestTiming()
+        with recording(timing.sql):
+            response = self.get_response(request)
+        return self._finish(request, response, timing)
+
+    async def _acall(self, request):
+        if not (server_timing_enabled() or metrics_enabled()):
+            return await self.get_response(request)
+
+        timing = request._server_timing = _RequestTiming()
+        with recording(timing.sql):
+            response = await self.get_response(request)
+        return self._finish(request, response, timing)
+
+    def _finish(self, request, response, timing):
+        total = time.perf_counter() - timing.started
+        HTTP_REQUEST_SECONDS.observe(total, view=_view_label(request))
+        if server_timing_enabled():
+            response["Server-Timing"] = timing.header(total)
+        return response
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, "_server_timing", None)
+        if timing is not None:
+            timing.render_started = time.perf_counter()
+            timing.sql_before_render = timing.sql.seconds
+        return response
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-18 04:02
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_local_date(apps, schema_editor):
+    TimeEvent = apps.get_model("time_tracking", "TimeEvent")
+
+    batch = []
+    for ev in TimeEvent.objects.filter(local_date__isnull=True).only("id", "timestamp").iterator(chunk_size=2000):
+        ev.local_date = timezone.localdate(ev.timestamp)
+        batch.append(ev)
+        if len(batch) >= 2000:
+            TimeEvent.objects.bulk_update(batch, ["local_date"])
+            batch = []
+
+    if batch:
+        TimeEvent.objects.bulk_update(batch, ["local_date"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('time_tracking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeevent',
+            name='local_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_local_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='timeevent',
+            name='local_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='timeevent',
+            index=models.Index(fields=['employee', 'local_date'], name='time_tracki_employe_3e48a1_idx'),
+        ),
+    ]
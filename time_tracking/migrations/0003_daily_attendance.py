@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('time_tracking', '0002_time_event_local_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('day_type', models.CharField(default='NO_SCHEDULE', max_length=20)),
+                ('planned_start', models.TimeField(blank=True, null=True)),
+                ('planned_end', models.TimeField(blank=True, null=True)),
+                ('planned_minutes', models.PositiveIntegerField(default=0)),
+                ('check_in', models.DateTimeField(blank=True, null=True)),
+                ('check_out', models.DateTimeField(blank=True, null=True)),
+                ('worked_minutes', models.PositiveIntegerField(default=0)),
+                ('break_minutes', models.PositiveIntegerField(default=0)),
+                ('late_diff_minutes', models.IntegerField(blank=True, null=True)),
+                ('absence', models.BooleanField(default=False)),
+                ('anomalies', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to='core.employee')),
+            ],
+            options={
+                'verbose_name': 'Daily attendance',
+                'verbose_name_plural': 'Daily attendance',
+                'ordering': ['date'],
+                'unique_together': {('employee', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:11
+
+from django.db import migrations, models
+
+
+def backfill_sequence(apps, schema_editor):
+    TimeEvent = apps.get_model("time_tracking", "TimeEvent")
+
+    batch = []
+    current_key = None
+    sequence = 0
+    events = (
+        TimeEvent.objects
+        .only("id", "employee_id", "local_date")
+        .order_by("employee_id", "local_date", "timestamp", "id")
+        .iterator(chunk_size=2000)
+    )
+    for ev in events:
+        key = (ev.employee_id, ev.local_date)
+        if key != current_key:
+            current_key = key
+            sequence = 0
+        sequence += 1
+        ev.sequence = sequence
+        batch.append(ev)
+        if len(batch) >= 2000:
+            TimeEvent.objects.bulk_update(batch, ["sequence"])
+            batch = []
+
+    if batch:
+        TimeEvent.objects.bulk_update(batch, ["sequence"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('time_tracking', '0004_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeevent',
+            name='sequence',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_sequence, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='timeevent',
+            name='sequence',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='timeevent',
+            constraint=models.UniqueConstraint(fields=('employee', 'local_date', 'sequence'), name='time_event_employee_day_sequence'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('time_tracking', '0005_time_event_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workschedule',
+            index=models.Index(fields=['date', 'id'], name='time_tracki_date_085a3e_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('time_tracking', '0007_report_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShiftPattern',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('valid_from', models.DateField()),
+                ('valid_to', models.DateField(blank=True, null=True)),
+                ('cycle_days', models.PositiveSmallIntegerField(default=7)),
+                ('anchor_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shift_patterns', to='core.employee')),
+            ],
+            options={
+                'verbose_name': 'Shift pattern',
+                'verbose_name_plural': 'Shift patterns',
+                'ordering': ['employee', 'valid_from'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ShiftPatternDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_index', models.PositiveSmallIntegerField()),
+                ('day_type', models.CharField(choices=[('WORK', 'Work day'), ('OFF', 'Day off'), ('LEAVE', 'Leave')], default='WORK', max_length=10)),
+                ('planned_start', models.TimeField(blank=True, null=True)),
+                ('planned_end', models.TimeField(blank=True, null=True)),
+                ('pattern', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='days', to='time_tracking.shiftpattern')),
+            ],
+            options={
+                'verbose_name': 'Shift pattern day',
+                'verbose_name_plural': 'Shift pattern days',
+                'ordering': ['pattern', 'day_index'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='shiftpattern',
+            index=models.Index(fields=['employee', 'valid_from'], name='time_tracki_employe_15af3d_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='shiftpatternday',
+            unique_together={('pattern', 'day_index')},
+        ),
+    ]
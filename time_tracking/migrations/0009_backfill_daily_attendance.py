@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Max, Min
+
+
+def backfill_daily_attendance(apps, schema_editor):
+    """
+    Podsumowania dni sprzed wprowadzenia DailyAttendance (0003 tworzy pustą tabelę, a raporty
+    domyślnie czytają podsumowania). Przebudowa jest idempotentna – dni utrzymywane już
+    przyrostowo są tylko przeliczane ponownie.
+    """
+    TimeEvent = apps.get_model("time_tracking", "TimeEvent")
+    WorkSchedule = apps.get_model("time_tracking", "WorkSchedule")
+
+    bounds = [
+        TimeEvent.objects.aggregate(first=Min("local_date"), last=Max("local_date")),
+        WorkSchedule.objects.aggregate(first=Min("date"), last=Max("date")),
+    ]
+    firsts = [b["first"] for b in bounds if b["first"] is not None]
+    if not firsts:
+        return
+
+    # celowo bieżący kod przeliczeń – te same reguły co raporty i sygnały
+    from time_tracking.services.daily_attendance import rebuild_daily_attendance
+
+    rebuild_daily_attendance(min(firsts), max(b["last"] for b in bounds if b["last"] is not None))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('time_tracking', '0008_shift_pattern'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_attendance, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('time_tracking', '0010_idempotency_key_scope'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='owner',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
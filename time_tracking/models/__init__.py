@@ -1,4 +1,16 @@
 from .work_schedule import WorkSchedule
+from .shift_pattern import ShiftPattern, ShiftPatternDay
 from .time_event import TimeEvent
+from .daily_attendance import DailyAttendance
+from .idempotency_key import IdempotencyKey
+from .report_job import ReportJob
 
-__all__ = ["WorkSchedule", "TimeEvent"]
+__all__ = [
+    "WorkSchedule",
+    "ShiftPattern",
+    "ShiftPatternDay",
+    "TimeEvent",
+    "DailyAttendance",
+    "IdempotencyKey",
+    "ReportJob",
+]
@@ -0,0 +1,69 @@
+from django.db import models
+
+from core.models import Employee
+
+
+class DailyAttendance(models.Model):
+    """
+    Zmaterializowane podsumowanie dnia pracy (jeden wiersz = pracownik + dzień).
+
+    Utrzymywane przyrostowo przez time_tracking.services.daily_attendance przy każdej
+    zmianie TimeEvent / WorkSchedule. Raporty czytają te wiersze zamiast odtwarzać zdarzenia.
+    """
+
+    NO_SCHEDULE = "NO_SCHEDULE"
+
+    # Pola wyliczane przez report_service.compute_day_facts()
+    FACT_FIELDS = (
+        "day_type",
+        "planned_start",
+        "planned_end",
+        "planned_minutes",
+        "check_in",
+        "check_out",
+        "worked_minutes",
+        "break_minutes",
+        "late_diff_minutes",
+        "absence",
+        "anomalies",
+    )
+
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="daily_attendance",
+    )
+
+    date = models.DateField()
+
+    # WORK / OFF / LEAVE z grafiku albo NO_SCHEDULE
+    day_type = models.CharField(max_length=20, default=NO_SCHEDULE)
+
+    planned_start = models.TimeField(null=True, blank=True)
+    planned_end = models.TimeField(null=True, blank=True)
+    planned_minutes = models.PositiveIntegerField(default=0)
+
+    check_in = models.DateTimeField(null=True, blank=True)
+    check_out = models.DateTimeField(null=True, blank=True)
+    worked_minutes = models.PositiveIntegerField(default=0)
+    break_minutes = models.PositiveIntegerField(default=0)
+
+    # Różnica wejście - planowany start (bez progu LATE_THRESHOLD_MINUTES,
+    # próg nakładany jest przy odczycie, więc jego zmiana nie wymaga przebudowy)
+    late_diff_minutes = models.IntegerField(null=True, blank=True)
+
+    absence = models.BooleanField(default=False)
+
+    # Lista anomalii w formacie raportu: [{"type": ..., "detail": ...}, ...]
+    anomalies = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("employee", "date")
+        ordering = ["date"]
+        verbose_name = "Daily attendance"
+        verbose_name_plural = "Daily attendance"
+
+    def __str__(self):
+        return f"{self.employee} – {self.date} ({self.day_type})"
@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    Zapamiętana odpowiedź na żądanie z kluczem idempotencji (ponowienia z tabletów).
+
+    Klucz obowiązuje w obrębie endpointu i urządzenia. Powtórzone żądanie z tym samym kluczem
+    i tą samą treścią (request_hash) dostaje zapisaną odpowiedź bez ponownej walidacji i zapisu
+    zdarzenia. Wpisy wygasają po expires_at.
+    """
+
+    endpoint = models.CharField(max_length=32)
+    device_id = models.CharField(max_length=64)
+    key = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)
+
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Idempotency key"
+        verbose_name_plural = "Idempotency keys"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["endpoint", "device_id", "key"],
+                name="unique_idempotency_key_per_device",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.response_status})"
@@ -0,0 +1,72 @@
+import uuid
+
+from django.db import models
+from django.db.models import Q
+
+
+class ReportJob(models.Model):
+    """
+    Raport czasu pracy liczony w tle (time_tracking.services.report_jobs).
+
+    Klient dostaje id zadania, odpytuje postęp (processed / total pracowników) i pobiera
+    gotowy plik JSON / CSV z dysku. Identyczne zlecenia w toku (ten sam params_key)
+    trafiają do jednego zadania – pilnuje tego warunkowy unikalny indeks.
+    """
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    ACTIVE_STATUSES = (PENDING, RUNNING)
+
+    JSON = "json"
+    CSV = "csv"
+
+    FORMAT_CHOICES = (
+        (JSON, "JSON"),
+        (CSV, "CSV"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # format:from:to:employee – klucz deduplikacji zleceń
+    params_key = models.CharField(max_length=100)
+
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    date_from = models.DateField()
+    date_to = models.DateField()
+    employee_id = models.PositiveIntegerField(null=True, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    # proces liczący zadanie (report_jobs._get_owner) – zadanie martwego procesu jest osierocone
+    owner = models.CharField(max_length=32, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # odświeżane przy postępie – zadanie w toku bez zmian od dawna uznajemy za przerwane
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Report job"
+        verbose_name_plural = "Report jobs"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["params_key"],
+                condition=Q(status__in=["PENDING", "RUNNING"]),
+                name="report_job_active_params",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.format} {self.date_from}..{self.date_to} ({self.status})"
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q
+
+from core.models import Employee
+from time_tracking.models.work_schedule import WorkSchedule, validate_planned_times
+
+# Najdłuższy cykl rotacyjny (w dniach)
+MAX_CYCLE_DAYS = 366
+
+
+class ShiftPattern(models.Model):
+    """
+    Powtarzalny grafik pracownika – tygodniowy (cycle_days=7) albo rotacyjny – ważny
+    od valid_from do valid_to (brak = bezterminowo).
+
+    Dzień cyklu dla daty d to (d - anchor_date) % cycle_days, a jego grafik opisuje
+    ShiftPatternDay o tym day_index (brak wpisu = dzień wolny). Domyślnie anchor_date to
+    poniedziałek tygodnia valid_from, więc we wzorcu tygodniowym dzień 0 to poniedziałek.
+    Wiersze WorkSchedule w tym okresie są wyjątkami i mają pierwszeństwo przed wzorcem.
+    """
+
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="shift_patterns",
+    )
+
+    name = models.CharField(max_length=100, blank=True)
+
+    valid_from = models.DateField()
+    valid_to = models.DateField(null=True, blank=True)
+
+    cycle_days = models.PositiveSmallIntegerField(default=7)
+    anchor_date = models.DateField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["employee", "valid_from"]
+        verbose_name = "Shift pattern"
+        verbose_name_plural = "Shift patterns"
+        indexes = [
+            models.Index(fields=["employee", "valid_from"]),
+        ]
+
+    def clean(self):
+        if self.valid_to and self.valid_from and self.valid_to < self.valid_from:
+            raise ValidationError("valid_to must be on or after valid_from.")
+
+        if not 1 <= (self.cycle_days or 0) <= MAX_CYCLE_DAYS:
+            raise ValidationError(f"cycle_days must be between 1 and {MAX_CYCLE_DAYS}.")
+
+        if self.employee_id and self.valid_from:
+            # okresy wzorców jednego pracownika nie mogą się nakładać
+            overlapping = ShiftPattern.objects.filter(employee_id=self.employee_id).exclude(pk=self.pk)
+            if self.valid_to:
+                overlapping = overlapping.filter(valid_from__lte=self.valid_to)
+            overlapping = overlapping.filter(Q(valid_to__isnull=True) | Q(valid_to__gte=self.valid_from))
+            if overlapping.exists():
+                raise ValidationError("Shift pattern overlaps another pattern of this employee.")
+
+    def save(self, *args, **kwargs):
+        if self.anchor_date is None:
+            self.anchor_date = self.valid_from - timedelta(days=self.valid_from.weekday())
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        valid_to = self.valid_to or "…"
+        return f"{self.employee} – {self.name or 'pattern'} ({self.valid_from}..{valid_to})"
+
+
+class ShiftPatternDay(models.Model):
+    """
+    Grafik jednego dnia cyklu wzorca (day_index 0..cycle_days-1).
+    """
+
+    pattern = models.ForeignKey(
+        ShiftPattern,
+        on_delete=models.CASCADE,
+        related_name="days",
+    )
+
+    day_index = models.PositiveSmallIntegerField()
+
+    day_type = models.CharField(
+        max_length=10,
+        choices=WorkSchedule.DAY_TYPE_CHOICES,
+        default=WorkSchedule.WORK,
+    )
+
+    planned_start = models.TimeField(null=True, blank=True)
+    planned_end = models.TimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("pattern", "day_index")
+        ordering = ["pattern", "day_index"]
+        verbose_name = "Shift pattern day"
+        verbose_name_plural = "Shift pattern days"
+
+    def clean(self):
+        validate_planned_times(self.day_type, self.planned_start, self.planned_end)
+        if self.pattern_id and self.day_index >= self.pattern.cycle_days:
+            raise ValidationError("day_index must be lower than the pattern's cycle_days.")
+
+    def __str__(self):
+        return f"{self.pattern} – day {self.day_index} ({self.day_type})"
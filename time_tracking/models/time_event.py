@@ -37,6 +37,15 @@ class TimeEvent(models.Model):
     # Timestamp nadawany przez serwer
     timestamp = models.DateTimeField(default=timezone.now, db_index=True)
 
+    # Lokalna data pracy (strefa TIME_ZONE) – wyliczana z timestamp przy zapisie,
+    # żeby zapytania "po dniu" trafiały w indeks zamiast w timestamp__date
+    local_date = models.DateField(editable=False)
+
+    # Numer kolejny zdarzenia pracownika w danym dniu (1, 2, 3, ...).
+    # Unikalny per (employee, local_date) – dwa równoległe zapisy po tym samym
+    # stanie nie mogą oba przejść (optimistic concurrency w register_event).
+    sequence = models.PositiveIntegerField(editable=False)
+
     # Flagi anomalii (na MVP wystarczy)
     is_anomaly = models.BooleanField(default=False)
     anomaly_reason = models.CharField(
@@ -52,7 +61,38 @@ class TimeEvent(models.Model):
         verbose_name_plural = "Time events"
         indexes = [
             models.Index(fields=["employee", "timestamp"]),
+            models.Index(fields=["employee", "local_date"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "local_date", "sequence"],
+                name="time_event_employee_day_sequence",
+            ),
         ]
 
+    def save(self, *args, **kwargs):
+        local_date = timezone.localdate(self.timestamp)
+        if self.local_date is not None and self.local_date != local_date:
+            # przeniesione (np. w adminie) na inny dzień – nowy numer w tamtym dniu
+            self.sequence = None
+        self.local_date = local_date
+        if self.sequence is None:
+            self.sequence = self.next_sequence(self.employee_id, local_date)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def next_sequence(cls, employee_id, local_date):
+        # import lokalny: event_buffer importuje modele
+        from time_tracking.services.event_buffer import event_buffer, write_behind_enabled
+
+        last = (
+            cls.objects
+            .filter(employee_id=employee_id, local_date=local_date)
+            .aggregate(m=models.Max("sequence"))["m"]
+        )
+        # zdarzenia potwierdzone w write-behind, jeszcze niezapisane w bazie, mają już swoje numery
+        pending = event_buffer.pending_for(employee_id, local_date) if write_behind_enabled() else []
+        return max([last or 0, *(ev.sequence for ev in pending)]) + 1
+
     def __str__(self):
         return f"{self.employee} | {self.event_type} | {self.timestamp:%Y-%m-%d %H:%M}"
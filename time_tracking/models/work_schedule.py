@@ -1,8 +1,37 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from core.models import Employee
 
 
+def validate_planned_times(day_type, planned_start, planned_end):
+    """
+    Walidacja logiki grafiku (dzień z WorkSchedule albo dzień wzorca zmian):
+    - WORK -> wymagane start i end
+    - OFF / LEAVE -> start i end muszą być puste
+    """
+    if day_type == WorkSchedule.WORK:
+        if not planned_start or not planned_end:
+            raise ValidationError(
+                "For WORK day, planned start and end times are required."
+            )
+        if planned_end <= planned_start:
+            raise ValidationError(
+                "Planned end time must be after planned start time."
+            )
+
+    if day_type in {WorkSchedule.OFF, WorkSchedule.LEAVE}:
+        if planned_start or planned_end:
+            raise ValidationError(
+                "Start/end times must be empty for OFF or LEAVE days."
+            )
+
+
 class WorkSchedule(models.Model):
+    """
+    Grafik jednego dnia pracownika. Przy wzorcu zmian (ShiftPattern) wiersz jest wyjątkiem
+    dnia (urlop, wolne, zamiana godzin) i ma pierwszeństwo przed wzorcem.
+    """
+
     WORK = "WORK"
     OFF = "OFF"
     LEAVE = "LEAVE"
@@ -37,30 +66,13 @@ class WorkSchedule(models.Model):
         ordering = ["date"]
         verbose_name = "Work schedule"
         verbose_name_plural = "Work schedules"
+        indexes = [
+            # stronicowanie API po (date, id)
+            models.Index(fields=["date", "id"]),
+        ]
 
     def clean(self):
-        """
-        Walidacja logiki grafiku:
-        - WORK -> wymagane start i end
-        - OFF / LEAVE -> start i end muszą być puste
-        """
-        from django.core.exceptions import ValidationError
-
-        if self.day_type == self.WORK:
-            if not self.planned_start or not self.planned_end:
-                raise ValidationError(
-                    "For WORK day, planned start and end times are required."
-                )
-            if self.planned_end <= self.planned_start:
-                raise ValidationError(
-                    "Planned end time must be after planned start time."
-                )
-
-        if self.day_type in {self.OFF, self.LEAVE}:
-            if self.planned_start or self.planned_end:
-                raise ValidationError(
-                    "Start/end times must be empty for OFF or LEAVE days."
-                )
+        validate_planned_times(self.day_type, self.planned_start, self.planned_end)
 
     def __str__(self):
         return f"{self.employee} – {self.date} ({self.day_type})"
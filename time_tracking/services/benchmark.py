@@ -0,0 +1,283 @@
+"""
+Powtarzalny benchmark gorących ścieżek (serwisy + endpointy API).
+
+Dane syntetyczne o zadanym rozmiarze (pracownicy × dni × zdarzenia na dzień, stałe ziarno),
+dla każdego przypadku: czas (min / mediana / max z kilku powtórzeń), liczba zapytań SQL
+i szczytowa pamięć Pythona (tracemalloc, osobny przebieg – tracemalloc spowalnia kod).
+Wynik to słownik gotowy do zapisu jako JSON; compare_results porównuje go z zapisanym
+baseline (czas i pamięć z tolerancją, liczba zapytań – dokładnie).
+"""
+from __future__ import annotations
+
+import importlib.util
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Callable
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from core.models import Device, Employee
+from time_tracking.models import TimeEvent, WorkSchedule
+from time_tracking.services.daily_attendance import refresh_daily_attendance
+from time_tracking.services.event_service import register_event
+from time_tracking.services.live_dashboard import get_live_dashboard
+from time_tracking.services.report_cache import clear_report_cache
+from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.tablet_state import get_employee_state
+
+# Wersja formatu pliku wyników – porównujemy tylko zgodne
+FORMAT_VERSION = 1
+
+DEVICE_ID = "bench-suite"
+
+# Kolejne akcje skanującego zależnie od stanu pracownika
+NEXT_ACTION = {
+    "OFF_DUTY": TimeEvent.CHECK_IN,
+    "WORKING": TimeEvent.CHECK_OUT,
+    "ON_BREAK": TimeEvent.BREAK_END,
+}
+
+# Różnice poniżej tych progów to szum pomiaru, nie regresja (szybkie przypadki, małe alokacje)
+MIN_DELTA_MS = 2.0
+MIN_DELTA_KIB = 64.0
+
+# Ilu pracowników obsługuje jeden przebieg przypadków "per pracownik" (stan, skan)
+SAMPLE_EMPLOYEES = 50
+
+
+@dataclass(frozen=True)
+class BenchSize:
+    employees: int = 200
+    days: int = 30
+    events_per_day: int = 4
+
+
+@dataclass(frozen=True)
+class BenchData:
+    employee_ids: list[int]
+    qr_tokens: list[str]
+    date_from: date
+    date_to: date
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    run: Callable[[], Any]
+    # przed każdym przebiegiem, poza pomiarem (np. czyszczenie cache – przebieg "na zimno")
+    setup: Callable[[], None] | None = None
+
+
+def _day_events(rnd: random.Random, d: date, events_per_day: int) -> list[tuple[str, datetime]]:
+    """
+    Wejście, (events_per_day - 2) / 2 przerw i wyjście – z losowym spóźnieniem.
+    """
+    start = timezone.make_aware(datetime.combine(d, dtime(8, 0))) + timedelta(minutes=rnd.randint(-10, 25))
+    breaks = max(events_per_day - 2, 0) // 2
+    events = [(TimeEvent.CHECK_IN, start)]
+    for i in range(breaks):
+        break_start = start + timedelta(minutes=120 + i * 90 + rnd.randint(0, 20))
+        events.append((TimeEvent.BREAK_START, break_start))
+        events.append((TimeEvent.BREAK_END, break_start + timedelta(minutes=rnd.randint(5, 30))))
+    events.append((TimeEvent.CHECK_OUT, start + timedelta(minutes=480 + rnd.randint(-15, 45))))
+    return events
+
+
+def seed_dataset(size: BenchSize, seed: int = 1) -> BenchData:
+    """
+    Grafik (WORK 8-16) i zdarzenia dla size.days dni przed dzisiaj, a dziś – samo wejście
+    połowy pracowników (panel live i stan tabletu mają z czym pracować).
+    """
+    rnd = random.Random(seed)
+    Device.objects.get_or_create(device_id=DEVICE_ID, defaults={"name": "Bench suite"})
+    device = Device.objects.get(device_id=DEVICE_ID)
+    employees = Employee.objects.bulk_create([
+        Employee(first_name=f"Bench{i}", last_name="Suite", qr_token=f"bench-suite-{seed}-{i:06d}")
+        for i in range(size.employees)
+    ])
+
+    today = timezone.localdate()
+    date_from = today - timedelta(days=size.days)
+    schedules = []
+    events = []
+    for i, emp in enumerate(employees):
+        for offset in range(size.days + 1):
+            d = date_from + timedelta(days=offset)
+            schedules.append(WorkSchedule(
+                employee=emp, date=d, day_type=WorkSchedule.WORK,
+                planned_start=dtime(8, 0), planned_end=dtime(16, 0),
+            ))
+            day_events = _day_events(rnd, d, size.events_per_day)
+            if d == today:
+                day_events = day_events[:1] if i % 2 == 0 else []
+            for sequence, (event_type, ts) in enumerate(day_events, start=1):
+                events.append(TimeEvent(
+                    employee=emp, device=device, event_type=event_type,
+                    timestamp=ts, local_date=timezone.localdate(ts), sequence=sequence,
+                ))
+
+    WorkSchedule.objects.bulk_create(schedules, batch_size=2000)
+    TimeEvent.objects.bulk_create(events, batch_size=2000)
+    refresh_daily_attendance({(s.employee_id, s.date) for s in schedules})
+
+    return BenchData(
+        employee_ids=[emp.id for emp in employees],
+        qr_tokens=[emp.qr_token for emp in employees],
+        date_from=date_from,
+        date_to=today,
+    )
+
+
+def _get(client: Client, path: str, **params) -> bytes:
+    response = client.get(path, params)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {path} -> {response.status_code}")
+    # odpowiedzi strumieniowe (CSV) liczymy razem z wygenerowaniem całej treści
+    return b"".join(response.streaming_content) if response.streaming else response.content
+
+
+def build_cases(data: BenchData) -> list[BenchCase]:
+    client = Client(SERVER_NAME="localhost")
+    sample = data.employee_ids[:SAMPLE_EMPLOYEES]
+    sample_employees = list(Employee.objects.filter(id__in=sample))
+    report_range = {"from": str(data.date_from), "to": str(data.date_to)}
+    rnd = random.Random(0)
+
+    def report(source):
+        return lambda: build_attendance_report(date_from=data.date_from, date_to=data.date_to, source=source)
+
+    def scans():
+        for employee in sample_employees:
+            event_type = NEXT_ACTION[get_employee_state(employee).state]
+            register_event(employee=employee, event_type=event_type, device_id=DEVICE_ID)
+
+    cases = [
+        # ===== SERWISY =====
+        BenchCase("report.events", report("events"), setup=clear_report_cache),
+        BenchCase("report.summary.cold", report("summary"), setup=clear_report_cache),
+        BenchCase("report.summary.warm", report("summary")),
+        BenchCase("live_dashboard", get_live_dashboard),
+        BenchCase("employee_state", lambda: [get_employee_state(employee) for employee in sample_employees]),
+        BenchCase("register_event", scans),
+
+        # ===== API =====
+        BenchCase(
+            "api.tablet_status",
+            lambda: _get(client, "/api/tablet/status/", qr=rnd.choice(data.qr_tokens), device=DEVICE_ID),
+        ),
+        BenchCase("api.report_json", lambda: _get(client, "/api/admin/reports/attendance/", **report_range),
+                  setup=clear_report_cache),
+        BenchCase("api.report_csv", lambda: _get(client, "/api/admin/reports/attendance.csv/", **report_range),
+                  setup=clear_report_cache),
+        BenchCase("api.schedules", lambda: _get(client, "/api/admin/schedules/", **report_range)),
+        BenchCase("api.live_panel", lambda: _get(client, "/api/admin-panel/live/")),
+    ]
+
+    if importlib.util.find_spec("numpy") is not None:
+        cases.insert(1, BenchCase("report.numpy", report("numpy"), setup=clear_report_cache))
+    return cases
+
+
+def measure(case: BenchCase, repeat: int = 5) -> dict[str, Any]:
+    """
+    Czas i liczba zapytań z `repeat` przebiegów, szczytowa pamięć z jednego dodatkowego.
+    """
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            case.run()
+            timings.append(time.perf_counter() - started)
+        queries.append(len(ctx))
+
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_ms": {
+            "min": round(min(timings) * 1000, 3),
+            "median": round(statistics.median(timings) * 1000, 3),
+            "max": round(max(timings) * 1000, 3),
+        },
+        "queries": max(queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_suite(
+        size: BenchSize, *, repeat: int = 5, seed: int = 1, only: list[str] | None = None,
+        progress: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Zasiewa dane i mierzy wszystkie przypadki (albo tylko `only` – prefiksy nazw).
+    Baza musi być pusta / tymczasowa – benchmark zapisuje zdarzenia.
+    """
+    data = seed_dataset(size, seed)
+    results = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "localhost"]):
+        for case in build_cases(data):
+            if only and not any(case.name.startswith(prefix) for prefix in only):
+                continue
+            results[case.name] = measure(case, repeat)
+            if progress:
+                progress(case.name, results[case.name])
+
+    return {
+        "format": FORMAT_VERSION,
+        "meta": {
+            "size": asdict(size),
+            "seed": seed,
+            "repeat": repeat,
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current: dict[str, Any], baseline: dict[str, Any], *, tolerance: float = 0.2) -> list[dict]:
+    """
+    Regresje względem baseline: mediana czasu lub pamięć większa o ponad `tolerance`
+    (ułamek) i ponad próg szumu, albo więcej zapytań SQL. Przypadki spoza baseline są pomijane.
+    """
+    if baseline.get("format") != current.get("format"):
+        raise ValueError("Baseline has a different format version.")
+    if baseline["meta"]["size"] != current["meta"]["size"]:
+        raise ValueError(f"Baseline was recorded for size {baseline['meta']['size']}.")
+
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+
+        checks = (
+            ("wall_ms.median", base["wall_ms"]["median"], result["wall_ms"]["median"], tolerance, MIN_DELTA_MS),
+            ("peak_kib", base["peak_kib"], result["peak_kib"], tolerance, MIN_DELTA_KIB),
+            ("queries", base["queries"], result["queries"], 0, 0),
+        )
+        for metric, before, after, allowed, min_delta in checks:
+            if after > before * (1 + allowed) and after - before > min_delta:
+                regressions.append({"case": name, "metric": metric, "baseline": before, "current": after})
+    return regressions
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable
+
+from time_tracking.models import DailyAttendance, TimeEvent, WorkSchedule
+from time_tracking.services.event_archive import iter_archived_days, with_archived
+from time_tracking.services.report_cache import invalidate_days
+from time_tracking.services.report_service import compute_day_facts
+from time_tracking.services.schedule_resolver import load_effective_schedules
+
+# Ile par (pracownik, dzień) przeliczamy jednym zestawem zapytań
+REFRESH_BATCH_SIZE = 2000
+
+# Przebudowa idzie oknami, żeby nie trzymać całego roku w pamięci
+WINDOW_DAYS = 31
+
+
+def refresh_daily_attendance(days: Iterable[tuple[int, date]]) -> None:
+    """
+    Przelicza wiersze DailyAttendance dla podanych par (employee_id, dzień).
+
+    Wywoływane z sygnałów TimeEvent / WorkSchedule (a więc w tej samej transakcji co zmiana)
+    oraz z komendy rebuild_daily_attendance. Dzień bez zdarzeń i bez wyjątku w grafiku
+    (WorkSchedule) nie ma wiersza – także gdy obowiązuje w nim wzorzec zmian.
+    Przeliczone dni są też usuwane z cache raportów.
+    """
+    pairs = sorted(set(days))
+    invalidate_days(pairs)
+    for i in range(0, len(pairs), REFRESH_BATCH_SIZE):
+        _refresh_batch(pairs[i:i + REFRESH_BATCH_SIZE])
+
+
+def _refresh_batch(pairs: list[tuple[int, date]]) -> None:
+    employee_ids = {employee_id for employee_id, _ in pairs}
+    d_from = min(d for _, d in pairs)
+    d_to = max(d for _, d in pairs)
+
+    schedules = load_effective_schedules(employee_ids, d_from, d_to)
+
+    events: dict[tuple[int, date], list[TimeEvent]] = {}
+    events_qs = TimeEvent.objects.filter(
+        employee_id__in=employee_ids,
+        local_date__gte=d_from,
+        local_date__lte=d_to,
+    ).order_by("timestamp", "id")
+    for ev in with_archived(list(events_qs), employee_ids, d_from, d_to):
+        events.setdefault((ev.employee_id, ev.local_date), []).append(ev)
+
+    to_save: list[DailyAttendance] = []
+    to_delete: set[tuple[int, date]] = set()
+
+    for employee_id, d in pairs:
+        day_events = events.get((employee_id, d), [])
+
+        # dni z samego wzorca zmian nie są materializowane – raport liczy je z wzorca
+        if schedules.exception(employee_id, d) is None and not day_events:
+            to_delete.add((employee_id, d))
+            continue
+
+        facts = compute_day_facts(d, schedules.get(employee_id, d), day_events)
+        to_save.append(DailyAttendance(employee_id=employee_id, date=d, **facts))
+
+    if to_delete:
+        existing = DailyAttendance.objects.filter(
+            employee_id__in={employee_id for employee_id, _ in to_delete},
+            date__gte=d_from,
+            date__lte=d_to,
+        ).values_list("id", "employee_id", "date")
+        ids = [row_id for row_id, employee_id, d in existing if (employee_id, d) in to_delete]
+        if ids:
+            DailyAttendance.objects.filter(id__in=ids).delete()
+
+    if to_save:
+        DailyAttendance.objects.bulk_create(
+            to_save,
+            update_conflicts=True,
+            unique_fields=["employee", "date"],
+            update_fields=[*DailyAttendance.FACT_FIELDS, "updated_at"],
+        )
+
+
+def iter_windows(date_from: date, date_to: date):
+    cur = date_from
+    while cur <= date_to:
+        end = min(cur + timedelta(days=WINDOW_DAYS - 1), date_to)
+        yield cur, end
+        cur = end + timedelta(days=1)
+
+
+def rebuild_daily_attendance(date_from: date, date_to: date, employee_id: int | None = None) -> int:
+    """
+    Przebudowuje DailyAttendance w zakresie dat (oknami po WINDOW_DAYS dni);
+    zwraca liczbę przeliczonych par (pracownik, dzień).
+    """
+    rebuilt = 0
+    for w_from, w_to in iter_windows(date_from, date_to):
+        rebuilt += _rebuild_window(w_from, w_to, employee_id)
+    return rebuilt
+
+
+def _rebuild_window(date_from: date, date_to: date, employee_id: int | None) -> int:
+    filters = {}
+    if employee_id is not None:
+        filters["employee_id"] = employee_id
+
+    # wszystkie dni z grafikiem lub zdarzeniami + dni, które mają dziś wiersz (mogą być do usunięcia)
+    days = set(
+        WorkSchedule.objects.filter(date__gte=date_from, date__lte=date_to, **filters)
+        .values_list("employee_id", "date")
+    )
+    days.update(
+        TimeEvent.objects.filter(local_date__gte=date_from, local_date__lte=date_to, **filters)
+        .values_list("employee_id", "local_date")
+        .distinct()
+    )
+    days.update(
+        (emp_id, d) for emp_id, d in iter_archived_days(date_from, date_to)
+        if employee_id is None or emp_id == employee_id
+    )
+    days.update(
+        DailyAttendance.objects.filter(date__gte=date_from, date__lte=date_to, **filters)
+        .values_list("employee_id", "date")
+    )
+
+    refresh_daily_attendance(days)
+    return len(days)
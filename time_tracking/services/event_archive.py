@@ -0,0 +1,364 @@
+"""
+Archiwum zamkniętych miesięcy TimeEvent w plikach segmentów.
+
+Jeden plik na miesiąc (events-YYYY-MM.seg), niemodyfikowalny – dopisanie zdarzeń
+do zarchiwizowanego miesiąca tworzy nowy plik i podmienia stary (os.replace).
+
+Układ pliku:
+    nagłówek   MAGIC, wersja, liczba wpisów indeksu
+    indeks     (employee_id, dzień miesiąca, offset, długość) posortowany po pracowniku i dniu
+    dane       bloki zlib – jeden blok = zdarzenia jednego pracownika z jednego dnia
+               (liczba zdarzeń, rekordy stałej długości, teksty anomaly_reason)
+
+Czytnik mapuje plik w pamięci (mmap) i rozpakowuje tylko potrzebne bloki.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from time_tracking.models import TimeEvent
+
+MAGIC = b"TTEVSEG1"
+# 2: blok z liczbą zdarzeń, flagą anomalii i anomaly_reason; segmenty w wersji 1 są nadal
+# czytane (bez anomalii), a dopisanie do miesiąca zapisuje je od nowa w bieżącej wersji
+VERSION = 2
+READABLE_VERSIONS = (1, VERSION)
+
+_HEADER = struct.Struct("<8sII")
+# employee_id, dzień miesiąca, offset bloku (od początku danych), długość bloku
+_ENTRY = struct.Struct("<IBQI")
+# liczba zdarzeń w bloku
+_BLOCK_HEADER = struct.Struct("<I")
+# timestamp (µs od epoki, UTC), id, device_id, sequence, typ zdarzenia (| _ANOMALY_FLAG),
+# długość anomaly_reason (UTF-8) – same teksty leżą w bloku za rekordami
+_RECORD = struct.Struct("<qQIIBH")
+_ANOMALY_FLAG = 0x80
+# wersja 1: blok to same rekordy (timestamp, id, device_id, sequence, typ zdarzenia)
+_RECORD_V1 = struct.Struct("<qQIIB")
+
+EVENT_TYPES = (TimeEvent.CHECK_IN, TimeEvent.CHECK_OUT, TimeEvent.BREAK_START, TimeEvent.BREAK_END)
+_EVENT_TYPE_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def get_archive_dir() -> Path:
+    return Path(getattr(settings, "EVENT_ARCHIVE_DIR", settings.BASE_DIR / "archive"))
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def next_month(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def previous_month(d: date) -> date:
+    return (month_start(d) - timedelta(days=1)).replace(day=1)
+
+
+def segment_path(month: date) -> Path:
+    return get_archive_dir() / f"events-{month:%Y-%m}.seg"
+
+
+# ===== ZAPIS =====
+
+def _to_us(ts: datetime) -> int:
+    delta = ts - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _pack_block(day_events: list[TimeEvent]) -> bytes:
+    records = [_BLOCK_HEADER.pack(len(day_events))]
+    reasons = []
+    for ev in day_events:
+        type_code = _EVENT_TYPE_CODES[ev.event_type] | (_ANOMALY_FLAG if ev.is_anomaly else 0)
+        reason = (ev.anomaly_reason or "").encode()
+        records.append(_RECORD.pack(_to_us(ev.timestamp), ev.id, ev.device_id, ev.sequence, type_code, len(reason)))
+        reasons.append(reason)
+    return b"".join(records + reasons)
+
+
+def write_segment(month: date, events: Iterable[TimeEvent]) -> int:
+    """
+    Zapisuje zdarzenia jednego miesiąca (wg local_date) do nowego pliku segmentu.
+    Zwraca liczbę zapisanych zdarzeń.
+    """
+    blocks: dict[tuple[int, int], list[TimeEvent]] = {}
+    count = 0
+    for ev in sorted(events, key=lambda e: (e.employee_id, e.local_date, e.timestamp, e.id)):
+        if month_start(ev.local_date) != month:
+            raise ArchiveError(f"Event {ev.id} ({ev.local_date}) is outside {month:%Y-%m}")
+        blocks.setdefault((ev.employee_id, ev.local_date.day), []).append(ev)
+        count += 1
+
+    index = []
+    data = []
+    offset = 0
+    for (employee_id, day), day_events in sorted(blocks.items()):
+        block = zlib.compress(_pack_block(day_events), 9)
+        index.append(_ENTRY.pack(employee_id, day, offset, len(block)))
+        data.append(block)
+        offset += len(block)
+
+    path = segment_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".seg.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, VERSION, len(index)))
+        fh.writelines(index)
+        fh.writelines(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    # czytelnicy z otwartym mmap dalej widzą stary plik
+    os.replace(tmp, path)
+    return count
+
+
+# ===== ODCZYT =====
+
+class Segment:
+    """
+    Zmapowany w pamięci plik segmentu z indeksem {employee_id: {dzień: (offset, długość)}}.
+    """
+
+    def __init__(self, path: Path, month: date):
+        self.path = path
+        self.month = month
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, entries = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ArchiveError(f"{path} is not an event segment")
+        if version not in READABLE_VERSIONS:
+            raise ArchiveError(f"{path}: unsupported segment version {version}")
+        self.version = version
+
+        self._data_start = _HEADER.size + entries * _ENTRY.size
+        self.index: dict[int, dict[int, tuple[int, int]]] = {}
+        for employee_id, day, offset, length in _ENTRY.iter_unpack(self._mm[_HEADER.size:self._data_start]):
+            self.index.setdefault(employee_id, {})[day] = (offset, length)
+
+    def day_events(self, employee_id: int, day: int) -> list[TimeEvent]:
+        entry = self.index.get(employee_id, {}).get(day)
+        if entry is None:
+            return []
+
+        offset, length = entry
+        start = self._data_start + offset
+        raw = zlib.decompress(self._mm[start:start + length])
+        if self.version == 1:
+            return self._day_events_v1(employee_id, day, raw)
+        (count,) = _BLOCK_HEADER.unpack_from(raw, 0)
+        records_end = _BLOCK_HEADER.size + count * _RECORD.size
+        reason_pos = records_end
+        local_date = self.month.replace(day=day)
+
+        events = []
+        for ts_us, event_id, device_id, sequence, type_code, reason_len in _RECORD.iter_unpack(
+                raw[_BLOCK_HEADER.size:records_end]
+        ):
+            reason = raw[reason_pos:reason_pos + reason_len].decode()
+            reason_pos += reason_len
+            events.append(TimeEvent(
+                id=event_id,
+                employee_id=employee_id,
+                device_id=device_id,
+                event_type=EVENT_TYPES[type_code & ~_ANOMALY_FLAG],
+                timestamp=_EPOCH + timedelta(microseconds=ts_us),
+                local_date=local_date,
+                sequence=sequence,
+                is_anomaly=bool(type_code & _ANOMALY_FLAG),
+                anomaly_reason=reason,
+            ))
+        return events
+
+    def _day_events_v1(self, employee_id: int, day: int, raw: bytes) -> list[TimeEvent]:
+        local_date = self.month.replace(day=day)
+        return [
+            TimeEvent(
+                id=event_id,
+                employee_id=employee_id,
+                device_id=device_id,
+                event_type=EVENT_TYPES[type_code],
+                timestamp=_EPOCH + timedelta(microseconds=ts_us),
+                local_date=local_date,
+                sequence=sequence,
+            )
+            for ts_us, event_id, device_id, sequence, type_code in _RECORD_V1.iter_unpack(raw)
+        ]
+
+    def all_events(self) -> Iterator[TimeEvent]:
+        for employee_id, days in self.index.items():
+            for day in sorted(days):
+                yield from self.day_events(employee_id, day)
+
+    def count(self) -> int:
+        total = 0
+        for days in self.index.values():
+            for offset, length in days.values():
+                start = self._data_start + offset
+                raw = zlib.decompress(self._mm[start:start + length])
+                total += len(raw) // _RECORD_V1.size if self.version == 1 else _BLOCK_HEADER.unpack_from(raw)[0]
+        return total
+
+
+_segments: dict[Path, tuple[tuple[int, int], Segment]] = {}
+_segments_lock = threading.Lock()
+
+
+def open_segment(month: date) -> Segment | None:
+    """
+    Segment miesiąca albo None. Otwarte segmenty są trzymane w procesie;
+    podmieniony plik (inny inode / mtime) jest otwierany od nowa.
+    """
+    path = segment_path(month)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+
+    version = (st.st_ino, st.st_mtime_ns)
+    with _segments_lock:
+        cached = _segments.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        segment = Segment(path, month)
+        # starego mmap nie zamykamy – może go jeszcze czytać inny wątek
+        _segments[path] = (version, segment)
+        return segment
+
+
+def iter_archived_events(employee_ids: Iterable[int], date_from: date, date_to: date) -> Iterator[TimeEvent]:
+    """
+    Zarchiwizowane zdarzenia pracowników z zakresu dat (wg local_date).
+    Miesiące bez pliku segmentu są pomijane bez dotykania dysku poza stat().
+    """
+    employee_ids = list(employee_ids)
+    month = month_start(date_from)
+    while month <= date_to:
+        segment = open_segment(month)
+        if segment is not None:
+            first_day = date_from.day if month == month_start(date_from) else 1
+            last_day = date_to.day if month == month_start(date_to) else 31
+            for employee_id in employee_ids:
+                for day in sorted(segment.index.get(employee_id, {})):
+                    if first_day <= day <= last_day:
+                        yield from segment.day_events(employee_id, day)
+        month = next_month(month)
+
+
+def iter_archived_days(date_from: date, date_to: date) -> Iterator[tuple[int, date]]:
+    """
+    Pary (employee_id, dzień) z zarchiwizowanymi zdarzeniami – z samego indeksu, bez rozpakowywania.
+    """
+    month = month_start(date_from)
+    while month <= date_to:
+        segment = open_segment(month)
+        if segment is not None:
+            for employee_id, days in segment.index.items():
+                for day in days:
+                    d = month.replace(day=day)
+                    if date_from <= d <= date_to:
+                        yield employee_id, d
+        month = next_month(month)
+
+
+def with_archived(
+        events: list[TimeEvent], employee_ids: Iterable[int], date_from: date, date_to: date
+) -> list[TimeEvent]:
+    """
+    Dokłada do zdarzeń z bazy zarchiwizowane z tego samego zakresu i sortuje po (timestamp, id).
+    Zdarzenie obecne i w bazie, i w segmencie (przerwana archiwizacja) liczone jest raz.
+    """
+    hot_ids = {ev.id for ev in events}
+    archived = [ev for ev in iter_archived_events(employee_ids, date_from, date_to) if ev.id not in hot_ids]
+    if not archived:
+        return events
+    return sorted(events + archived, key=lambda ev: (ev.timestamp, ev.id))
+
+
+def archived_months() -> list[date]:
+    months = []
+    for path in sorted(get_archive_dir().glob("events-*.seg")):
+        try:
+            months.append(datetime.strptime(path.stem, "events-%Y-%m").date())
+        except ValueError:
+            continue
+    return months
+
+
+def delete_segments() -> int:
+    """
+    Usuwa wszystkie pliki segmentów (czyszczenie danych) – zdarzenia archiwum mają id
+    pracowników, które po wyczyszczeniu bazy dostaną nowi pracownicy. Zwraca liczbę plików.
+    """
+    paths = [*get_archive_dir().glob("events-*.seg"), *get_archive_dir().glob("events-*.seg.tmp")]
+    for path in paths:
+        path.unlink(missing_ok=True)
+    with _segments_lock:
+        _segments.clear()
+    return len(paths)
+
+
+# ===== ARCHIWIZACJA =====
+
+# ile id w jednym DELETE (limit parametrów SQLite)
+_DELETE_CHUNK = 500
+
+
+def archive_month(month: date) -> int:
+    """
+    Przenosi zdarzenia miesiąca z TimeEvent do pliku segmentu i usuwa je z tabeli.
+    Zdarzenia dopisane do już zarchiwizowanego miesiąca łączone są z istniejącym segmentem.
+
+    Podsumowania DailyAttendance zostają bez zmian – raporty z tabeli podsumowań nie
+    potrzebują zdarzeń; źródło "events" i przeliczenia czytają segment (with_archived).
+    Zwraca liczbę przeniesionych zdarzeń.
+    """
+    with transaction.atomic():
+        hot = list(
+            TimeEvent.objects
+            .filter(local_date__gte=month, local_date__lt=next_month(month))
+            .only(
+                "id", "employee_id", "device_id", "event_type", "timestamp", "local_date", "sequence",
+                "is_anomaly", "anomaly_reason",
+            )
+        )
+        if not hot:
+            return 0
+
+        hot_ids = {ev.id for ev in hot}
+        existing = open_segment(month)
+        archived = [ev for ev in existing.all_events() if ev.id not in hot_ids] if existing else []
+
+        expected = write_segment(month, archived + hot)
+        if open_segment(month).count() != expected:
+            raise ArchiveError(f"Segment {month:%Y-%m} failed verification")
+
+        # po id, nie po zakresie dat – zdarzenie dopisane w międzyczasie zostaje w tabeli;
+        # surowy DELETE bez sygnałów: podsumowania dni się nie zmieniają
+        ids = sorted(hot_ids)
+        table = connection.ops.quote_name(TimeEvent._meta.db_table)
+        with connection.cursor() as cursor:
+            for i in range(0, len(ids), _DELETE_CHUNK):
+                chunk = ids[i:i + _DELETE_CHUNK]
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+    return len(hot)
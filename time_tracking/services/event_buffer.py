@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from time_tracking.models import TimeEvent
+from time_tracking.services.daily_attendance import refresh_daily_attendance
+from time_tracking.services.write_lane import write_lane
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def write_behind_enabled() -> bool:
+    return bool(getattr(settings, "EVENT_WRITE_BEHIND", False))
+
+
+def after_bulk_insert(events) -> None:
+    """
+    bulk_create pomija sygnały – przeliczamy DailyAttendance i panel live ręcznie.
+    """
+    # import lokalny: live_feed -> live_dashboard -> tablet_state -> event_buffer
+    from time_tracking.services.live_feed import live_feed
+
+    refresh_daily_attendance({(ev.employee_id, ev.local_date) for ev in events})
+
+    today = timezone.localdate()
+    employee_ids = {ev.employee_id for ev in events if ev.local_date == today}
+    if employee_ids:
+        transaction.on_commit(lambda: live_feed.notify_employees(employee_ids))
+
+
+def _to_record(ev: TimeEvent) -> dict:
+    return {
+        "employee_id": ev.employee_id,
+        "device_id": ev.device_id,
+        "event_type": ev.event_type,
+        "timestamp": ev.timestamp.isoformat(),
+        "local_date": ev.local_date.isoformat(),
+        "sequence": ev.sequence,
+    }
+
+
+def _from_record(record: dict) -> TimeEvent:
+    return TimeEvent(
+        employee_id=record["employee_id"],
+        device_id=record["device_id"],
+        event_type=record["event_type"],
+        timestamp=parse_datetime(record["timestamp"]),
+        local_date=parse_date(record["local_date"]),
+        sequence=record["sequence"],
+    )
+
+
+def _try_lock(fh) -> bool:
+    """
+    Nieblokująca blokada wyłączna pliku; zwalniana przy zamknięciu pliku (także po awarii procesu).
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _event_identity(ev: TimeEvent) -> tuple:
+    # timestamp nadaje serwer (z mikrosekundami) – to samo zdarzenie, niezależnie od numeru sekwencji
+    return ev.employee_id, ev.event_type, ev.timestamp
+
+
+class EventBuffer:
+    """
+    Write-behind dla zdarzeń z tabletów (EVENT_WRITE_BEHIND).
+
+    Zwalidowane zdarzenie trafia do dziennika (plik JSON lines, fsync) i do bufora w pamięci,
+    a tablet dostaje odpowiedź od razu. Wątek flushera co EVENT_FLUSH_INTERVAL_MS
+    (lub po EVENT_FLUSH_MAX_EVENTS zdarzeniach) zapisuje bufor jednym bulk_create.
+
+    Odczyt stanu łączy bazę z buforem (pending_for). Po awarii recover() odtwarza dziennik –
+    zdarzenia już zapisane (ten sam pracownik, typ i czas) są pomijane.
+
+    Bufor jest widoczny tylko w swoim procesie, więc dziennik jest blokowany na wyłączność:
+    drugi proces (np. kolejny worker) dostaje ImproperlyConfigured zamiast po cichu
+    przyjmować skany bez wiedzy o zdarzeniach pierwszego.
+    """
+
+    def __init__(self):
+        self.registration_lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: list[TimeEvent] = []
+        self._journal = None
+        self._journal_path: Path | None = None
+        self._lock_file = None
+        self._lock_path: Path | None = None
+        self._wakeup = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    # ===== KONFIGURACJA =====
+
+    @staticmethod
+    def _get_journal_path() -> Path:
+        return Path(getattr(settings, "EVENT_JOURNAL_PATH", settings.BASE_DIR / "event-journal.jsonl"))
+
+    @staticmethod
+    def _get_flush_interval() -> float:
+        return int(getattr(settings, "EVENT_FLUSH_INTERVAL_MS", 200)) / 1000
+
+    @staticmethod
+    def _get_flush_max_events() -> int:
+        return int(getattr(settings, "EVENT_FLUSH_MAX_EVENTS", 100))
+
+    def _ensure_started(self) -> None:
+        path = self._get_journal_path()
+        if self._journal_path == path:
+            return
+
+        # pierwszy zapis w procesie (albo zmiana ścieżki) – najpierw odtwarzamy poprzedni dziennik
+        with self._lock:
+            self._close_journal()
+        self.recover()
+        with self._lock:
+            self._journal = open(path, "a", encoding="utf-8")
+            self._journal_path = path
+
+        if self._get_flush_interval() > 0 and self._flusher is None:
+            self._flusher = threading.Thread(target=self._run_flusher, name="event-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = None
+        self._journal_path = None
+
+    def _acquire_journal(self, path: Path) -> None:
+        """
+        Blokuje dziennik na wyłączność procesu (plik <dziennik>.lock z pid właściciela).
+        """
+        if self._lock_path == path:
+            return
+        self._release_journal()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(path.with_name(path.name + ".lock"), "a+", encoding="utf-8")
+        if not _try_lock(lock_file):
+            lock_file.seek(0)
+            owner = lock_file.read().strip() or "?"
+            lock_file.close()
+            raise ImproperlyConfigured(
+                f"Event journal {path} is locked by process {owner}: EVENT_WRITE_BEHIND requires "
+                f"a single process accepting tablet events."
+            )
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+        self._lock_path = path
+
+    def _release_journal(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+        self._lock_file = None
+        self._lock_path = None
+
+    # ===== ZAPIS =====
+
+    def append(self, event: TimeEvent) -> None:
+        """
+        Zapisuje zdarzenie w dzienniku (trwale) i w buforze. Wołać pod registration_lock.
+        """
+        self._ensure_started()
+        line = json.dumps(_to_record(event)) + "\n"
+
+        with self._lock:
+            self._journal.write(line)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pending.append(event)
+            full = len(self._pending) >= self._get_flush_max_events()
+
+        if full:
+            if self._flusher is None:
+                self.flush()
+            else:
+                self._wakeup.set()
+
+    def pending_for(self, employee_id: int, day) -> list[TimeEvent]:
+        with self._lock:
+            return [ev for ev in self._pending if ev.employee_id == employee_id and ev.local_date == day]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ===== FLUSH =====
+
+    def flush(self) -> int:
+        """
+        Zapisuje bufor do bazy; zwraca liczbę zapisanych zdarzeń.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+
+            self._insert(batch)
+
+            # zdarzenia znikają z bufora dopiero po commicie (także zewnętrznej transakcji),
+            # więc odczyt stanu zawsze je widzi, a wycofany zapis zostaje w buforze
+            transaction.on_commit(lambda: self._forget(batch))
+            return len(batch)
+
+    def _forget(self, batch: list[TimeEvent]) -> None:
+        flushed = {id(ev) for ev in batch}
+        with self._lock:
+            self._pending = [ev for ev in self._pending if id(ev) not in flushed]
+            self._rewrite_journal()
+
+    def recover(self) -> int:
+        """
+        Odtwarza zdarzenia z dziennika, który nie został opróżniony (np. po awarii procesu);
+        zwraca liczbę zdarzeń dopisanych do bazy.
+
+        Wymaga blokady dziennika – przy działającym procesie z write-behind rzuca ImproperlyConfigured.
+        """
+        path = self._get_journal_path()
+        self._acquire_journal(path)
+        if not path.exists():
+            return 0
+
+        events = []
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    events.append(_from_record(json.loads(line)))
+                except (ValueError, KeyError):
+                    # urwany ostatni wpis – zdarzenie nie zostało potwierdzone tabletowi
+                    continue
+
+        with self._flush_lock:
+            replayed = self._replay(events) if events else 0
+            if not self._pending:
+                path.write_text("", encoding="utf-8")
+        return replayed
+
+    def discard(self) -> int:
+        """
+        Porzuca niezapisane zdarzenia (bufor i dziennik) bez zapisu do bazy – czyszczenie danych.
+        Zwraca liczbę porzuconych zdarzeń z bufora. Jak recover() wymaga blokady dziennika.
+        """
+        path = self._get_journal_path()
+        self._acquire_journal(path)
+        with self._flush_lock, self._lock:
+            discarded = len(self._pending)
+            self._pending.clear()
+            if self._journal is not None:
+                self._rewrite_journal()
+            elif path.exists():
+                path.write_text("", encoding="utf-8")
+        return discarded
+
+    def _replay(self, events: list[TimeEvent]) -> int:
+        with write_lane(), transaction.atomic():
+            stored = {
+                _event_identity(ev)
+                for ev in self._day_events_qs(events).only("employee_id", "event_type", "timestamp")
+            }
+            missing = [ev for ev in events if _event_identity(ev) not in stored]
+            if missing:
+                self._insert(missing)
+        return len(missing)
+
+    @staticmethod
+    def _day_events_qs(events: list[TimeEvent]):
+        return TimeEvent.objects.filter(
+            employee_id__in={ev.employee_id for ev in events},
+            local_date__in={ev.local_date for ev in events},
+        )
+
+    def _insert(self, events: list[TimeEvent]) -> None:
+        with write_lane(), transaction.atomic():
+            self._renumber_taken(events)
+            TimeEvent.objects.bulk_create(events)
+            after_bulk_insert(events)
+
+    def _renumber_taken(self, events: list[TimeEvent]) -> None:
+        """
+        Zdarzenie, którego numer sekwencji zajął w międzyczasie zapis spoza bufora (np. admin),
+        dostaje kolejny wolny numer dnia – potwierdzone zdarzenie nie może przepaść.
+        """
+        keys = {(ev.employee_id, ev.local_date) for ev in events}
+        taken = defaultdict(set)
+        for employee_id, day, sequence in self._day_events_qs(events).values_list(
+                "employee_id", "local_date", "sequence"
+        ):
+            if (employee_id, day) in keys:
+                taken[(employee_id, day)].add(sequence)
+
+        used = defaultdict(set)
+        for ev in events:
+            used[(ev.employee_id, ev.local_date)].add(ev.sequence)
+
+        for ev in events:
+            key = (ev.employee_id, ev.local_date)
+            if ev.sequence not in taken[key]:
+                continue
+            sequence = max(taken[key] | used[key]) + 1
+            logger.warning(
+                "Event sequence %s of employee %s on %s already taken, renumbered to %s",
+                ev.sequence, ev.employee_id, ev.local_date, sequence,
+            )
+            ev.sequence = sequence
+            used[key].add(sequence)
+
+    def _rewrite_journal(self) -> None:
+        # w dzienniku zostaje tylko to, co nadal czeka w buforze
+        if self._journal is None:
+            return
+        self._journal.seek(0)
+        self._journal.truncate()
+        for ev in self._pending:
+            self._journal.write(json.dumps(_to_record(ev)) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _run_flusher(self) -> None:
+        while True:
+            self._wakeup.wait(self._get_flush_interval())
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                # baza chwilowo niedostępna – zdarzenia czekają w buforze i dzienniku
+                logger.exception("Event buffer flush failed")
+
+    def reset(self) -> None:
+        """
+        Czyści bufor bez zapisu (testy).
+        """
+        with self._lock:
+            self._pending.clear()
+            self._close_journal()
+            self._release_journal()
+
+
+event_buffer = EventBuffer()
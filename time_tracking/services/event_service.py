@@ -1,64 +1,259 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
 from time_tracking.models import TimeEvent
-from core.models import Device
-from time_tracking.services.tablet_state import get_employee_state
+from time_tracking.services.event_buffer import after_bulk_insert, event_buffer, write_behind_enabled
+from time_tracking.services.lookup_cache import get_device, get_employee_by_qr
+from time_tracking.services.metrics import REGISTER_EVENT_SECONDS, REGISTER_EVENTS
+from time_tracking.services.tablet_state import compute_employee_state, load_day_events
+from time_tracking.services.write_lane import write_lane
+
+# event_type -> (stany, w których wolno, komunikat odmowy, komunikat sukcesu, stan po zdarzeniu)
+TRANSITIONS = {
+    TimeEvent.CHECK_IN: ({"OFF_DUTY"}, "Praca już rozpoczęta", "Rozpoczęto pracę", "WORKING"),
+    TimeEvent.BREAK_START: ({"WORKING"}, "Nie można rozpocząć przerwy", "Rozpoczęto przerwę", "ON_BREAK"),
+    TimeEvent.BREAK_END: ({"ON_BREAK"}, "Nie ma aktywnej przerwy", "Zakończono przerwę", "WORKING"),
+    TimeEvent.CHECK_OUT: ({"WORKING", "ON_BREAK"}, "Nie pracujesz", "Zakończono pracę", "OFF_DUTY"),
+}
+
+UNKNOWN_EVENT_TYPE = "Nieznany typ zdarzenia"
+
+
+def check_transition(state, event_type):
+    """
+    Zwraca (czy_wolno, komunikat) dla zdarzenia w danym stanie pracownika.
+    """
+    if event_type not in TRANSITIONS:
+        return False, UNKNOWN_EVENT_TYPE
+
+    allowed, rejected_message, accepted_message, _ = TRANSITIONS[event_type]
+    if state not in allowed:
+        return False, rejected_message
+    return True, accepted_message
+
+
+CONFLICT_MESSAGE = "Równoczesny zapis – spróbuj ponownie"
+
+
+def _get_register_attempts():
+    return int(getattr(settings, "EVENT_REGISTER_MAX_ATTEMPTS", 5))
+
+
+def _retry_on_sequence_conflict(func, *args):
+    """
+    Optimistic concurrency per pracownik: stan i numer sekwencji liczone są z jednego
+    odczytu zdarzeń dnia, a zapis dostaje sequence = ostatni + 1. Jeśli inny worker
+    zdążył zapisać zdarzenie tego pracownika, unikalność (employee, local_date, sequence)
+    odrzuca insert – wtedy stan jest liczony od nowa (np. drugi CHECK_IN zostaje odrzucony).
+
+    Różni pracownicy nie dzielą żadnego locka, więc nie blokują się nawzajem.
+    """
+    for _ in range(_get_register_attempts()):
+        try:
+            with write_lane(), transaction.atomic():
+                return func(*args)
+        except IntegrityError:
+            continue
+    return None, CONFLICT_MESSAGE
+
+
+def _next_sequence(day_events):
+    return max((ev.sequence for ev in day_events), default=0) + 1
+
+
+def _outcome(accepted, message):
+    if accepted:
+        return "accepted"
+    return "conflict" if message == CONFLICT_MESSAGE else "rejected"
 
 
 def register_event(employee, event_type, device_id):
-    state = get_employee_state(employee)
+    with REGISTER_EVENT_SECONDS.time(mode="single"):
+        if write_behind_enabled():
+            # stan z bazy + bufora i dopisanie do bufora muszą być niepodzielne
+            with event_buffer.registration_lock:
+                event, message = _register_event(employee, event_type, device_id, buffered=True)
+        else:
+            # zapis zdarzenia i przeliczenie DailyAttendance (sygnał) w jednej transakcji
+            event, message = _retry_on_sequence_conflict(_register_event, employee, event_type, device_id)
+
+    REGISTER_EVENTS.inc(mode="single", outcome=_outcome(event is not None, message))
+    return event, message
+
+
+def _register_event(employee, event_type, device_id, buffered=False):
+    device = get_device(device_id)
+    if device is None:
+        return None, "Nieznane urządzenie"
+
     now = timezone.now()
+    day = timezone.localdate(now)
+    day_events = load_day_events(employee, day)
+    state = compute_employee_state(day_events, now=now)
+
+    ok, message = check_transition(state.state, event_type)
+    if not ok:
+        return None, message
 
+    event = TimeEvent(
+        employee=employee,
+        event_type=event_type,
+        device=device,
+        timestamp=now,
+        local_date=day,
+        sequence=_next_sequence(day_events),
+    )
+    if buffered:
+        # potwierdzenie po zapisie w dzienniku; do TimeEvent trafi z flushem bufora
+        event_buffer.append(event)
+    else:
+        event.save()
+    return event, message
+
+
+def _get_batch_max_events():
+    return int(getattr(settings, "TABLET_BATCH_MAX_EVENTS", 500))
+
+
+def _get_batch_clock_skew():
+    # o ile czas tabletu może wyprzedzać serwer
+    return timedelta(seconds=int(getattr(settings, "TABLET_BATCH_CLOCK_SKEW_SECONDS", 120)))
+
+
+def _parse_timestamp(value):
+    if not isinstance(value, str):
+        return None
     try:
-        device = Device.objects.get(device_id=device_id)
-    except Device.DoesNotExist:
+        ts = parse_datetime(value)
+    except ValueError:
+        return None
+    if ts is not None and timezone.is_naive(ts):
+        ts = timezone.make_aware(ts, timezone.get_current_timezone())
+    return ts
+
+
+def register_events_batch(device_id, items):
+    """
+    Rejestruje uporządkowaną listę zdarzeń z tabletu (np. po odzyskaniu sieci).
+
+    items: [{"qr": ..., "event_type": ..., "timestamp": ISO 8601 z tabletu}, ...]
+
+    Cała sekwencja walidowana jest w jednym przebiegu tą samą maszyną stanów co
+    register_event (stan startowy per pracownik i dzień z jednego zapytania), a przyjęte
+    zdarzenia zapisywane jednym bulk_create w jednej transakcji.
+
+    Zwraca (results, error); results = [{"index", "status": "accepted"|"rejected", "message"}].
+    """
+    with REGISTER_EVENT_SECONDS.time(mode="batch"):
+        if write_behind_enabled():
+            # paczka liczy stan z bazy – najpierw zapisujemy bufor
+            with event_buffer.registration_lock:
+                event_buffer.flush()
+                results, error = _retry_on_sequence_conflict(_register_events_batch, device_id, items)
+        else:
+            results, error = _retry_on_sequence_conflict(_register_events_batch, device_id, items)
+
+    if results is None:
+        # odrzucona cała paczka – liczymy każdą pozycję
+        REGISTER_EVENTS.inc(len(items), mode="batch", outcome=_outcome(False, error))
+    else:
+        outcomes = Counter(_outcome(result["status"] == "accepted", result["message"]) for result in results)
+        for outcome, count in outcomes.items():
+            REGISTER_EVENTS.inc(count, mode="batch", outcome=outcome)
+    return results, error
+
+
+def _register_events_batch(device_id, items):
+    if len(items) > _get_batch_max_events():
+        return None, f"Maksymalnie {_get_batch_max_events()} zdarzeń w paczce"
+
+    # klucze cache lookupów muszą być hashowalne – lista czy obiekt z JSON to po prostu zła wartość
+    device = get_device(device_id) if isinstance(device_id, str) else None
+    if device is None:
         return None, "Nieznane urządzenie"
 
-    # ===== CHECK IN =====
-    if event_type == TimeEvent.CHECK_IN:
-        if state.state != "OFF_DUTY":
-            return None, "Praca już rozpoczęta"
+    latest_allowed = timezone.now() + _get_batch_clock_skew()
+    results = [None] * len(items)
+    parsed = []
 
-        return TimeEvent.objects.create(
-            employee=employee,
-            event_type=TimeEvent.CHECK_IN,
-            device=device,
-            timestamp=now,
-        ), "Rozpoczęto pracę"
+    # ===== WALIDACJA POJEDYNCZYCH POZYCJI =====
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = ("rejected", "Brak danych")
+            continue
 
-    # ===== BREAK START /  =====
-    if event_type == TimeEvent.BREAK_START:
-        if state.state != "WORKING":
-            return None, "Nie można rozpocząć przerwy"
+        qr = item.get("qr")
+        employee = get_employee_by_qr(qr) if qr else None
+        event_type = item.get("event_type")
+        ts = _parse_timestamp(item.get("timestamp"))
 
-        return TimeEvent.objects.create(
-            employee=employee,
-            event_type=TimeEvent.BREAK_START,
-            device=device,
-            timestamp=now,
-        ), "Rozpoczęto przerwę"
+        if employee is None:
+            results[index] = ("rejected", "Nie znaleziono pracownika")
+        elif not isinstance(event_type, str) or event_type not in TRANSITIONS:
+            results[index] = ("rejected", UNKNOWN_EVENT_TYPE)
+        elif ts is None:
+            results[index] = ("rejected", "Nieprawidłowy czas zdarzenia")
+        elif ts > latest_allowed:
+            results[index] = ("rejected", "Czas zdarzenia z przyszłości")
+        else:
+            parsed.append((index, employee, event_type, ts, timezone.localdate(ts)))
 
-    # ===== BREAK END =====
-    if event_type == TimeEvent.BREAK_END:
-        if state.state != "ON_BREAK":
-            return None, "Nie ma aktywnej przerwy"
+    # ===== STAN STARTOWY (jedno zapytanie) =====
+    day_keys = {(employee.id, day) for _, employee, _, _, day in parsed}
+    existing = {}
+    if day_keys:
+        events_qs = TimeEvent.objects.filter(
+            employee_id__in={employee_id for employee_id, _ in day_keys},
+            local_date__in={day for _, day in day_keys},
+        ).order_by("timestamp", "id")
+        for ev in events_qs:
+            existing.setdefault((ev.employee_id, ev.local_date), []).append(ev)
 
-        return TimeEvent.objects.create(
-            employee=employee,
-            event_type=TimeEvent.BREAK_END,
-            device=device,
-            timestamp=now,
-        ), "Zakończono przerwę"
+    states = {}
+    last_seen = {}
+    sequences = {}
+    for key in day_keys:
+        day_events = existing.get(key, [])
+        states[key] = compute_employee_state(day_events).state
+        last_seen[key] = day_events[-1].timestamp if day_events else None
+        sequences[key] = _next_sequence(day_events)
 
-    # ===== CHECK OUT =====
-    if event_type == TimeEvent.CHECK_OUT:
-        if state.state not in ["WORKING", "ON_BREAK"]:
-            return None, "Nie pracujesz"
+    # ===== MASZYNA STANÓW =====
+    to_create = []
+    for index, employee, event_type, ts, day in parsed:
+        key = (employee.id, day)
 
-        return TimeEvent.objects.create(
+        if last_seen[key] is not None and ts < last_seen[key]:
+            results[index] = ("rejected", "Zdarzenie starsze niż ostatnie zarejestrowane")
+            continue
+
+        ok, message = check_transition(states[key], event_type)
+        results[index] = ("accepted" if ok else "rejected", message)
+        if not ok:
+            continue
+
+        states[key] = TRANSITIONS[event_type][3]
+        last_seen[key] = ts
+        to_create.append(TimeEvent(
             employee=employee,
-            event_type=TimeEvent.CHECK_OUT,
+            event_type=event_type,
             device=device,
-            timestamp=now,
-        ), "Zakończono pracę"
+            timestamp=ts,
+            local_date=day,
+            sequence=sequences[key],
+        ))
+        sequences[key] += 1
+
+    if to_create:
+        TimeEvent.objects.bulk_create(to_create)
+        after_bulk_insert(to_create)
 
-    return None, "Nieznany typ zdarzenia"
+    return [
+        {"index": index, "status": result_status, "message": message}
+        for index, (result_status, message) in enumerate(results)
+    ], None
@@ -0,0 +1,134 @@
+"""
+Klucze idempotencji POST-ów tabletu (nagłówek Idempotency-Key lub pole idempotency_key).
+
+Kroki wspólne dla IdempotentPostMixin (DRF) i widoku async: idempotency_scope() – zakres
+klucza z walidacją, get_stored_response() + replay() – zapisana odpowiedź albo 422 przy innej
+treści, execute_once() – obsługa żądania i zapis odpowiedzi w jednej transakcji write lane.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from time_tracking.models import IdempotencyKey
+from time_tracking.services.write_lane import write_lane
+
+MAX_KEY_LENGTH = 64
+MAX_DEVICE_ID_LENGTH = 64
+
+# zakres klucza: ten sam klucz na innym endpoincie albo z innego urządzenia to inne żądanie
+EVENT_ENDPOINT = "tablet-event"
+BATCH_ENDPOINT = "tablet-event-batch"
+
+# tylko wyniki przetworzenia, nie błędy danych wejściowych (klient może je poprawić)
+STORED_STATUSES = {200, 201}
+
+
+class InvalidIdempotencyKey(ValueError):
+    pass
+
+
+def _get_ttl():
+    return timedelta(hours=int(getattr(settings, "IDEMPOTENCY_KEY_TTL_HOURS", 24)))
+
+
+def request_hash(data):
+    """
+    Odcisk treści żądania (bez samego klucza) – kolejność pól i format JSON / formularz bez znaczenia.
+    """
+    if hasattr(data, "lists"):
+        data = {name: values[0] if len(values) == 1 else values for name, values in data.lists()}
+    payload = {name: value for name, value in data.items() if name != "idempotency_key"}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def idempotency_scope(endpoint, key, device_id):
+    """
+    Zakres klucza (endpoint, device_id, key) albo None, gdy nie ma czego zapamiętać – bez klucza
+    albo bez poprawnego urządzenia (takie żądanie i tak zostanie odrzucone).
+    Klucz, który nie jest napisem albo jest za długi: InvalidIdempotencyKey.
+    """
+    if not key or not isinstance(device_id, str) or not 0 < len(device_id) <= MAX_DEVICE_ID_LENGTH:
+        return None
+    if not isinstance(key, str) or len(key) > MAX_KEY_LENGTH:
+        raise InvalidIdempotencyKey("Nieprawidłowy klucz idempotencji")
+    return endpoint, device_id, key
+
+
+def replay(stored, body_hash):
+    """
+    (status, body, replayed) zapisanej odpowiedzi; klucz użyty z inną treścią żądania – 422.
+    """
+    response_status, body, stored_hash = stored
+    if stored_hash != body_hash:
+        return 422, {"message": "Klucz idempotencji użyty z inną treścią żądania"}, False
+    return response_status, body, True
+
+
+def _stored_response_qs(endpoint, device_id, key):
+    return (
+        IdempotencyKey.objects
+        .filter(endpoint=endpoint, device_id=device_id, key=key, expires_at__gt=timezone.now())
+        .values_list("response_status", "response_body", "request_hash")
+    )
+
+
+def get_stored_response(endpoint, device_id, key):
+    """
+    Zapisana odpowiedź (status, body, request_hash) dla klucza urządzenia albo None –
+    jedno zapytanie po indeksie. Inny request_hash niż bieżącego żądania to błąd klienta (422).
+    """
+    return _stored_response_qs(endpoint, device_id, key).first()
+
+
+async def aget_stored_response(endpoint, device_id, key):
+    return await _stored_response_qs(endpoint, device_id, key).afirst()
+
+
+def store_response(endpoint, device_id, key, body_hash, response_status, body):
+    """
+    Zapisuje odpowiedź pod kluczem. Wywoływać w transakcji razem z zapisem zdarzenia –
+    przy równoległym ponowieniu unikalny klucz rzuci IntegrityError i wycofa duplikat.
+    Wygasły wpis z tym samym kluczem jest nadpisywany.
+    """
+    now = timezone.now()
+    IdempotencyKey.objects.filter(endpoint=endpoint, device_id=device_id, key=key, expires_at__lte=now).delete()
+    IdempotencyKey.objects.create(
+        endpoint=endpoint,
+        device_id=device_id,
+        key=key,
+        request_hash=body_hash,
+        response_status=response_status,
+        response_body=body,
+        expires_at=now + _get_ttl(),
+    )
+
+
+def execute_once(scope, body_hash, handler, response_data):
+    """
+    Wywołuje handler() w write lane i transakcji razem z zapisem odpowiedzi pod kluczem
+    (response_data(wynik) -> (status, body), zapisywane tylko dla STORED_STATUSES).
+    Zwraca (wynik, None) albo (None, zapisana odpowiedź), gdy równoległe ponowienie
+    zdążyło pierwsze i nasz zapis został wycofany.
+    """
+    try:
+        with write_lane(), transaction.atomic():
+            result = handler()
+            response_status, body = response_data(result)
+            if scope and response_status in STORED_STATUSES:
+                store_response(*scope, body_hash, response_status, body)
+    except IntegrityError:
+        stored = get_stored_response(*scope) if scope else None
+        if stored is None:
+            raise
+        return None, stored
+    return result, None
+
+
+def purge_expired_keys():
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -4,7 +4,9 @@ from django.utils import timezone
 
 from core.models import Employee
 from time_tracking.models import TimeEvent, WorkSchedule
-from time_tracking.services.tablet_state import get_employee_state
+from time_tracking.services.metrics import DASHBOARD_SECONDS
+from time_tracking.services.schedule_resolver import load_effective_schedules
+from time_tracking.services.tablet_state import compute_employee_state
 
 STATUS_LABELS = {
     "WORKING": "Pracuje",
@@ -20,128 +22,144 @@ def _fmt_hm(dt):
     return timezone.localtime(dt).strftime("%H:%M")
 
 
-def get_live_dashboard(day: date | None = None):
+def _build_row(employee, schedule, events, now):
     """
-    Zwraca listę słowników – po jednym na pracownika – ze stanem DZISIAJ
+    Wiersz panelu dla jednego pracownika – z już pobranego grafiku i zdarzeń dnia.
     """
-    if day is None:
-        day = timezone.localdate()
-
-    now = timezone.now()
-    rows = []
-
-    employees = Employee.objects.all().order_by("last_name", "first_name")
-
-    for employee in employees:
-        # ===== GRAFIK =====
-        schedule = WorkSchedule.objects.filter(
-            employee=employee,
-            date=day
-        ).first()
-
-        # ===== EVENTY =====
-        events = list(
-            TimeEvent.objects.filter(
-                employee=employee,
-                timestamp__date=day
-            ).order_by("timestamp", "id")
+    state = compute_employee_state(events, now)
+
+    # ===== STATUS =====
+    if schedule and schedule.day_type == WorkSchedule.WORK and not events:
+        status = "ABSENT"
+    else:
+        status = state.state
+
+    # ===== GODZINY =====
+    check_in = next(
+        (e for e in reversed(events) if e.event_type == TimeEvent.CHECK_IN),
+        None
+    )
+
+    check_out = next(
+        (e for e in reversed(events) if e.event_type == TimeEvent.CHECK_OUT),
+        None
+    )
+
+    in_time = _fmt_hm(check_in.timestamp) if check_in else None
+    out_time = _fmt_hm(check_out.timestamp) if check_out else None
+
+    # ===== CZAS OD WEJŚCIA =====
+    total_minutes = 0
+    if check_in:
+        total_minutes = int(
+            (now - check_in.timestamp).total_seconds() // 60
         )
 
-        state = get_employee_state(employee, day)
-
-        # ===== STATUS =====
-        if schedule and schedule.day_type == WorkSchedule.WORK and not events:
-            status = "ABSENT"
-        else:
-            status = state.state
+    # ===== CZAS PRZERW =====
+    break_minutes = 0
+    open_break = None
 
-        # ===== GODZINY =====
-        check_in = next(
-            (e for e in reversed(events) if e.event_type == TimeEvent.CHECK_IN),
-            None
-        )
+    for e in events:
+        if e.event_type == TimeEvent.BREAK_START:
+            open_break = e
+        elif e.event_type == TimeEvent.BREAK_END and open_break:
+            break_minutes += int(
+                (e.timestamp - open_break.timestamp).total_seconds() // 60
+            )
+            open_break = None
 
-        check_out = next(
-            (e for e in reversed(events) if e.event_type == TimeEvent.CHECK_OUT),
-            None
+    # jeśli przerwa otwarta – licz do teraz
+    if open_break:
+        break_minutes += int(
+            (now - open_break.timestamp).total_seconds() // 60
         )
 
-        in_time = _fmt_hm(check_in.timestamp) if check_in else None
-        out_time = _fmt_hm(check_out.timestamp) if check_out else None
-
-        # ===== CZAS OD WEJŚCIA =====
-        total_minutes = 0
-        if check_in:
-            total_minutes = int(
-                (now - check_in.timestamp).total_seconds() // 60
-            )
-
-        # ===== CZAS PRZERW =====
-        break_minutes = 0
-        open_break = None
-
-        for e in events:
-            if e.event_type == TimeEvent.BREAK_START:
-                open_break = e
-            elif e.event_type == TimeEvent.BREAK_END and open_break:
-                break_minutes += int(
-                    (e.timestamp - open_break.timestamp).total_seconds() // 60
-                )
-                open_break = None
-
-        # jeśli przerwa otwarta – licz do teraz
-        if open_break:
-            break_minutes += int(
-                (now - open_break.timestamp).total_seconds() // 60
-            )
+    # ===== CZAS PRACY NETTO =====
+    work_minutes = max(total_minutes - break_minutes, 0)
 
-        # ===== CZAS PRACY NETTO =====
-        work_minutes = max(total_minutes - break_minutes, 0)
+    # ===== ANOMALIE =====
+    anomalies = []
 
-        # ===== ANOMALIE =====
-        anomalies = []
+    if check_in and not check_out:
+        ANOMALY_LABELS = {
+            "BRAK_CHECK_OUT": "Brak zakończenia pracy",
+            "OTWARTA_PRZERWA": "Niezakończona przerwa",
+            "EVENT_BEZ_CHECK_IN": "Zdarzenie bez rozpoczęcia pracy",
+        }
 
-        if check_in and not check_out:
-            ANOMALY_LABELS = {
-                "BRAK_CHECK_OUT": "Brak zakończenia pracy",
-                "OTWARTA_PRZERWA": "Niezakończona przerwa",
-                "EVENT_BEZ_CHECK_IN": "Zdarzenie bez rozpoczęcia pracy",
-            }
+        anomalies.append(ANOMALY_LABELS["BRAK_CHECK_OUT"])
+
+    if open_break:
+        anomalies.append("OTWARTA_PRZERWA")
+
+    if not check_in and events:
+        anomalies.append("EVENT_BEZ_CHECK_IN")
+
+    # ===== OSTATNIA AKCJA =====
+    last_event = events[-1] if events else None
+    ACTION_LABELS = {
+        TimeEvent.CHECK_IN: "Rozpoczęcie pracy",
+        TimeEvent.CHECK_OUT: "Zakończenie pracy",
+        TimeEvent.BREAK_START: "Rozpoczęcie przerwy",
+        TimeEvent.BREAK_END: "Zakończenie przerwy",
+    }
+
+    last_action = ACTION_LABELS.get(
+        last_event.event_type,
+        last_event.event_type
+    ) if last_event else None
+
+    return {
+        "employee_id": employee.id,
+        "employee": str(employee),
+        "in_time": in_time,
+        "out_time": out_time,
+        "total_minutes": total_minutes,
+        "work_minutes": work_minutes,
+        "break_minutes": break_minutes,
+        "last_action": last_action,
+        "anomalies": anomalies,
+        "status": status,
+        "status_label": STATUS_LABELS.get(status, status),
+    }
+
+
+def get_live_dashboard(day: date | None = None, employee_ids=None):
+    """
+    Zwraca listę słowników – po jednym na pracownika – ze stanem DZISIAJ
 
-            anomalies.append(ANOMALY_LABELS["BRAK_CHECK_OUT"])
+    Grafiki i zdarzenia wszystkich pracowników pobierane są dwoma zapytaniami
+    (plus jedno o pracowników), niezależnie od liczby pracowników.
+    employee_ids zawęża wynik do wybranych pracowników (aktualizacje na żywo).
+    """
+    if day is None:
+        day = timezone.localdate()
 
-        if open_break:
-            anomalies.append("OTWARTA_PRZERWA")
+    with DASHBOARD_SECONDS.time(scope="full" if employee_ids is None else "changed"):
+        return _dashboard_rows(day, employee_ids)
 
-        if not check_in and events:
-            anomalies.append("EVENT_BEZ_CHECK_IN")
 
-        # ===== OSTATNIA AKCJA =====
-        last_event = events[-1] if events else None
-        ACTION_LABELS = {
-            TimeEvent.CHECK_IN: "Rozpoczęcie pracy",
-            TimeEvent.CHECK_OUT: "Zakończenie pracy",
-            TimeEvent.BREAK_START: "Rozpoczęcie przerwy",
-            TimeEvent.BREAK_END: "Zakończenie przerwy",
-        }
+def _dashboard_rows(day, employee_ids):
+    now = timezone.now()
 
-        last_action = ACTION_LABELS.get(
-            last_event.event_type,
-            last_event.event_type
-        ) if last_event else None
-
-        rows.append({
-            "employee_id": employee.id,
-            "employee": str(employee),
-            "in_time": in_time,
-            "out_time": out_time,
-            "total_minutes": total_minutes,
-            "work_minutes": work_minutes,
-            "break_minutes": break_minutes,
-            "last_action": last_action,
-            "anomalies": anomalies,
-            "status": status,
-            "status_label": STATUS_LABELS.get(status, status),
-        })
-
-    return rows
+    employees = Employee.objects.all().order_by("last_name", "first_name")
+    events_qs = TimeEvent.objects.filter(local_date=day).order_by("timestamp", "id")
+
+    if employee_ids is not None:
+        employees = employees.filter(id__in=employee_ids)
+        events_qs = events_qs.filter(employee_id__in=employee_ids)
+    employees = list(employees)
+
+    # ===== GRAFIK =====
+    # wyjątki dnia + wzorce zmian (z cache)
+    schedules = load_effective_schedules([employee.id for employee in employees], day, day)
+
+    # ===== EVENTY =====
+    events_by_employee = {}
+    for e in events_qs:
+        events_by_employee.setdefault(e.employee_id, []).append(e)
+
+    return [
+        _build_row(employee, schedules.get(employee.id, day), events_by_employee.get(employee.id, []), now)
+        for employee in employees
+    ]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from time_tracking.models import TimeEvent
+from time_tracking.services.live_dashboard import get_live_dashboard
+
+# Ile ostatnio opublikowanych id zdarzeń pamiętamy, żeby polling nie wysyłał ich drugi raz
+_PUBLISHED_IDS_LIMIT = 10_000
+
+
+@dataclass(eq=False)
+class Subscription:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+
+
+class LiveFeed:
+    """
+    Procesowy nadawca zmian panelu live (SSE).
+
+    Po zapisaniu zdarzenia wiersz pracownika liczony jest raz i rozsyłany do wszystkich
+    podłączonych klientów. Zdarzenia zapisane przez inne procesy (workery) wyłapuje
+    poll() – jedno zapytanie o nowe id TimeEvent na interwał, niezależnie od liczby klientów.
+    """
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._last_poll = 0.0
+        self._last_event_id: int | None = None
+        self._published_ids: set[int] = set()
+
+    # ===== KLIENCI =====
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop | None = None) -> Subscription:
+        sub = Subscription(loop=loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def has_subscribers(self) -> bool:
+        with self._lock:
+            return bool(self._subscribers)
+
+    def publish(self, rows: list[dict]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for sub in subscribers:
+            if not sub.loop.is_closed():
+                sub.loop.call_soon_threadsafe(sub.queue.put_nowait, rows)
+
+    # ===== ŹRÓDŁA ZMIAN =====
+
+    def notify_employees(self, employee_ids: Iterable[int], event_ids: Iterable[int] = ()) -> None:
+        """
+        Przelicza wiersze wskazanych pracowników (raz) i rozsyła je klientom.
+        Bez podłączonych klientów nic nie liczymy.
+        """
+        with self._lock:
+            self._published_ids.update(event_ids)
+
+        if not self.has_subscribers():
+            return
+
+        self.publish(get_live_dashboard(employee_ids=set(employee_ids)))
+
+    def poll(self) -> None:
+        """
+        Wyłapuje zdarzenia zapisane w innych procesach – najwyżej raz na poll_seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_poll < self.poll_seconds:
+                return
+            self._last_poll = now
+            last_event_id = self._last_event_id
+
+        if last_event_id is None:
+            last_event_id = TimeEvent.objects.aggregate(m=Max("id"))["m"] or 0
+            new_events = []
+        else:
+            new_events = list(
+                TimeEvent.objects.filter(id__gt=last_event_id, local_date=timezone.localdate())
+                .values_list("id", "employee_id")
+            )
+
+        with self._lock:
+            self._last_event_id = max([last_event_id, *(ev_id for ev_id, _ in new_events)])
+            unseen = {employee_id for ev_id, employee_id in new_events if ev_id not in self._published_ids}
+            self._published_ids = {ev_id for ev_id in self._published_ids if ev_id > self._last_event_id}
+            if len(self._published_ids) > _PUBLISHED_IDS_LIMIT:
+                self._published_ids.clear()
+
+        if unseen:
+            self.notify_employees(unseen)
+
+
+live_feed = LiveFeed(poll_seconds=float(getattr(settings, "LIVE_FEED_POLL_SECONDS", 2)))
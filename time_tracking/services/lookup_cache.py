@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from django.conf import settings
+
+from core.models import Device, Employee
+
+_MISSING = object()
+
+
+class LookupCache:
+    """
+    Mały, wątkowo bezpieczny cache LRU z TTL dla pojedynczego procesu.
+
+    Brak obiektu (None) też jest zapamiętywany – z krótszym negative_ttl,
+    żeby seria skanów nieznanego kodu nie odpytywała bazy za każdym razem.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader: Callable[[Any], Any]):
+        value = self._get(key)
+        if value is _MISSING:
+            value = loader(key)
+            self._put(key, value)
+        return value
+
+    async def aget_or_load(self, key, loader: Callable[[Any], Awaitable[Any]]):
+        # wariant dla widoków async – loader to korutyna (async ORM)
+        value = self._get(key)
+        if value is _MISSING:
+            value = await loader(key)
+            self._put(key, value)
+        return value
+
+    def _get(self, key):
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    return value
+                del self._data[key]
+        return _MISSING
+
+    def _put(self, key, value) -> None:
+        now = time.monotonic()
+
+        with self._lock:
+            ttl = self.ttl if value is not None else self.negative_ttl
+            self._data[key] = (now + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=None, pk=None) -> None:
+        """Usuwa wpis po kluczu i/lub wszystkie wpisy wskazujące na obiekt o danym pk."""
+        with self._lock:
+            self._data.pop(key, None)
+            if pk is not None:
+                for k in [k for k, (_, value) in self._data.items() if value is not None and value.pk == pk]:
+                    del self._data[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def _make_cache() -> LookupCache:
+    return LookupCache(
+        maxsize=int(getattr(settings, "LOOKUP_CACHE_SIZE", 5000)),
+        ttl=float(getattr(settings, "LOOKUP_CACHE_TTL_SECONDS", 300)),
+        negative_ttl=float(getattr(settings, "LOOKUP_CACHE_NEGATIVE_TTL_SECONDS", 10)),
+    )
+
+
+employees_by_qr = _make_cache()
+devices_by_id = _make_cache()
+
+
+def _load_employee(qr_token):
+    return Employee.objects.filter(qr_token=qr_token).first()
+
+
+def _load_device(device_id):
+    return Device.objects.filter(device_id=device_id).first()
+
+
+async def _aload_employee(qr_token):
+    return await Employee.objects.filter(qr_token=qr_token).afirst()
+
+
+# klucze pochodzą z treści żądania – lista / słownik z JSON-a nie jest kluczem cache (unhashable)
+
+def get_employee_by_qr(qr_token: str) -> Employee | None:
+    if not isinstance(qr_token, str):
+        return None
+    return employees_by_qr.get_or_load(qr_token, _load_employee)
+
+
+async def aget_employee_by_qr(qr_token: str) -> Employee | None:
+    if not isinstance(qr_token, str):
+        return None
+    return await employees_by_qr.aget_or_load(qr_token, _aload_employee)
+
+
+def get_device(device_id: str) -> Device | None:
+    if not isinstance(device_id, str):
+        return None
+    return devices_by_id.get_or_load(device_id, _load_device)
+
+
+def invalidate_employee(employee: Employee) -> None:
+    employees_by_qr.invalidate(employee.qr_token, pk=employee.pk)
+
+
+def invalidate_device(device: Device) -> None:
+    # device_id można zmienić w adminie – stary klucz usuwamy po pk
+    devices_by_id.invalidate(device.device_id, pk=device.pk)
+
+
+def clear_lookup_caches() -> None:
+    employees_by_qr.clear()
+    devices_by_id.clear()
@@ -0,0 +1,238 @@
+"""
+Metryki gorących ścieżek w formacie tekstowym Prometheusa (text exposition 0.0.4).
+
+Liczniki i histogramy trzymane są w pamięci procesu – pomiar to perf_counter, jeden lock
+i bisect po kubełkach, bez zewnętrznego agenta. Endpoint /api/metrics/ zwraca stan procesu,
+który obsłużył żądanie (przy kilku workerach każdy ma własne liczniki).
+METRICS_ENABLED = False wyłącza zbieranie.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterable, Iterator
+
+from django.conf import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# sekundy; górne granice kubełków (+Inf dopisywany przy renderowaniu)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# etykieta zakresu raportu: (maks. liczba dni, nazwa)
+REPORT_RANGES = ((1, "day"), (7, "week"), (31, "month"), (92, "quarter"), (366, "year"))
+
+
+def metrics_enabled() -> bool:
+    return getattr(settings, "METRICS_ENABLED", True)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not metrics_enabled():
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """
+    Histogram czasu w sekundach; kubełki stałe, więc observe to O(log kubełków).
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, seconds: float, **labels) -> None:
+        if not metrics_enabled():
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [liczniki kubełków (ostatni to +Inf), suma, liczba]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += seconds
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def time_iter(self, iterable: Iterable, **labels) -> Iterator:
+        """
+        Przepuszcza elementy generatora, licząc tylko czas ich wytwarzania (bez czasu
+        konsumenta, np. wysyłki odpowiedzi strumieniowej). Zapis po wyczerpaniu generatora.
+        """
+        iterator = iter(iterable)
+        spent = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    spent += time.perf_counter() - started
+                yield item
+            self.observe(spent, **labels)
+        finally:
+            # przerwany eksport zamyka też generator źródłowy (np. pulę procesów)
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+REGISTRY = Registry()
+
+# ===== METRYKI =====
+
+REGISTER_EVENTS = REGISTRY.register(Counter(
+    "time_tracking_register_event_total",
+    "Registered tablet events by outcome (accepted, rejected, conflict).",
+    ["mode", "outcome"],
+))
+REGISTER_EVENT_SECONDS = REGISTRY.register(Histogram(
+    "time_tracking_register_event_seconds",
+    "Time spent registering a single event or a batch.",
+    ["mode"],
+))
+STATE_LOOKUP_SECONDS = REGISTRY.register(Histogram(
+    "time_tracking_state_lookup_seconds",
+    "Time spent computing an employee state for the tablet.",
+    ["mode"],
+))
+REPORT_BUILD_SECONDS = REGISTRY.register(Histogram(
+    "time_tracking_report_build_seconds",
+    "Time spent building attendance reports, by date range size and data source.",
+    ["range", "source"],
+))
+DASHBOARD_SECONDS = REGISTRY.register(Histogram(
+    "time_tracking_dashboard_seconds",
+    "Time spent building live dashboard rows (full panel or changed employees).",
+    ["scope"],
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "time_tracking_http_request_seconds",
+    "Request handling time by URL name (without streamed body).",
+    ["view"],
+))
+
+
+def report_range_label(date_from: date, date_to: date) -> str:
+    days = (date_to - date_from).days + 1
+    for max_days, label in REPORT_RANGES:
+        if days <= max_days:
+            return label
+    return "longer"
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
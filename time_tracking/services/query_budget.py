@@ -0,0 +1,201 @@
+"""
+Budżety zapytań SQL per widok.
+
+Widok deklaruje budżet (atrybut query_budget klasy APIView albo dekorator with_query_budget
+dla widoków funkcyjnych), middleware QueryBudgetMiddleware liczy zapytania i czas SQL
+żądania. Pomiar idzie przez recording(): rejestratory żądania trzymane są w ContextVar,
+a każde połączenie ma jeden wrapper (install_query_recording), który je wywołuje – kontekst
+przechodzi do wątku widoku synchronicznego także pod ASGI (sync_to_async), gdzie
+connection.execute_wrapper w middleware nie widziałby zapytań widoku.
+Widoki liczące dane paczkami (raporty) deklarują dodatkowo per_chunk – zapytania na paczkę
+zgłoszoną przez count_chunk(), więc budżet rośnie z liczbą paczek, a nie z liczbą wierszy.
+Przekroczenie zależnie od QUERY_BUDGET_MODE:
+"warn" – ostrzeżenie w logu, "raise" – wyjątek QueryBudgetExceeded (testy), "off" – nic.
+Komunikat zawiera powtarzające się zapytania pogrupowane po odcisku (fingerprint) –
+N+1 widać od razu jako jedno zapytanie wykonane N razy.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Iterator
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+OFF = "off"
+WARN = "warn"
+RAISE = "raise"
+
+# Ile różnych powtarzających się zapytań pokazujemy w komunikacie
+DUMP_LIMIT = 5
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|\?")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Sterowanie transakcją nie jest zapytaniem o dane – w testach atomic() to dodatkowe savepointy
+_TRANSACTION_CONTROL = re.compile(r"^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN)\b", re.I)
+
+
+# rejestratory (wrappery execute) aktywne w bieżącym kontekście żądania
+_recorders: ContextVar[tuple[Callable, ...]] = ContextVar("query_recorders", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    queries: int
+    # łączny czas SQL – tylko jeśli zadeklarowany (w testach zależy od maszyny)
+    sql_ms: float | None = None
+    # dodatkowe zapytania na każdą paczkę zgłoszoną przez count_chunk()
+    per_chunk: int = 0
+
+    def limit(self, chunks: int = 0) -> int:
+        return self.queries + self.per_chunk * chunks
+
+
+def with_query_budget(queries: int, sql_ms: float | None = None, per_chunk: int = 0) -> Callable:
+    """
+    Budżet dla widoku funkcyjnego (widoki APIView: atrybut klasy query_budget).
+    """
+    def decorator(view):
+        view.query_budget = QueryBudget(queries, sql_ms, per_chunk)
+        return view
+    return decorator
+
+
+def get_query_budget_mode() -> str:
+    return getattr(settings, "QUERY_BUDGET_MODE", WARN if settings.DEBUG else OFF)
+
+
+def fingerprint(sql: str) -> str:
+    """
+    SQL bez wartości – zapytania różniące się tylko parametrami mają ten sam odcisk.
+    """
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _IN_LISTS.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """
+    Wrapper dla connection.execute_wrapper – liczba zapytań, łączny czas i SQL każdego z nich
+    (bez savepointów i BEGIN).
+    """
+
+    def __init__(self):
+        self.queries: list[tuple[str, float]] = []
+        self.chunks = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if _TRANSACTION_CONTROL.match(sql):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def sql_ms(self) -> float:
+        return sum(duration for _, duration in self.queries) * 1000
+
+    def repeated(self, min_count: int = 2) -> list[dict[str, Any]]:
+        """
+        Zapytania wykonane co najmniej min_count razy, od najczęstszych.
+        """
+        groups: dict[str, list[float]] = defaultdict(list)
+        for sql, duration in self.queries:
+            groups[fingerprint(sql)].append(duration)
+        repeated = [
+            {"fingerprint": fp, "count": len(durations), "total_ms": round(sum(durations) * 1000, 3)}
+            for fp, durations in groups.items()
+            if len(durations) >= min_count
+        ]
+        return sorted(repeated, key=lambda r: (-r["count"], -r["total_ms"]))
+
+
+def _execute_recorded(execute, sql, params, many, context):
+    recorders = _recorders.get()
+    for recorder in reversed(recorders):
+        execute = partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_recording(sender=None, connection=None, **kwargs) -> None:
+    """
+    Odbiornik connection_created – wrapper przekazujący zapytania aktywnym rejestratorom.
+    Bez aktywnego pomiaru kosztuje jeden odczyt ContextVar na zapytanie.
+    """
+    if _execute_recorded not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_recorded)
+
+
+@contextmanager
+def recording(recorder: Callable) -> Iterator[None]:
+    """
+    Jak connection.execute_wrapper(recorder), ale dla wszystkich połączeń w bieżącym kontekście –
+    także w wątkach sync_to_async uruchomionych z niego (widoki synchroniczne pod ASGI).
+    """
+    token = _recorders.set((*_recorders.get(), recorder))
+    try:
+        yield
+    finally:
+        _recorders.reset(token)
+
+
+def count_chunk() -> None:
+    """
+    Zgłasza kolejną paczkę danych (np. paczkę pracowników raportu) aktywnym pomiarom –
+    budżet z per_chunk rośnie o tyle zapytań. Bez aktywnego pomiaru nic nie robi.
+    """
+    for recorder in _recorders.get():
+        if isinstance(recorder, QueryRecorder):
+            recorder.chunks += 1
+
+
+def check_budget(label: str, budget: QueryBudget, recorder: QueryRecorder, mode: str | None = None) -> None:
+    """
+    Porównuje nagrane zapytania z budżetem; przy przekroczeniu ostrzega albo rzuca wyjątek.
+    """
+    mode = mode or get_query_budget_mode()
+    limit = budget.limit(recorder.chunks)
+    over_count = recorder.count > limit
+    over_time = budget.sql_ms is not None and recorder.sql_ms > budget.sql_ms
+    if mode == OFF or not (over_count or over_time):
+        return
+
+    chunks = f" for {recorder.chunks} chunks" if budget.per_chunk else ""
+    lines = [
+        f"Query budget exceeded for {label}: {recorder.count} queries (budget {limit}{chunks}), "
+        f"{recorder.sql_ms:.1f} ms SQL" + (f" (budget {budget.sql_ms} ms)" if budget.sql_ms is not None else "")
+    ]
+    repeated = recorder.repeated()
+    for r in repeated[:DUMP_LIMIT]:
+        lines.append(f"  {r['count']}x {r['total_ms']:.1f} ms  {r['fingerprint']}")
+    if len(repeated) > DUMP_LIMIT:
+        lines.append(f"  ... {len(repeated) - DUMP_LIMIT} more repeated queries")
+    message = "\n".join(lines)
+
+    if mode == RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+from datetime import date
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+# Cache "faktów" dnia (report_service.compute_day_facts) per (pracownik, dzień).
+# Fakty nie zależą od LATE_THRESHOLD_MINUTES (próg nakładany przy odczycie),
+# więc zmiana progu nie unieważnia wpisów – zakresy tydzień / miesiąc współdzielą te same dni.
+# Wpis pamięta wersję wzorców zmian pracownika (schedule_resolver.pattern_versions) –
+# zmiana wzorca unieważnia naraz wszystkie dni pracownika we wszystkich procesach,
+# bez wyliczania dat z okresu wzorca.
+# Cache (domyślnie LocMem) jest procesowy – unieważnienia nie docierają do innych workerów,
+# więc czas życia wpisów (CACHES["attendance"]["TIMEOUT"]) ogranicza, jak długo widzą starą wersję.
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _get_cache():
+    return caches[getattr(settings, "REPORT_CACHE_ALIAS", "attendance")]
+
+
+def _key(employee_id: int, d: date) -> str:
+    return f"attendance-day:{employee_id}:{d.isoformat()}"
+
+
+def _keys(days: Iterable[tuple[int, date]]) -> dict[str, tuple[int, date]]:
+    return {_key(employee_id, d): (employee_id, d) for employee_id, d in days}
+
+
+def get_cached_facts(
+        days: Iterable[tuple[int, date]], versions: dict[int, Any]
+) -> dict[tuple[int, date], dict[str, Any]]:
+    """
+    Fakty dni z cache; versions: {employee_id: wersja wzorców} (brak = pracownik bez wzorców).
+    """
+    keys = _keys(days)
+    found = {
+        keys[k]: facts
+        for k, (version, facts) in _get_cache().get_many(list(keys)).items()
+        if version == versions.get(keys[k][0])
+    }
+
+    with _stats_lock:
+        _stats["hits"] += len(found)
+        _stats["misses"] += len(keys) - len(found)
+
+    return found
+
+
+def store_facts(facts_by_day: dict[tuple[int, date], dict[str, Any]], versions: dict[int, Any]) -> None:
+    if facts_by_day:
+        keys = _keys(facts_by_day)
+        _get_cache().set_many({
+            k: (versions.get(employee_id), facts_by_day[(employee_id, d)]) for k, (employee_id, d) in keys.items()
+        })
+
+
+def invalidate_days(days: Iterable[tuple[int, date]]) -> None:
+    """
+    Usuwa wpisy dla podanych dni – od razu i ponownie po commicie, żeby równoległy
+    odczyt sprzed commita nie zostawił w cache starej wersji dnia.
+    """
+    keys = list(_keys(days))
+    if not keys:
+        return
+
+    cache = _get_cache()
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_report_cache_stats() -> dict[str, Any]:
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+def reset_report_cache_stats() -> None:
+    with _stats_lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+
+def clear_report_cache() -> None:
+    _get_cache().clear()
+    reset_report_cache_stats()
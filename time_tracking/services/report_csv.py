@@ -1,41 +1,48 @@
 import csv
-from io import StringIO
+from typing import Any, Iterable, Iterator
 
-from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.report_service import iter_employee_reports
 
+HEADER = [
+    "Employee",
+    "Date",
+    "Day type",
+    "Planned minutes",
+    "Worked minutes",
+    "Break minutes",
+    "Lateness minutes",
+    "Absence",
+    "Anomalies",
+]
 
-def build_attendance_csv(*, date_from, date_to, employee_id=None) -> str:
-    report = build_attendance_report(
-        date_from=date_from,
-        date_to=date_to,
-        employee_id=employee_id,
-    )
 
-    output = StringIO()
-    writer = csv.writer(output)
+class _Echo:
+    """Pseudo-plik dla csv.writer – write() zwraca gotową linię zamiast ją buforować."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv_lines(reports: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """
+    Generator linii CSV dla gotowych raportów pracowników – nagłówek, potem jeden
+    fragment (wiersze wszystkich dni) na pracownika.
+    """
+    writer = csv.writer(_Echo())
 
     # Nagłówki
-    writer.writerow([
-        "Employee",
-        "Date",
-        "Day type",
-        "Planned minutes",
-        "Worked minutes",
-        "Break minutes",
-        "Lateness minutes",
-        "Absence",
-        "Anomalies",
-    ])
-
-    for emp in report["employees"]:
+    yield writer.writerow(HEADER)
+
+    for emp in reports:
         employee_name = emp["employee"]["name"]
 
+        lines = []
         for day in emp["days"]:
             anomalies = "; ".join(
                 a.get("detail", a.get("type", "")) for a in day["anomalies"]
             )
 
-            writer.writerow([
+            lines.append(writer.writerow([
                 employee_name,
                 day["date"],
                 day["day_type"],
@@ -45,6 +52,29 @@ def build_attendance_csv(*, date_from, date_to, employee_id=None) -> str:
                 day["lateness_minutes"],
                 "YES" if day["absence"] else "NO",
                 anomalies,
-            ])
+            ]))
+
+        yield "".join(lines)
 
-    return output.getvalue()
+
+def iter_attendance_csv(*, date_from, date_to, employee_id=None, workers=None) -> Iterator[str]:
+    """
+    Generator linii CSV – nagłówek, potem wiersze pracownik po pracowniku.
+
+    Raport liczony jest paczkami pracowników (iter_employee_reports), więc pierwsze
+    linie są gotowe przed policzeniem całości, a zużycie pamięci nie rośnie z zakresem.
+    """
+    return iter_csv_lines(
+        iter_employee_reports(date_from=date_from, date_to=date_to, employee_id=employee_id, workers=workers)
+    )
+
+
+def build_attendance_csv(*, date_from, date_to, employee_id=None, workers=None) -> str:
+    return "".join(
+        iter_attendance_csv(
+            date_from=date_from,
+            date_to=date_to,
+            employee_id=employee_id,
+            workers=workers,
+        )
+    )
@@ -0,0 +1,252 @@
+"""
+Raporty czasu pracy liczone w tle (zadania ReportJob).
+
+Zlecenie zapisuje zadanie w bazie i po commicie oddaje je lokalnej puli wątków procesu
+(bez zewnętrznej kolejki). Wątek liczy raport pracownik po pracowniku, zapisuje postęp
+w wierszu zadania i zapisuje gotowy plik JSON / CSV w REPORT_JOB_DIR. Postęp i wynik
+czytane są z bazy / dysku, więc odpytywać może dowolny proces serwera.
+
+Zadanie pamięta proces, którego pula je liczy (owner). Proces trzyma przez całe życie
+blokadę pliku REPORT_JOB_DIR/workers/<owner>.lock – blokada znika razem z procesem, więc
+zadania w toku po restarcie (osierocone) są rozpoznawane od razu, bez czekania na timeout.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Iterator
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from time_tracking.models import ReportJob
+from time_tracking.services.event_buffer import _try_lock
+from time_tracking.services.report_csv import iter_csv_lines
+from time_tracking.services.report_service import (
+    _get_late_threshold_minutes,
+    _report_employees,
+    iter_employee_reports,
+)
+
+logger = logging.getLogger(__name__)
+
+# Co ilu pracowników zapisujemy postęp zadania
+PROGRESS_EVERY = 50
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+_owner: str | None = None
+_owner_file = None
+
+
+def _get_job_dir() -> Path:
+    return Path(getattr(settings, "REPORT_JOB_DIR", settings.BASE_DIR / "report-jobs"))
+
+
+def _get_stale_after() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "REPORT_JOB_STALE_SECONDS", 15 * 60)))
+
+
+def _owner_lock_path(owner: str) -> Path:
+    return _get_job_dir() / "workers" / f"{owner}.lock"
+
+
+def _get_owner() -> str:
+    global _owner, _owner_file
+    with _executor_lock:
+        if _owner is None:
+            owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            path = _owner_lock_path(owner)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(path, "a+", encoding="utf-8")
+            _try_lock(lock_file)
+            _owner, _owner_file = owner, lock_file
+        return _owner
+
+
+def _owner_alive(owner: str) -> bool:
+    if owner == _owner:
+        return True
+    if not owner:
+        return False
+    path = _owner_lock_path(owner)
+    try:
+        lock_file = open(path, "r+", encoding="utf-8")
+    except FileNotFoundError:
+        return False
+    with lock_file:
+        if not _try_lock(lock_file):
+            return True
+    # proces właściciela nie żyje – jego pliku nikt już nie zablokuje
+    path.unlink(missing_ok=True)
+    return False
+
+
+def _fail_orphaned(jobs) -> None:
+    active = jobs.filter(status__in=ReportJob.ACTIVE_STATUSES)
+    dead = [owner for owner in set(active.values_list("owner", flat=True)) if not _owner_alive(owner)]
+    if dead:
+        active.filter(owner__in=dead).update(
+            status=ReportJob.FAILED, error="Interrupted", finished_at=timezone.now()
+        )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        started = _executor is None
+        if started:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(getattr(settings, "REPORT_JOB_WORKERS", 2)),
+                thread_name_prefix="report-job",
+            )
+        executor = _executor
+    if started:
+        # nowa pula – zadania w toku po martwych procesach nikt już nie policzy
+        _fail_orphaned(ReportJob.objects.all())
+    return executor
+
+
+def artifact_path(job: ReportJob) -> Path:
+    return _get_job_dir() / f"{job.id}.{job.format}"
+
+
+def _params_key(fmt: str, date_from: date, date_to: date, employee_id: int | None) -> str:
+    return f"{fmt}:{date_from}:{date_to}:{employee_id if employee_id is not None else 'all'}"
+
+
+def _fail_stale(params_key: str) -> None:
+    jobs = ReportJob.objects.filter(params_key=params_key)
+    _fail_orphaned(jobs)
+    # żywy proces, ale liczone zadanie bez postępu od dawna – wątek utknął; oczekujące
+    # w kolejce żywego procesu może legalnie czekać za długimi raportami
+    now = timezone.now()
+    jobs.filter(status=ReportJob.RUNNING, updated_at__lt=now - _get_stale_after()).update(
+        status=ReportJob.FAILED, error="Interrupted", finished_at=now
+    )
+
+
+def submit_report_job(
+        *, fmt: str, date_from: date, date_to: date, employee_id: int | None = None
+) -> tuple[ReportJob, bool]:
+    """
+    Zleca raport w tle. Zwraca (zadanie, created) – identyczne zlecenie w toku
+    dostaje istniejące zadanie (created=False).
+    """
+    params_key = _params_key(fmt, date_from, date_to, employee_id)
+    _fail_stale(params_key)
+
+    active = ReportJob.objects.filter(params_key=params_key, status__in=ReportJob.ACTIVE_STATUSES)
+    job = active.first()
+    if job is not None:
+        return job, False
+
+    # drugie podejście tylko gdy równoległe identyczne zlecenie zdążyło się już zakończyć;
+    # IntegrityError bez aktywnego zadania za drugim razem to inny błąd (np. CHECK) – wyżej
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                job = ReportJob.objects.create(
+                    params_key=params_key,
+                    format=fmt,
+                    date_from=date_from,
+                    date_to=date_to,
+                    employee_id=employee_id,
+                    total=_report_employees(employee_id).count(),
+                    owner=_get_owner(),
+                )
+            break
+        except IntegrityError:
+            # równoległe identyczne zlecenie wygrało wyścig o unikalny indeks
+            job = active.first()
+            if job is not None:
+                return job, False
+            if attempt:
+                raise
+
+    job_id = job.id
+    transaction.on_commit(lambda: _get_executor().submit(run_report_job, job_id))
+    return job, True
+
+
+def _tracked(job: ReportJob, reports: Iterator[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    processed = 0
+    for report in reports:
+        yield report
+        processed += 1
+        if processed % PROGRESS_EVERY == 0:
+            ReportJob.objects.filter(id=job.id).update(processed=processed, updated_at=timezone.now())
+    job.processed = processed
+
+
+def _iter_json(job: ReportJob, reports: Iterator[dict[str, Any]]) -> Iterator[str]:
+    # ten sam kształt co build_attendance_report, bez trzymania całości w pamięci
+    yield '{"range": %s, "late_threshold_minutes": %d, "employees": [' % (
+        json.dumps({"from": str(job.date_from), "to": str(job.date_to)}),
+        _get_late_threshold_minutes(),
+    )
+    for i, report in enumerate(reports):
+        yield ("," if i else "") + json.dumps(report)
+    yield "]}"
+
+
+def _write_artifact(job: ReportJob) -> None:
+    reports = _tracked(job, iter_employee_reports(
+        date_from=job.date_from, date_to=job.date_to, employee_id=job.employee_id,
+    ))
+    chunks = iter_csv_lines(reports) if job.format == ReportJob.CSV else _iter_json(job, reports)
+
+    path = artifact_path(job)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp, path)
+
+
+def run_report_job(job_id) -> None:
+    """
+    Liczy zadanie (wątek puli). Zadanie przejęte już przez inny wątek jest pomijane.
+    """
+    try:
+        claimed = ReportJob.objects.filter(id=job_id, status=ReportJob.PENDING).update(
+            status=ReportJob.RUNNING, updated_at=timezone.now()
+        )
+        if not claimed:
+            return
+
+        job = ReportJob.objects.get(id=job_id)
+        _write_artifact(job)
+        ReportJob.objects.filter(id=job_id).update(
+            status=ReportJob.DONE, processed=job.processed, finished_at=timezone.now()
+        )
+    except Exception as exc:
+        logger.exception("Report job %s failed", job_id)
+        ReportJob.objects.filter(id=job_id).update(
+            status=ReportJob.FAILED, error=str(exc) or type(exc).__name__, finished_at=timezone.now()
+        )
+    finally:
+        # wątek puli żyje dalej – nie zostawiamy mu otwartego połączenia
+        connection.close()
+
+
+def purge_finished_jobs(older_than: timedelta) -> int:
+    """
+    Usuwa zakończone zadania starsze niż older_than razem z ich plikami.
+    """
+    jobs = list(ReportJob.objects.filter(
+        status__in=(ReportJob.DONE, ReportJob.FAILED),
+        finished_at__lt=timezone.now() - older_than,
+    ))
+    for job in jobs:
+        artifact_path(job).unlink(missing_ok=True)
+    return ReportJob.objects.filter(id__in=[job.id for job in jobs]).delete()[0]
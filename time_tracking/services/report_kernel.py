@@ -0,0 +1,260 @@
+"""
+Wektorowe (NumPy) liczenie faktów dni dla raportu – źródło raportu "numpy".
+
+Zdarzenia ładowane są jako kolumny (pracownik, dzień, czas w µs, kod typu, flaga anomalii),
+sortowane raz (lexsort) i liczone operacjami grupowymi na całej paczce pracowników
+zamiast pętli po obiektach TimeEvent dzień po dniu. Wynik jest identyczny z compute_day_facts
+(sprawdzane testem na losowych strumieniach zdarzeń).
+
+NumPy jest zależnością opcjonalną – moduł importowany jest dopiero przy wyborze źródła.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Any
+
+import numpy as np
+from django.utils import timezone
+
+from time_tracking.models import TimeEvent, WorkSchedule
+from time_tracking.services.event_archive import iter_archived_events
+from time_tracking.services.report_service import _load_schedules, compute_day_facts
+from time_tracking.services.schedule_resolver import Schedule
+
+CHECK_IN, CHECK_OUT, BREAK_START, BREAK_END = range(4)
+_TYPE_CODES = {
+    TimeEvent.CHECK_IN: CHECK_IN,
+    TimeEvent.CHECK_OUT: CHECK_OUT,
+    TimeEvent.BREAK_START: BREAK_START,
+    TimeEvent.BREAK_END: BREAK_END,
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MINUTE_US = 60_000_000
+
+
+def _to_us(ts: datetime) -> int:
+    return (ts - _EPOCH) // timedelta(microseconds=1)
+
+
+def _load_columns(employee_ids, date_from: date, date_to: date) -> dict[str, Any]:
+    rows = list(
+        TimeEvent.objects
+        .filter(employee_id__in=employee_ids, local_date__gte=date_from, local_date__lte=date_to)
+        .values_list("id", "employee_id", "local_date", "timestamp", "event_type", "is_anomaly", "anomaly_reason")
+    )
+    hot_ids = {row[0] for row in rows}
+    rows += [
+        (ev.id, ev.employee_id, ev.local_date, ev.timestamp, ev.event_type, ev.is_anomaly, ev.anomaly_reason)
+        for ev in iter_archived_events(employee_ids, date_from, date_to)
+        if ev.id not in hot_ids
+    ]
+
+    n = len(rows)
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+    emp = np.fromiter((r[1] for r in rows), dtype=np.int64, count=n)
+    day = np.fromiter((r[2].toordinal() for r in rows), dtype=np.int64, count=n)
+    ts = np.fromiter((_to_us(r[3]) for r in rows), dtype=np.int64, count=n)
+    etype = np.fromiter((_TYPE_CODES[r[4]] for r in rows), dtype=np.int8, count=n)
+    anomaly = np.fromiter((r[5] for r in rows), dtype=bool, count=n)
+
+    # kolejność jak w compute_day_facts: pracownik, dzień, (timestamp, id)
+    order = np.lexsort((ids, ts, day, emp))
+    return {
+        "emp": emp[order],
+        "day": day[order],
+        "ts": ts[order],
+        "type": etype[order],
+        "anomaly": anomaly[order],
+        # obiekty potrzebne w wyniku (datetime wejścia/wyjścia, teksty anomalii)
+        "timestamps": [rows[i][3] for i in order],
+        "reasons": [rows[i][6] for i in order],
+    }
+
+
+def _group_kernel(cols: dict[str, Any]) -> dict[str, Any]:
+    """
+    Operacje grupowe po (pracownik, dzień). Zwraca tablice długości liczby grup.
+    """
+    emp, day, ts, etype = cols["emp"], cols["day"], cols["ts"], cols["type"]
+    n = len(ts)
+
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (emp[1:] != emp[:-1]) | (day[1:] != day[:-1])
+    gid = np.cumsum(new_group) - 1
+    starts = np.flatnonzero(new_group)
+    groups = len(starts)
+    positions = np.arange(n)
+
+    is_ci = etype == CHECK_IN
+    is_co = etype == CHECK_OUT
+    n_ci = np.bincount(gid, weights=is_ci, minlength=groups).astype(np.int64)
+    n_co = np.bincount(gid, weights=is_co, minlength=groups).astype(np.int64)
+
+    # pierwsze wejście i ostatnie wyjście w grupie (indeksy w kolumnach, n / -1 = brak)
+    first_ci = np.full(groups, n, dtype=np.int64)
+    np.minimum.at(first_ci, gid[is_ci], positions[is_ci])
+    last_co = np.full(groups, -1, dtype=np.int64)
+    np.maximum.at(last_co, gid[is_co], positions[is_co])
+
+    has_ci = n_ci > 0
+    has_co = n_co > 0
+    ci_ts = np.where(has_ci, ts[np.minimum(first_ci, n - 1)], 0)
+    co_ts = np.where(has_co, ts[np.maximum(last_co, 0)], 0)
+    span_ok = has_ci & has_co & (co_ts > ci_ts)
+
+    # ===== PRZERWY =====
+    # W strumieniu START/END grupy serie tego samego typu się przeplatają: pierwsze zdarzenie
+    # serii zmienia stan (otwiera / zamyka przerwę), kolejne w serii to anomalie. Seria END
+    # na początku grupy (nic nie jest otwarte) jest w całości anomalią.
+    is_break = (etype == BREAK_START) | (etype == BREAK_END)
+    b_pos = positions[is_break]
+    b_gid = gid[is_break]
+    b_type = etype[is_break]
+    b_ts = ts[is_break]
+
+    b_first_in_group = np.ones(len(b_pos), dtype=bool)
+    b_first_in_group[1:] = b_gid[1:] != b_gid[:-1]
+    run_start = b_first_in_group.copy()
+    run_start[1:] |= b_type[1:] != b_type[:-1]
+    valid = run_start & ~(b_first_in_group & (b_type == BREAK_END))
+
+    v_gid = b_gid[valid]
+    v_type = b_type[valid]
+    v_ts = b_ts[valid]
+    # poprawne zdarzenia w grupie to naprzemiennie START, END, ... – END łączymy z poprzednim
+    v_end = np.flatnonzero(v_type == BREAK_END)
+    pair_minutes = (v_ts[v_end] - v_ts[v_end - 1]) // _MINUTE_US
+    break_minutes = np.bincount(
+        v_gid[v_end], weights=np.where(pair_minutes > 0, pair_minutes, 0), minlength=groups
+    ).astype(np.int64)
+
+    last_valid = np.full(groups, -1, dtype=np.int64)
+    np.maximum.at(last_valid, v_gid, np.arange(len(v_gid)))
+    has_valid = last_valid >= 0
+    break_open = np.zeros(groups, dtype=bool)
+    break_open[has_valid] = v_type[last_valid[has_valid]] == BREAK_START
+
+    break_minutes = np.where(span_ok, break_minutes, 0)
+    worked_minutes = np.where(span_ok, np.maximum(0, (co_ts - ci_ts) // _MINUTE_US - break_minutes), 0)
+
+    return {
+        "starts": starts,
+        "gid": gid,
+        "n_ci": n_ci,
+        "n_co": n_co,
+        "first_ci": first_ci,
+        "last_co": last_co,
+        "ci_ts": ci_ts,
+        "span_ok": span_ok,
+        "worked_minutes": worked_minutes,
+        "break_minutes": break_minutes,
+        "break_open": break_open,
+        # anomalie przerw: pozycje i typy zdarzeń spoza poprawnych zmian stanu
+        "break_anomaly_pos": b_pos[~valid],
+        "break_anomaly_type": b_type[~valid],
+    }
+
+
+def _group_anomalies(cols, kernel) -> dict[int, list[dict[str, Any]]]:
+    """
+    Listy anomalii tylko dla grup, które je mają – w kolejności jak w compute_day_facts.
+    """
+    gid = kernel["gid"]
+    event_anoms: dict[int, list] = {}
+    for pos in np.flatnonzero(cols["anomaly"]):
+        event_anoms.setdefault(int(gid[pos]), []).append(
+            {"type": "EVENT_ANOMALY", "detail": cols["reasons"][pos] or "Unknown anomaly"}
+        )
+
+    break_anoms: dict[int, list] = {}
+    for pos, btype in zip(kernel["break_anomaly_pos"], kernel["break_anomaly_type"]):
+        g = int(gid[pos])
+        if not kernel["span_ok"][g]:
+            continue
+        if btype == BREAK_START:
+            anomaly = {"type": "BREAK_START_WHILE_BREAK_OPEN", "detail": "Break already started"}
+        else:
+            anomaly = {"type": "BREAK_END_WITHOUT_START", "detail": "Break end without break start"}
+        break_anoms.setdefault(g, []).append(anomaly)
+
+    n_ci, n_co = kernel["n_ci"], kernel["n_co"]
+    candidates = (
+        (n_ci > 1) | (n_co > 1) | ((n_ci > 0) != (n_co > 0)) | (kernel["span_ok"] & kernel["break_open"])
+    )
+    groups = set(event_anoms) | set(break_anoms) | {int(g) for g in np.flatnonzero(candidates)}
+
+    result = {}
+    for g in groups:
+        anomalies = list(event_anoms.get(g, []))
+        if n_ci[g] > 1:
+            anomalies.append({"type": "MULTIPLE_CHECK_IN", "detail": "More than one CHECK_IN in the same day"})
+        if n_co[g] > 1:
+            anomalies.append({"type": "MULTIPLE_CHECK_OUT", "detail": "More than one CHECK_OUT in the same day"})
+        if n_co[g] and not n_ci[g]:
+            anomalies.append({"type": "CHECK_OUT_WITHOUT_CHECK_IN", "detail": "Check out exists but no check in"})
+        if n_ci[g] and not n_co[g]:
+            anomalies.append({"type": "MISSING_CHECK_OUT", "detail": "Check in exists but no check out"})
+        if kernel["span_ok"][g]:
+            anomalies.extend(break_anoms.get(g, []))
+            if kernel["break_open"][g]:
+                anomalies.append({"type": "BREAK_WITHOUT_END", "detail": "Break started but not ended"})
+        result[g] = anomalies
+    return result
+
+
+def _planned_start_us(d: date, schedule: Schedule | None) -> int | None:
+    if not schedule or schedule.day_type != WorkSchedule.WORK or not schedule.planned_start:
+        return None
+    planned = timezone.make_aware(datetime.combine(d, schedule.planned_start), timezone.get_current_timezone())
+    return _to_us(planned)
+
+
+def facts_from_events(employee_ids, date_from: date, date_to: date):
+    """
+    Odpowiednik źródła "events" (compute_day_facts dla każdego dnia) liczony wektorowo.
+    """
+    schedules = _load_schedules(employee_ids, date_from, date_to)
+    cols = _load_columns(employee_ids, date_from, date_to)
+
+    groups: dict[tuple[int, date], dict[str, Any]] = {}
+    if len(cols["ts"]):
+        kernel = _group_kernel(cols)
+        anomalies = _group_anomalies(cols, kernel)
+        starts = kernel["starts"]
+
+        group_keys = [
+            (int(cols["emp"][s]), date.fromordinal(int(cols["day"][s]))) for s in starts
+        ]
+        group_schedules = [schedules.get(e, d) for e, d in group_keys]
+
+        # spóźnienie (bez progu) – wektorowo dla grup z wejściem i planowanym startem
+        planned = [_planned_start_us(d, s) for (_, d), s in zip(group_keys, group_schedules)]
+        has_plan = np.array([p is not None for p in planned], dtype=bool)
+        planned_us = np.array([p or 0 for p in planned], dtype=np.int64)
+        late_mask = has_plan & (kernel["n_ci"] > 0)
+        late_diff = (kernel["ci_ts"] - planned_us) // _MINUTE_US
+
+        for g, ((employee_id, d), schedule) in enumerate(zip(group_keys, group_schedules)):
+            facts = compute_day_facts(d, schedule, [])
+            has_ci = kernel["n_ci"][g] > 0
+            has_co = kernel["n_co"][g] > 0
+            facts.update({
+                "check_in": cols["timestamps"][kernel["first_ci"][g]] if has_ci else None,
+                "check_out": cols["timestamps"][kernel["last_co"][g]] if has_co else None,
+                "worked_minutes": int(kernel["worked_minutes"][g]),
+                "break_minutes": int(kernel["break_minutes"][g]),
+                "late_diff_minutes": int(late_diff[g]) if late_mask[g] else None,
+                "absence": bool(schedule and schedule.day_type == WorkSchedule.WORK and not has_ci),
+                "anomalies": anomalies.get(g, []),
+            })
+            groups[(employee_id, d)] = facts
+
+    def facts_for(employee_id: int, d: date) -> dict[str, Any]:
+        facts = groups.get((employee_id, d))
+        if facts is None:
+            # dzień bez zdarzeń – tylko grafik
+            facts = compute_day_facts(d, schedules.get(employee_id, d), [])
+        return facts
+
+    return facts_for
@@ -0,0 +1,114 @@
+"""
+Równoległe liczenie raportu czasu pracy (wiele rdzeni).
+
+Pracownicy (w kolejności raportu) dzieleni są na ciągłe shardy, każdy shard liczony jest
+w osobnym procesie z własnym połączeniem do bazy, a wyniki oddawane są shard po shardzie
+w kolejności wejściowej – raport jest identyczny z liczonym szeregowo. Małe raporty
+(poniżej REPORT_PARALLEL_MIN_EMPLOYEES pracowników) liczone są szeregowo, bo start puli
+kosztuje więcej niż zysk.
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import TYPE_CHECKING, Any, Iterator
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from core.models import Employee
+
+# Moduł ładowany jest w workerze przed django.setup() (spawn) – modele i serwisy
+# raportu importujemy dopiero w funkcjach.
+
+# Ile shardów na worker – mniejsze shardy wyrównują obciążenie przy nierównych danych
+SHARDS_PER_WORKER = 4
+
+
+def _get_min_employees() -> int:
+    return int(getattr(settings, "REPORT_PARALLEL_MIN_EMPLOYEES", 200))
+
+
+def use_parallel(employee_list: list[Employee], workers: int) -> bool:
+    return workers > 1 and len(employee_list) >= _get_min_employees()
+
+
+def _database_names() -> dict[str, Any]:
+    from django.db import connections
+
+    return {alias: connections[alias].settings_dict["NAME"] for alias in connections}
+
+
+def _init_worker(database_names: dict[str, Any]) -> None:
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    if not apps.ready:
+        # spawn / forkserver – świeży interpreter; baza ta sama co rodzica, także gdy
+        # rodzic ma ją podmienioną (baza testowa, nadpisane ustawienia)
+        django.setup()
+        for alias, name in database_names.items():
+            connections.settings[alias]["NAME"] = name
+        return
+
+    # fork – połączeń rodzica nie wolno używać (ani zamykać) w procesie potomnym;
+    # porzucamy je, worker otworzy własne
+    for conn in connections.all(initialized_only=True):
+        conn.connection = None
+
+
+def _compute_shard(employee_list: list[Employee], kwargs: dict[str, Any]) -> list[dict[str, Any]]:
+    from time_tracking.services.report_service import iter_report_chunks
+
+    return list(iter_report_chunks(employee_list, **kwargs))
+
+
+def _shards(employee_list: list[Employee], workers: int) -> list[list[Employee]]:
+    size = math.ceil(len(employee_list) / (workers * SHARDS_PER_WORKER))
+    return [employee_list[i:i + size] for i in range(0, len(employee_list), size)]
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    # domyślnie spawn: fork procesu z wątkami (serwer, flusher zdarzeń) grozi zakleszczeniem
+    method = getattr(settings, "REPORT_WORKER_START_METHOD", "spawn")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(method),
+        initializer=_init_worker,
+        initargs=(_database_names(),),
+    )
+
+
+def iter_parallel_reports(
+        employee_list: list[Employee],
+        *,
+        date_from: date,
+        date_to: date,
+        source: str,
+        threshold: int,
+        workers: int,
+        chunk_size: int,
+) -> Iterator[dict[str, Any]]:
+    """
+    Raporty pracowników liczone w puli workers procesów, w kolejności employee_list.
+    """
+    shards = _shards(employee_list, workers)
+    kwargs = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "source": source,
+        "threshold": threshold,
+        "chunk_size": chunk_size,
+    }
+
+    executor = _executor(min(workers, len(shards)))
+    try:
+        futures = [executor.submit(_compute_shard, shard, kwargs) for shard in shards]
+        for future in futures:
+            yield from future.result()
+    finally:
+        # przerwany eksport (np. klient się rozłączył) – nie liczymy reszty shardów
+        executor.shutdown(wait=True, cancel_futures=True)
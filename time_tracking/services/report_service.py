@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 from datetime import date, datetime, time, timedelta
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from django.conf import settings
 from django.db.models import QuerySet
 from django.utils import timezone
 
 from core.models import Employee
-from time_tracking.models import TimeEvent, WorkSchedule
+from time_tracking.models import DailyAttendance, TimeEvent, WorkSchedule
+from time_tracking.services import report_cache
+from time_tracking.services.event_archive import with_archived
+from time_tracking.services.metrics import REPORT_BUILD_SECONDS, report_range_label
+from time_tracking.services.query_budget import count_chunk
+from time_tracking.services.schedule_resolver import (
+    EffectiveSchedules,
+    Schedule,
+    load_effective_schedules,
+    pattern_schedules,
+    pattern_versions,
+)
+
+
+# Ilu pracowników liczymy jednym zestawem zapytań
+EMPLOYEE_CHUNK_SIZE = 500
+
+# Ile dni pracowników (pracownik × dzień) ładujemy naraz – przy długim zakresie paczka
+# pracowników maleje, więc pamięć paczki nie rośnie z liczbą dni
+CHUNK_EMPLOYEE_DAYS = EMPLOYEE_CHUNK_SIZE * 31
 
 
 def _get_late_threshold_minutes() -> int:
@@ -88,139 +107,361 @@ def _detect_event_anomalies(day_events: list[TimeEvent]) -> list[dict[str, Any]]
     return anomalies
 
 
-def build_attendance_report(*, date_from: date, date_to: date, employee_id: int | None = None) -> dict[str, Any]:
-    employees: QuerySet[Employee] = Employee.objects.filter(is_active=True).order_by("last_name", "first_name")
+def _empty_totals() -> dict[str, int]:
+    return {
+        "planned_minutes": 0,
+        "worked_minutes": 0,
+        "break_minutes": 0,
+        "late_minutes": 0,
+        "absences": 0,
+        "leave_days": 0,
+        "anomaly_days": 0,
+    }
+
+
+def _add_day_to_totals(totals: dict[str, int], day: dict[str, Any]) -> None:
+    totals["planned_minutes"] += day["planned"]["minutes"]
+    totals["worked_minutes"] += day["actual"]["worked_minutes"]
+    totals["break_minutes"] += day["actual"]["break_minutes"]
+    totals["late_minutes"] += day["lateness_minutes"]
+
+    if day["day_type"] == WorkSchedule.LEAVE:
+        totals["leave_days"] += 1
+    if day["absence"]:
+        totals["absences"] += 1
+    if day["anomalies"]:
+        totals["anomaly_days"] += 1
+
+
+def compute_day_facts(d: date, schedule: Schedule | None, day_events: list[TimeEvent]) -> dict[str, Any]:
+    """
+    Liczy "fakty" jednego dnia na podstawie grafiku i (posortowanych) zdarzeń z tego dnia.
+
+    Wynik nie zależy od progu spóźnienia – zamiast spóźnienia zwracamy surową różnicę
+    wejście - plan (late_diff_minutes), próg nakładany jest dopiero w day_from_facts().
+    Klucze odpowiadają polom modelu DailyAttendance.
+    """
+    day_type = schedule.day_type if schedule else "NO_SCHEDULE"
+    planned_minutes = 0
+    planned_start = None
+    planned_end = None
+
+    if schedule and schedule.day_type == WorkSchedule.WORK:
+        planned_start = schedule.planned_start
+        planned_end = schedule.planned_end
+        planned_minutes = int(
+            (
+                    datetime.combine(d, planned_end) - datetime.combine(d, planned_start)
+            ).total_seconds()
+            // 60
+        )
+
+    # Faktyczne
+    check_in = next((e for e in day_events if e.event_type == TimeEvent.CHECK_IN), None)
+    check_out = next((e for e in reversed(day_events) if e.event_type == TimeEvent.CHECK_OUT), None)
+
+    worked_minutes = 0
+    break_minutes = 0
+    late_diff_minutes = None
+
+    anomalies = _detect_event_anomalies(day_events)
+
+    if check_in and check_out and check_out.timestamp > check_in.timestamp:
+        span_minutes = int((check_out.timestamp - check_in.timestamp).total_seconds() // 60)
+        break_minutes, break_anoms = _pair_breaks(day_events)
+        anomalies.extend(break_anoms)
+        worked_minutes = max(0, span_minutes - break_minutes)
+
+    # Spóźnienie (bez progu)
+    if schedule and schedule.day_type == WorkSchedule.WORK and check_in and planned_start:
+        planned_dt = datetime.combine(d, planned_start)
+        # jeśli USE_TZ=True, check_in.timestamp jest aware -> ujednolicamy:
+        if timezone.is_aware(check_in.timestamp) and timezone.is_naive(planned_dt):
+            planned_dt = timezone.make_aware(planned_dt, timezone.get_current_timezone())
+
+        late_diff_minutes = int((check_in.timestamp - planned_dt).total_seconds() // 60)
+
+    # Absencja
+    is_absence = bool(schedule and schedule.day_type == WorkSchedule.WORK and not check_in)
+
+    return {
+        "day_type": day_type,
+        "planned_start": planned_start,
+        "planned_end": planned_end,
+        "planned_minutes": planned_minutes,
+        "check_in": check_in.timestamp if check_in else None,
+        "check_out": check_out.timestamp if check_out else None,
+        "worked_minutes": worked_minutes,
+        "break_minutes": break_minutes,
+        "late_diff_minutes": late_diff_minutes,
+        "absence": is_absence,
+        "anomalies": anomalies,
+    }
+
+
+def day_from_facts(d: date, facts: dict[str, Any], threshold: int) -> dict[str, Any]:
+    """
+    Zamienia fakty dnia na wpis raportu ("days") z nałożonym progiem spóźnienia.
+    """
+    diff = facts["late_diff_minutes"]
+    planned_start = facts["planned_start"]
+    planned_end = facts["planned_end"]
+    check_in = facts["check_in"]
+    check_out = facts["check_out"]
+
+    return {
+        "date": str(d),
+        "day_type": facts["day_type"],
+        "planned": {
+            "start": str(planned_start) if planned_start else None,
+            "end": str(planned_end) if planned_end else None,
+            "minutes": facts["planned_minutes"],
+        },
+        "actual": {
+            "check_in": check_in.isoformat() if check_in else None,
+            "check_out": check_out.isoformat() if check_out else None,
+            "worked_minutes": facts["worked_minutes"],
+            "break_minutes": facts["break_minutes"],
+        },
+        "lateness_minutes": diff if diff is not None and diff > threshold else 0,
+        "absence": facts["absence"],
+        "anomalies": list(facts["anomalies"]),
+    }
+
+
+def summary_to_facts(row: DailyAttendance) -> dict[str, Any]:
+    return {field: getattr(row, field) for field in DailyAttendance.FACT_FIELDS}
+
+
+def _load_schedules(employee_ids: list[int], date_from: date, date_to: date) -> EffectiveSchedules:
+    """
+    Efektywne grafiki wybranych pracowników (wyjątki WorkSchedule + wzorce zmian):
+    jedno zapytanie o wyjątki, wzorce z cache -> schedules.get(employee_id, d)
+    """
+    return load_effective_schedules(employee_ids, date_from, date_to)
+
+
+def _load_events(
+        employee_ids: list[int], date_from: date, date_to: date
+) -> dict[int, dict[date, list[TimeEvent]]]:
+    """
+    Jedno zapytanie o zdarzenia wszystkich wybranych pracowników -> {employee_id: {date: [TimeEvent, ...]}}
+    Dni liczone wg lokalnej daty pracy (TimeEvent.local_date). Kolejność zdarzeń w obrębie dnia: po timestamp.
+    Zarchiwizowane miesiące czytane są z plików segmentów.
+    """
+    events: dict[int, dict[date, list[TimeEvent]]] = {}
+    qs = TimeEvent.objects.filter(
+        employee_id__in=employee_ids,
+        local_date__gte=date_from,
+        local_date__lte=date_to,
+    ).order_by("timestamp", "id")
+    for ev in with_archived(list(qs), employee_ids, date_from, date_to):
+        events.setdefault(ev.employee_id, {}).setdefault(ev.local_date, []).append(ev)
+    return events
+
+
+def _load_summaries(
+        employee_ids: list[int], date_from: date, date_to: date
+) -> dict[int, dict[date, DailyAttendance]]:
+    """
+    Jedno zapytanie o gotowe podsumowania dni -> {employee_id: {date: DailyAttendance}}
+    """
+    summaries: dict[int, dict[date, DailyAttendance]] = {}
+    qs = DailyAttendance.objects.filter(employee_id__in=employee_ids, date__gte=date_from, date__lte=date_to)
+    for row in qs:
+        summaries.setdefault(row.employee_id, {})[row.date] = row
+    return summaries
+
+
+def _facts_from_summaries(employee_ids, date_from, date_to):
+    days = [(employee_id, d) for employee_id in employee_ids for d in _daterange(date_from, date_to)]
+    # wersje wzorców z bazy – cache dni i wzorców innego procesu mógł się zestarzeć
+    versions = pattern_versions(employee_ids)
+    facts = report_cache.get_cached_facts(days, versions)
+
+    missing = [day for day in days if day not in facts]
+    if missing:
+        miss_from = min(d for _, d in missing)
+        miss_to = max(d for _, d in missing)
+        summaries = _load_summaries(employee_ids, miss_from, miss_to)
+        # brak wiersza = brak zdarzeń i brak wyjątku w grafiku – zostaje tylko wzorzec zmian
+        schedules = pattern_schedules({employee_id for employee_id, _ in missing}, versions)
+        # fakty dnia bez zdarzeń zależą tylko od grafiku – jeden słownik na dzień cyklu wzorca
+        empty: dict[Schedule | None, dict[str, Any]] = {}
+
+        loaded = {}
+        for employee_id, d in missing:
+            row = summaries.get(employee_id, {}).get(d)
+            if row:
+                loaded[(employee_id, d)] = summary_to_facts(row)
+                continue
+            schedule = schedules.get(employee_id, d)
+            if schedule not in empty:
+                empty[schedule] = compute_day_facts(d, schedule, [])
+            loaded[(employee_id, d)] = empty[schedule]
+
+        report_cache.store_facts(loaded, versions)
+        facts.update(loaded)
+
+    def facts_for(employee_id: int, d: date) -> dict[str, Any]:
+        return facts[(employee_id, d)]
+
+    return facts_for
+
+
+def _facts_from_events(employee_ids, date_from, date_to):
+    schedules = _load_schedules(employee_ids, date_from, date_to)
+    events = _load_events(employee_ids, date_from, date_to)
+
+    def facts_for(employee_id: int, d: date) -> dict[str, Any]:
+        return compute_day_facts(
+            d,
+            schedules.get(employee_id, d),
+            events.get(employee_id, {}).get(d, []),
+        )
+
+    return facts_for
+
+
+def _facts_from_events_numpy(employee_ids, date_from, date_to):
+    # NumPy jest zależnością opcjonalną – import dopiero przy wyborze tego źródła
+    from time_tracking.services.report_kernel import facts_from_events
+
+    return facts_from_events(employee_ids, date_from, date_to)
+
+
+REPORT_SOURCES = {
+    # Zmaterializowana tabela DailyAttendance + cache dni (domyślnie)
+    "summary": _facts_from_summaries,
+    # Odtworzenie z surowych zdarzeń TimeEvent (weryfikacja / przebudowa podsumowań)
+    "events": _facts_from_events,
+    # To samo co "events", liczone wektorowo na kolumnach zdarzeń (wymaga NumPy)
+    "numpy": _facts_from_events_numpy,
+}
+
+
+def _report_employees(employee_id: int | None) -> QuerySet[Employee]:
+    employees = Employee.objects.filter(is_active=True).order_by("last_name", "first_name")
     if employee_id is not None:
         employees = employees.filter(id=employee_id)
+    return employees
 
-    threshold = _get_late_threshold_minutes()
 
-    report: dict[str, Any] = {
-        "range": {"from": str(date_from), "to": str(date_to)},
-        "late_threshold_minutes": threshold,
-        "employees": [],
-    }
+def _get_report_workers() -> int:
+    # REPORT_WORKERS > 1 włącza liczenie dużych raportów w puli procesów (report_parallel)
+    return int(getattr(settings, "REPORT_WORKERS", 1))
 
-    for emp in employees:
-        # Grafik w zakresie
-        schedules = {
-            s.date: s
-            for s in WorkSchedule.objects.filter(employee=emp, date__gte=date_from, date__lte=date_to)
-        }
-
-        # Zdarzenia w zakresie (po timestamp)
-        events_qs = TimeEvent.objects.filter(
-            employee=emp,
-            timestamp__date__gte=date_from,
-            timestamp__date__lte=date_to,
-        ).order_by("timestamp")
-
-        # grupowanie per dzień
-        events_by_day: dict[date, list[TimeEvent]] = {}
-        for ev in events_qs:
-            d = ev.timestamp.date()
-            events_by_day.setdefault(d, []).append(ev)
-
-        emp_days: list[dict[str, Any]] = []
-        totals = {
-            "planned_minutes": 0,
-            "worked_minutes": 0,
-            "break_minutes": 0,
-            "late_minutes": 0,
-            "absences": 0,
-            "leave_days": 0,
-            "anomaly_days": 0,
-        }
-
-        for d in _daterange(date_from, date_to):
-            schedule = schedules.get(d)
-            day_events = events_by_day.get(d, [])
-
-            day_type = schedule.day_type if schedule else "NO_SCHEDULE"
-            planned_minutes = 0
-            planned_start = None
-            planned_end = None
-
-            if schedule and schedule.day_type == WorkSchedule.WORK:
-                planned_start = schedule.planned_start
-                planned_end = schedule.planned_end
-                planned_minutes = int(
-                    (
-                            datetime.combine(d, planned_end) - datetime.combine(d, planned_start)
-                    ).total_seconds()
-                    // 60
-                )
-                totals["planned_minutes"] += planned_minutes
-
-            if schedule and schedule.day_type == WorkSchedule.LEAVE:
-                totals["leave_days"] += 1
-
-            # Faktyczne
-            check_in = next((e for e in day_events if e.event_type == TimeEvent.CHECK_IN), None)
-            check_out = next((e for e in reversed(day_events) if e.event_type == TimeEvent.CHECK_OUT), None)
-
-            worked_minutes = 0
-            break_minutes = 0
-            lateness_minutes = 0
-
-            anomalies = _detect_event_anomalies(day_events)
-
-            if check_in and check_out and check_out.timestamp > check_in.timestamp:
-                span_minutes = int((check_out.timestamp - check_in.timestamp).total_seconds() // 60)
-                break_minutes, break_anoms = _pair_breaks(day_events)
-                anomalies.extend(break_anoms)
-                worked_minutes = max(0, span_minutes - break_minutes)
-                totals["worked_minutes"] += worked_minutes
-                totals["break_minutes"] += break_minutes
-
-            # Spóźnienie
-            if schedule and schedule.day_type == WorkSchedule.WORK and check_in and planned_start:
-                planned_dt = datetime.combine(d, planned_start)
-                # jeśli USE_TZ=True, check_in.timestamp jest aware -> ujednolicamy:
-                if timezone.is_aware(check_in.timestamp) and timezone.is_naive(planned_dt):
-                    planned_dt = timezone.make_aware(planned_dt, timezone.get_current_timezone())
-
-                diff = int((check_in.timestamp - planned_dt).total_seconds() // 60)
-                if diff > threshold:
-                    lateness_minutes = diff
-                    totals["late_minutes"] += lateness_minutes
-
-            # Absencja
-            is_absence = False
-            if schedule and schedule.day_type == WorkSchedule.WORK and not check_in:
-                is_absence = True
-                totals["absences"] += 1
-
-            if anomalies:
-                totals["anomaly_days"] += 1
-
-            emp_days.append(
-                {
-                    "date": str(d),
-                    "day_type": day_type,
-                    "planned": {
-                        "start": str(planned_start) if planned_start else None,
-                        "end": str(planned_end) if planned_end else None,
-                        "minutes": planned_minutes,
-                    },
-                    "actual": {
-                        "check_in": check_in.timestamp.isoformat() if check_in else None,
-                        "check_out": check_out.timestamp.isoformat() if check_out else None,
-                        "worked_minutes": worked_minutes,
-                        "break_minutes": break_minutes,
-                    },
-                    "lateness_minutes": lateness_minutes,
-                    "absence": is_absence,
-                    "anomalies": anomalies,
-                }
-            )
 
-        report["employees"].append(
-            {
+def iter_report_chunks(
+        employee_list: list[Employee],
+        *,
+        date_from: date,
+        date_to: date,
+        source: str,
+        threshold: int,
+        chunk_size: int = EMPLOYEE_CHUNK_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """
+    Raporty podanych pracowników (w ich kolejności), liczone paczkami po chunk_size –
+    albo mniej, żeby paczka nie przekroczyła CHUNK_EMPLOYEE_DAYS dni pracowników.
+    """
+    days = (date_to - date_from).days + 1
+    chunk_size = max(1, min(chunk_size, CHUNK_EMPLOYEE_DAYS // days))
+    for i in range(0, len(employee_list), chunk_size):
+        chunk = employee_list[i:i + chunk_size]
+        count_chunk()
+        facts_for = REPORT_SOURCES[source]([emp.id for emp in chunk], date_from, date_to)
+
+        for emp in chunk:
+            emp_days: list[dict[str, Any]] = []
+            totals = _empty_totals()
+
+            for d in _daterange(date_from, date_to):
+                day = day_from_facts(d, facts_for(emp.id, d), threshold)
+                _add_day_to_totals(totals, day)
+                emp_days.append(day)
+
+            yield {
                 "employee": {"id": emp.id, "name": str(emp)},
                 "totals": totals,
                 "days": emp_days,
             }
-        )
 
-    return report
+
+def iter_employee_reports(
+        *,
+        date_from: date,
+        date_to: date,
+        employee_id: int | None = None,
+        source: str = "summary",
+        threshold: int | None = None,
+        chunk_size: int = EMPLOYEE_CHUNK_SIZE,
+        workers: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Generator raportów per pracownik ({"employee", "totals", "days"}) w kolejności raportu.
+
+    Dane ładowane są paczkami po chunk_size pracowników (stała liczba zapytań na paczkę),
+    mniejszymi przy długim zakresie (CHUNK_EMPLOYEE_DAYS), więc w pamięci jest tylko
+    bieżąca paczka, ograniczona niezależnie od zakresu – z tego korzysta eksport strumieniowy.
+    Przy workers > 1 (domyślnie REPORT_WORKERS) duże raporty liczone są w puli procesów.
+    """
+    if threshold is None:
+        threshold = _get_late_threshold_minutes()
+    if workers is None:
+        workers = _get_report_workers()
+
+    kwargs = {"date_from": date_from, "date_to": date_to, "source": source, "threshold": threshold}
+    # czas liczenia raportu (bez czasu konsumenta) w metrykach, per rozmiar zakresu
+    return REPORT_BUILD_SECONDS.time_iter(
+        _iter_reports(employee_id, chunk_size, workers, kwargs),
+        range=report_range_label(date_from, date_to),
+        source=source,
+    )
+
+
+def _iter_reports(employee_id, chunk_size, workers, kwargs):
+    employee_list = list(_report_employees(employee_id))
+
+    if workers > 1:
+        from time_tracking.services.report_parallel import iter_parallel_reports, use_parallel
+
+        if use_parallel(employee_list, workers):
+            yield from iter_parallel_reports(employee_list, workers=workers, chunk_size=chunk_size, **kwargs)
+            return
+
+    yield from iter_report_chunks(employee_list, chunk_size=chunk_size, **kwargs)
+
+
+def build_attendance_report(
+        *,
+        date_from: date,
+        date_to: date,
+        employee_id: int | None = None,
+        source: str = "summary",
+        workers: int | None = None,
+) -> dict[str, Any]:
+    """
+    Raport czasu pracy dla zakresu dat.
+
+    Domyślnie czyta gotowe podsumowania dni (DailyAttendance), source="events" liczy
+    wszystko od nowa z TimeEvent, a source="numpy" to samo jądrem wektorowym. W każdym
+    przypadku dane pracowników pobierane są zbiorczo (stała liczba zapytań na paczkę
+    pracowników, niezależnie od ich liczby w paczce).
+    """
+    threshold = _get_late_threshold_minutes()
+
+    return {
+        "range": {"from": str(date_from), "to": str(date_to)},
+        "late_threshold_minutes": threshold,
+        "employees": list(
+            iter_employee_reports(
+                date_from=date_from,
+                date_to=date_to,
+                employee_id=employee_id,
+                source=source,
+                threshold=threshold,
+                workers=workers,
+            )
+        ),
+    }
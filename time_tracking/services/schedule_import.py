@@ -0,0 +1,203 @@
+"""
+Import grafiku z pliku CSV / JSONL (miesięczny grafik z arkusza planistów).
+
+Wiersze czytane są strumieniowo i walidowane regułami WorkSchedule.clean paczkami po
+IMPORT_CHUNK_SIZE. Poprawne wiersze paczki zapisywane są jednym upsertem po
+(employee, date) w osobnej, krótkiej transakcji – tablety mogą zapisywać zdarzenia
+między paczkami. Błędne wiersze trafiają do raportu błędów (numer wiersza + komunikaty),
+reszta pliku jest importowana.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, time
+from typing import IO, Any, Iterable, Iterator
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_time
+
+from core.models import Employee
+from time_tracking.models import WorkSchedule
+from time_tracking.models.work_schedule import validate_planned_times
+from time_tracking.services.daily_attendance import refresh_daily_attendance
+from time_tracking.services.write_lane import write_lane
+
+# Ile wierszy walidujemy i zapisujemy jedną transakcją
+IMPORT_CHUNK_SIZE = 2000
+
+CSV = "csv"
+JSONL = "jsonl"
+
+FIELDS = ("employee_id", "date", "day_type", "planned_start", "planned_end")
+_DAY_TYPES = {choice for choice, _ in WorkSchedule.DAY_TYPE_CHOICES}
+
+
+def detect_format(filename: str, fmt: str | None = None) -> str | None:
+    """
+    Format pliku: podany jawnie albo z rozszerzenia (.csv, .jsonl / .ndjson).
+    """
+    if fmt:
+        return fmt if fmt in (CSV, JSONL) else None
+    suffix = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return {"csv": CSV, "jsonl": JSONL, "ndjson": JSONL}.get(suffix)
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[tuple[int, Any]]:
+    """
+    (numer wiersza, dane) z pliku binarnego – CSV z nagłówkiem albo JSON Lines.
+    Numer wiersza to numer linii pliku (nagłówek CSV to linia 1).
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, None
+
+
+def _parse_time(value, field: str) -> time | None:
+    if value in (None, ""):
+        return None
+    try:
+        parsed = parse_time(value) if isinstance(value, str) else None
+    except ValueError:
+        # poprawny format, ale wartość spoza zakresu (np. 25:00)
+        parsed = None
+    if parsed is None:
+        raise ValidationError(f"{field}: invalid time, use HH:MM.")
+    return parsed
+
+
+def _parse_row(data) -> WorkSchedule:
+    """
+    Wiersz -> niezapisany WorkSchedule; ValidationError z listą komunikatów.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("Invalid row, expected an object with fields: " + ", ".join(FIELDS) + ".")
+
+    errors = []
+    try:
+        employee_id = int(data.get("employee_id"))
+        if not 0 < employee_id < 2 ** 63:
+            raise ValueError
+    except (TypeError, ValueError, OverflowError):
+        employee_id = None
+        errors.append("employee_id: must be an integer.")
+
+    try:
+        day = date.fromisoformat(data.get("date") or "")
+    except (TypeError, ValueError):
+        day = None
+        errors.append("date: invalid date, use YYYY-MM-DD.")
+
+    day_type = data.get("day_type")
+    day_type = day_type.strip().upper() if isinstance(day_type, str) else None
+    if day_type not in _DAY_TYPES:
+        errors.append(f"day_type: must be one of {', '.join(sorted(_DAY_TYPES))}.")
+
+    planned = {}
+    for field in ("planned_start", "planned_end"):
+        try:
+            planned[field] = _parse_time(data.get(field), field)
+        except ValidationError as exc:
+            errors.extend(exc.messages)
+
+    if errors:
+        raise ValidationError(errors)
+
+    # te same reguły co WorkSchedule.clean
+    validate_planned_times(day_type, planned["planned_start"], planned["planned_end"])
+    return WorkSchedule(employee_id=employee_id, date=day, day_type=day_type, **planned)
+
+
+def _import_chunk(chunk: list[tuple[int, Any]], result: dict[str, Any], dry_run: bool) -> None:
+    parsed: dict[tuple[int, date], WorkSchedule] = {}
+    for line_no, data in chunk:
+        try:
+            schedule = _parse_row(data)
+        except ValidationError as exc:
+            result["errors"].append({"row": line_no, "errors": exc.messages})
+            continue
+        # ten sam dzień pracownika drugi raz w pliku – obowiązuje późniejszy wiersz
+        parsed[(schedule.employee_id, schedule.date)] = schedule
+        schedule._line_no = line_no
+
+    known = set(
+        Employee.objects.filter(id__in={employee_id for employee_id, _ in parsed}).values_list("id", flat=True)
+    )
+    for key, schedule in list(parsed.items()):
+        if schedule.employee_id not in known:
+            result["errors"].append({"row": schedule._line_no, "errors": ["employee_id: employee does not exist."]})
+            del parsed[key]
+
+    if not parsed:
+        return
+
+    days = sorted(parsed)
+    with write_lane(), transaction.atomic():
+        existing = set(
+            WorkSchedule.objects.filter(
+                employee_id__in={employee_id for employee_id, _ in days},
+                date__gte=min(d for _, d in days),
+                date__lte=max(d for _, d in days),
+            ).values_list("employee_id", "date")
+        )
+        updated = sum(1 for key in parsed if key in existing)
+        result["created"] += len(parsed) - updated
+        result["updated"] += updated
+
+        if dry_run:
+            return
+
+        WorkSchedule.objects.bulk_create(
+            list(parsed.values()),
+            update_conflicts=True,
+            unique_fields=["employee", "date"],
+            update_fields=["day_type", "planned_start", "planned_end"],
+        )
+        # bulk_create nie wysyła sygnałów – podsumowania dni i cache raportów przeliczamy paczką
+        refresh_daily_attendance(days)
+
+        today = timezone.localdate()
+        changed_today = [employee_id for employee_id, d in days if d == today]
+        if changed_today:
+            from time_tracking.services.live_feed import live_feed
+
+            transaction.on_commit(lambda: live_feed.notify_employees(changed_today, []))
+
+
+def import_schedules(
+        rows: Iterable[tuple[int, Any]], *, dry_run: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> dict[str, Any]:
+    """
+    Upsert grafiku po (employee, date) z wierszy (numer wiersza, dane).
+
+    Zwraca {"created", "updated", "errors": [{"row", "errors"}], "error_count"}.
+    dry_run=True tylko waliduje i liczy, co zostałoby utworzone / zaktualizowane.
+    """
+    result: dict[str, Any] = {"created": 0, "updated": 0, "errors": []}
+
+    chunk: list[tuple[int, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, result, dry_run)
+            chunk = []
+    if chunk:
+        _import_chunk(chunk, result, dry_run)
+
+    result["errors"].sort(key=lambda error: error["row"])
+    result["error_count"] = len(result["errors"])
+    return result
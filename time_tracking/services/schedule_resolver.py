@@ -0,0 +1,183 @@
+"""
+Efektywny grafik dnia: wyjątek z WorkSchedule albo dzień wzorca zmian (ShiftPattern).
+
+Wzorce rozwijane są leniwie – dzień cyklu liczony jest arytmetycznie z daty, więc koszt
+przechowywania i odczytu rośnie z liczbą wzorców i wyjątków, a nie z liczbą dni.
+Skompilowane wzorce pracownika trzymane są w cache raportów (CACHES["attendance"]) razem
+z wersją wzorców z bazy (pattern_versions). Cache jest procesowy, więc wersja sprawdzana jest
+przy każdym odczycie – zmiana wzorca w innym workerze (albo w procesie puli raportów)
+jest widoczna od razu, kosztem jednego zapytania agregującego.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Iterable, Union
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from time_tracking.models import ShiftPattern, WorkSchedule
+
+
+@dataclass(frozen=True)
+class PatternDay:
+    """
+    Grafik dnia wynikający ze wzorca – te same pola co WorkSchedule używane przez raporty.
+    Jeden obiekt na dzień cyklu, współdzielony przez wszystkie daty tego dnia cyklu.
+    """
+
+    day_type: str
+    planned_start: time | None
+    planned_end: time | None
+
+
+@dataclass(frozen=True)
+class CompiledPattern:
+    pattern_id: int
+    valid_from: date
+    valid_to: date | None
+    anchor_date: date
+    cycle: tuple[PatternDay, ...]
+
+    def day(self, d: date) -> PatternDay | None:
+        if d < self.valid_from or (self.valid_to is not None and d > self.valid_to):
+            return None
+        return self.cycle[(d - self.anchor_date).days % len(self.cycle)]
+
+
+Schedule = Union[WorkSchedule, PatternDay]
+
+_OFF = PatternDay(WorkSchedule.OFF, None, None)
+
+
+def _get_cache():
+    return caches[getattr(settings, "REPORT_CACHE_ALIAS", "attendance")]
+
+
+def _key(employee_id: int) -> str:
+    return f"shift-patterns:{employee_id}"
+
+
+def _compile(pattern: ShiftPattern) -> CompiledPattern:
+    cycle = [_OFF] * pattern.cycle_days
+    for day in pattern.days.all():
+        if day.day_index < pattern.cycle_days:
+            cycle[day.day_index] = PatternDay(day.day_type, day.planned_start, day.planned_end)
+    return CompiledPattern(
+        pattern_id=pattern.id,
+        valid_from=pattern.valid_from,
+        valid_to=pattern.valid_to,
+        anchor_date=pattern.anchor_date,
+        cycle=tuple(cycle),
+    )
+
+
+PatternVersion = tuple[int, datetime]
+
+
+def pattern_versions(employee_ids: Iterable[int]) -> dict[int, PatternVersion]:
+    """
+    Wersja wzorców pracowników z bazy -> {employee_id: (liczba wzorców, najpóźniejsze updated_at)}.
+    Pracownicy bez wzorców nie mają wpisu. Zmiana dnia wzorca podbija updated_at wzorca (signals).
+    """
+    rows = (
+        ShiftPattern.objects
+        .filter(employee_id__in=list(employee_ids))
+        .order_by()
+        .values("employee_id")
+        .annotate(count=Count("id"), updated=Max("updated_at"))
+        .values_list("employee_id", "count", "updated")
+    )
+    return {employee_id: (count, updated) for employee_id, count, updated in rows}
+
+
+def load_patterns(
+        employee_ids: Iterable[int], versions: dict[int, PatternVersion] | None = None
+) -> dict[int, list[CompiledPattern]]:
+    """
+    Skompilowane wzorce pracowników -> {employee_id: [CompiledPattern, ...]} (najnowsze pierwsze).
+
+    Wpis z cache obowiązuje tylko przy tej samej wersji co w bazie; brakujące i nieaktualne
+    ładowane są dwoma zapytaniami dla wszystkich naraz. versions: wynik pattern_versions,
+    jeśli wołający już go ma.
+    """
+    employee_ids = list(employee_ids)
+    if versions is None:
+        versions = pattern_versions(employee_ids)
+
+    # pracownicy bez wzorców – bez cache i bez zapytań
+    patterns: dict[int, list[CompiledPattern]] = {
+        employee_id: [] for employee_id in employee_ids if employee_id not in versions
+    }
+    keys = {_key(employee_id): employee_id for employee_id in employee_ids if employee_id in versions}
+    if not keys:
+        return patterns
+
+    cache = _get_cache()
+    for k, (version, compiled) in cache.get_many(list(keys)).items():
+        if version == versions[keys[k]]:
+            patterns[keys[k]] = compiled
+
+    missing = [employee_id for employee_id in keys.values() if employee_id not in patterns]
+    if missing:
+        loaded: dict[int, list[CompiledPattern]] = {employee_id: [] for employee_id in missing}
+        qs = (
+            ShiftPattern.objects
+            .filter(employee_id__in=missing)
+            .order_by("-valid_from")
+            .prefetch_related("days")
+        )
+        for pattern in qs:
+            loaded[pattern.employee_id].append(_compile(pattern))
+        # wersja sprzed odczytu – wzorzec zmieniony w międzyczasie zostanie przeładowany następnym razem
+        cache.set_many({_key(employee_id): (versions[employee_id], value) for employee_id, value in loaded.items()})
+        patterns.update(loaded)
+
+    return patterns
+
+
+class EffectiveSchedules:
+    """
+    Grafiki wybranych pracowników w zakresie dat: get(employee_id, d) zwraca wyjątek
+    z WorkSchedule, dzień wzorca albo None (brak grafiku).
+    """
+
+    def __init__(self, patterns: dict[int, list[CompiledPattern]], exceptions: dict[tuple[int, date], WorkSchedule]):
+        self._patterns = patterns
+        self._exceptions = exceptions
+
+    def exception(self, employee_id: int, d: date) -> WorkSchedule | None:
+        return self._exceptions.get((employee_id, d))
+
+    def get(self, employee_id: int, d: date) -> Schedule | None:
+        schedule = self._exceptions.get((employee_id, d))
+        if schedule is not None:
+            return schedule
+        for pattern in self._patterns.get(employee_id, ()):
+            day = pattern.day(d)
+            if day is not None:
+                return day
+        return None
+
+
+def load_effective_schedules(employee_ids: Iterable[int], date_from: date, date_to: date) -> EffectiveSchedules:
+    """
+    Jedno zapytanie o wyjątki (WorkSchedule) w zakresie + wzorce z cache.
+    """
+    employee_ids = list(employee_ids)
+    exceptions = {
+        (s.employee_id, s.date): s
+        for s in WorkSchedule.objects.filter(employee_id__in=employee_ids, date__gte=date_from, date__lte=date_to)
+    }
+    return EffectiveSchedules(load_patterns(employee_ids), exceptions)
+
+
+def pattern_schedules(
+        employee_ids: Iterable[int], versions: dict[int, PatternVersion] | None = None
+) -> EffectiveSchedules:
+    """
+    Same wzorce – dla dni, o których wiadomo, że nie mają wyjątku (np. brak wiersza DailyAttendance).
+    """
+    return EffectiveSchedules(load_patterns(employee_ids, versions), {})
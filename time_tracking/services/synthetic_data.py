@@ -0,0 +1,387 @@
+"""
+Generator danych syntetycznych w skali produkcyjnej (profilowanie, benchmarki, demo).
+
+Pracownicy, grafik i zdarzenia z parametrami (liczba pracowników, zakres dat, odsetek
+spóźnień / absencji / anomalii, ziarno losowania) zapisywane paczkami (executemany) –
+bez sygnałów. Podsumowania DailyAttendance liczone są od razu z wygenerowanych zdarzeń
+(compute_day_facts), bez ponownego czytania ich z bazy.
+
+Anomalie pokrywają wszystkie typy wykrywane przez report_service (ANOMALY_TYPES).
+"""
+from __future__ import annotations
+
+import functools
+import random
+import secrets
+import time as clock
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, NamedTuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Device, Employee
+from time_tracking.models import (
+    DailyAttendance,
+    IdempotencyKey,
+    ReportJob,
+    ShiftPattern,
+    ShiftPatternDay,
+    TimeEvent,
+    WorkSchedule,
+)
+from time_tracking.services.event_archive import delete_segments
+from time_tracking.services.event_buffer import event_buffer
+from time_tracking.services.lookup_cache import clear_lookup_caches
+from time_tracking.services.report_cache import clear_report_cache
+from time_tracking.services.report_service import compute_day_facts
+from time_tracking.services.schedule_resolver import PatternDay
+
+# Ile zdarzeń zapisujemy jedną transakcją
+BATCH_SIZE = 20000
+
+# Ile tokenów QR w jednym zapytaniu o zajęte (limit parametrów SQLite)
+_LOOKUP_CHUNK = 500
+
+# Zmiany (start, koniec) – przydzielane pracownikom losowo, wszystkie w obrębie doby
+SHIFTS = ((time(6, 0), time(14, 0)), (time(8, 0), time(16, 0)), (time(9, 0), time(17, 0)), (time(14, 0), time(22, 0)))
+
+# Spóźnienie (minuty) – powyżej domyślnego progu LATE_THRESHOLD_MINUTES
+LATE_MINUTES = (6, 60)
+
+FIRST_NAMES = (
+    "Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Magdalena", "Paweł", "Agnieszka",
+    "Michał", "Monika", "Krzysztof", "Ewa", "Marcin", "Joanna", "Łukasz", "Aleksandra",
+)
+LAST_NAMES = (
+    "Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski",
+    "Zieliński", "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur",
+)
+
+# Typy anomalii report_service – każda wstrzykiwana inną modyfikacją dnia
+ANOMALY_TYPES = (
+    "MISSING_CHECK_OUT",
+    "CHECK_OUT_WITHOUT_CHECK_IN",
+    "MULTIPLE_CHECK_IN",
+    "MULTIPLE_CHECK_OUT",
+    "BREAK_WITHOUT_END",
+    "BREAK_END_WITHOUT_START",
+    "BREAK_START_WHILE_BREAK_OPEN",
+    "EVENT_ANOMALY",
+)
+
+
+@dataclass(frozen=True)
+class DataConfig:
+    employees: int = 50
+    date_from: date = field(default_factory=lambda: timezone.localdate() - timedelta(days=30))
+    date_to: date = field(default_factory=timezone.localdate)
+    seed: int = 1
+    devices: int = 5
+
+    # odsetki dni roboczych (WORK)
+    late_rate: float = 0.1
+    absence_rate: float = 0.03
+    anomaly_rate: float = 0.02
+    break_rate: float = 0.8
+    leave_rate: float = 0.03
+    # dni robocze bez wpisu w grafiku (praca "NO_SCHEDULE")
+    no_schedule_rate: float = 0.01
+
+
+# (typ, minuta od północy, is_anomaly, anomaly_reason)
+DayEvent = tuple[str, int, bool, str]
+
+
+def _work_day(rnd: random.Random, config: DataConfig, start: int, end: int) -> list[DayEvent]:
+    if rnd.random() < config.late_rate:
+        check_in = start + rnd.randint(*LATE_MINUTES)
+    else:
+        check_in = start + rnd.randint(-15, 4)
+    check_out = end + rnd.randint(-10, 40)
+
+    events = [(TimeEvent.CHECK_IN, check_in, False, "")]
+    if rnd.random() < config.break_rate:
+        break_start = check_in + rnd.randint(150, 270)
+        events.append((TimeEvent.BREAK_START, break_start, False, ""))
+        events.append((TimeEvent.BREAK_END, break_start + rnd.randint(10, 35), False, ""))
+    events.append((TimeEvent.CHECK_OUT, check_out, False, ""))
+    return events
+
+
+def _inject_anomaly(rnd: random.Random, kind: str, events: list[DayEvent]) -> list[DayEvent]:
+    """
+    Psuje poprawny dzień tak, żeby report_service wykrył anomalię `kind`.
+    Anomalie przerw wykrywane są tylko w dniu z wejściem i wyjściem – te zostają.
+    """
+    check_in, *middle, check_out = events
+    if kind in ("BREAK_WITHOUT_END", "BREAK_END_WITHOUT_START", "BREAK_START_WHILE_BREAK_OPEN") and not middle:
+        break_start = check_in[1] + rnd.randint(150, 270)
+        middle = [(TimeEvent.BREAK_START, break_start, False, ""), (TimeEvent.BREAK_END, break_start + 20, False, "")]
+
+    if kind == "MISSING_CHECK_OUT":
+        return [check_in, *middle]
+    if kind == "CHECK_OUT_WITHOUT_CHECK_IN":
+        return [check_out]
+    if kind == "MULTIPLE_CHECK_IN":
+        return [check_in, (TimeEvent.CHECK_IN, check_in[1] + rnd.randint(1, 5), False, ""), *middle, check_out]
+    if kind == "MULTIPLE_CHECK_OUT":
+        return [check_in, *middle, (TimeEvent.CHECK_OUT, check_out[1] - rnd.randint(20, 60), False, ""), check_out]
+    if kind == "BREAK_WITHOUT_END":
+        return [check_in, middle[0], check_out]
+    if kind == "BREAK_END_WITHOUT_START":
+        return [check_in, middle[1], check_out]
+    if kind == "BREAK_START_WHILE_BREAK_OPEN":
+        second = (TimeEvent.BREAK_START, middle[0][1] + 2, False, "")
+        return [check_in, middle[0], second, middle[1], check_out]
+    # EVENT_ANOMALY – zdarzenie oznaczone przy rejestracji (np. korekta ręczna)
+    return [(check_in[0], check_in[1], True, "Manual correction"), *middle, check_out]
+
+
+class _Event(NamedTuple):
+    """
+    Zdarzenie dla compute_day_facts – te same pola co TimeEvent, bez kosztu instancji modelu.
+    """
+
+    event_type: str
+    timestamp: datetime
+    is_anomaly: bool
+    anomaly_reason: str
+
+
+class _Table:
+    """
+    Wiersze jednej tabeli zapisywane executemany – bulk_create składa SQL i przygotowuje
+    każdą wartość przez pola modelu, co przy milionach wierszy kosztuje więcej niż sam zapis.
+    Wartości muszą być już przygotowane dla bazy (connection.ops.adapt_*).
+    """
+
+    def __init__(self, model, fields: tuple[str, ...]):
+        columns = ", ".join(connection.ops.quote_name(model._meta.get_field(name).column) for name in fields)
+        self.sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+            connection.ops.quote_name(model._meta.db_table), columns, ", ".join(["%s"] * len(fields)),
+        )
+        self.rows: list[tuple] = []
+        self.count = 0
+
+    def flush(self, cursor) -> None:
+        if self.rows:
+            cursor.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+class _Writer:
+    """
+    Bufory wierszy grafiku, zdarzeń i podsumowań – zapis paczkami, każda w jednej transakcji.
+    """
+
+    def __init__(self, batch_size: int, progress: Callable[[dict[str, int]], None] | None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.schedules = _Table(
+            WorkSchedule, ("employee", "date", "day_type", "planned_start", "planned_end", "created_at"),
+        )
+        self.events = _Table(TimeEvent, (
+            "employee", "device", "event_type", "timestamp", "local_date", "sequence",
+            "is_anomaly", "anomaly_reason", "created_at",
+        ))
+        self.summaries = _Table(DailyAttendance, ("employee", "date", *DailyAttendance.FACT_FIELDS, "updated_at"))
+
+    def counts(self) -> dict[str, int]:
+        return {"schedules": self.schedules.count, "events": self.events.count, "summaries": self.summaries.count}
+
+    def flush(self) -> None:
+        with transaction.atomic(), connection.cursor() as cursor:
+            for table in (self.schedules, self.events, self.summaries):
+                table.flush(cursor)
+        if self.progress:
+            self.progress(self.counts())
+
+    def maybe_flush(self) -> None:
+        if len(self.events.rows) >= self.batch_size:
+            self.flush()
+
+
+def clear_data() -> None:
+    """
+    Czyści pracowników, urządzenia, grafik i zdarzenia – także niezapisane zdarzenia
+    write-behind (dziennik) i segmenty archiwum, inaczej nowi pracownicy z tymi samymi id
+    przejęliby stare zdarzenia. Surowy DELETE – ORM wysyłałby sygnały (przeliczenia
+    DailyAttendance) dla każdego z milionów zdarzeń.
+
+    Dziennik trzymany przez działający serwer (write-behind) – ImproperlyConfigured, nic nie jest usuwane.
+    """
+    event_buffer.discard()
+
+    models = (
+        DailyAttendance, TimeEvent, WorkSchedule, ShiftPatternDay, ShiftPattern,
+        IdempotencyKey, ReportJob, Employee, Device,
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+    delete_segments()
+    clear_report_cache()
+    clear_lookup_caches()
+
+
+def _create_devices(rnd: random.Random, count: int) -> list[Device]:
+    """
+    Urządzenia tablet-01..NN; istniejące z poprzedniego uruchomienia (bez --clear) są używane ponownie.
+    """
+    # tokeny losowane zawsze dla wszystkich – ten sam seed daje te same dane niezależnie od bazy
+    wanted = [
+        Device(name=f"Tablet {i + 1}", device_id=f"tablet-{i + 1:02d}", api_token=f"{rnd.getrandbits(160):040x}")
+        for i in range(count)
+    ]
+    existing = {
+        device.device_id: device
+        for device in Device.objects.filter(device_id__in=[device.device_id for device in wanted])
+    }
+    Device.objects.bulk_create([device for device in wanted if device.device_id not in existing])
+    return [existing.get(device.device_id, device) for device in wanted]
+
+
+def _free_qr_tokens(tokens: list[str]) -> list[str]:
+    """
+    Tokeny QR z ziarna; zajęte przez pracowników z poprzedniego uruchomienia losowane od nowa.
+    """
+    taken = set()
+    for i in range(0, len(tokens), _LOOKUP_CHUNK):
+        chunk = tokens[i:i + _LOOKUP_CHUNK]
+        taken.update(Employee.objects.filter(qr_token__in=chunk).values_list("qr_token", flat=True))
+    return [secrets.token_hex(16) if token in taken else token for token in tokens]
+
+
+def generate_data(
+        config: DataConfig, *, summaries: bool = True, batch_size: int = BATCH_SIZE,
+        progress: Callable[[dict[str, int]], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Generuje dane wg config. Zwraca liczby utworzonych wierszy, dni wg rodzaju
+    i wstrzykniętych anomalii oraz czas trwania.
+    """
+    started = clock.perf_counter()
+    rnd = random.Random(config.seed)
+    now = timezone.now()
+    today = timezone.localdate(now)
+    # bulk_create na SQLite pyta połączenie o limity, zanim cokolwiek wykona
+    connection.ensure_connection()
+    ops = connection.ops
+
+    devices = _create_devices(rnd, config.devices)
+    people = [
+        (rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES), f"{rnd.getrandbits(128):032x}")
+        for _ in range(config.employees)
+    ]
+    tokens = _free_qr_tokens([qr_token for _, _, qr_token in people])
+    employees = Employee.objects.bulk_create([
+        Employee(first_name=first_name, last_name=last_name, qr_token=qr_token)
+        for (first_name, last_name, _), qr_token in zip(people, tokens)
+    ], batch_size=batch_size)
+
+    days = [config.date_from + timedelta(days=i) for i in range((config.date_to - config.date_from).days + 1)]
+    # wartości wspólne dla wielu wierszy przygotowane dla bazy raz – pracownicy tej samej
+    # zmiany odbijają się w tych samych minutach dnia
+    midnights = {d: timezone.make_aware(datetime.combine(d, time.min)) for d in days}
+
+    @functools.lru_cache(maxsize=None)
+    def stamp(d: date, minute: int) -> tuple[datetime, Any]:
+        ts = midnights[d] + timedelta(minutes=minute)
+        return ts, ops.adapt_datetimefield_value(ts)
+
+    # fakty dnia bez zdarzeń zależą tylko od grafiku
+    idle_facts = functools.lru_cache(maxsize=None)(lambda schedule: compute_day_facts(config.date_from, schedule, []))
+    db_dates = {d: ops.adapt_datefield_value(d) for d in days}
+    db_times = {t: ops.adapt_timefield_value(t) for shift in SHIFTS for t in shift}
+    db_times[None] = None
+    db_now = ops.adapt_datetimefield_value(now)
+    json_field = DailyAttendance._meta.get_field("anomalies")
+    off = PatternDay(WorkSchedule.OFF, None, None)
+    leave = PatternDay(WorkSchedule.LEAVE, None, None)
+
+    kinds = Counter()
+    writer = _Writer(batch_size, progress)
+
+    for employee in employees:
+        shift_start, shift_end = rnd.choice(SHIFTS)
+        work = PatternDay(WorkSchedule.WORK, shift_start, shift_end)
+        start = shift_start.hour * 60 + shift_start.minute
+        end = shift_end.hour * 60 + shift_end.minute
+        device_id = rnd.choice(devices).id
+
+        for d in days:
+            day_events = []
+            if d.weekday() >= 5:
+                schedule = off
+                kinds["off"] += 1
+            elif rnd.random() < config.leave_rate:
+                schedule = leave
+                kinds["leave"] += 1
+            else:
+                schedule = work
+                if rnd.random() < config.no_schedule_rate:
+                    schedule = None
+                    kinds["no_schedule"] += 1
+
+                if rnd.random() < config.absence_rate:
+                    kinds["absence"] += 1
+                else:
+                    day_events = _work_day(rnd, config, start, end)
+                    if rnd.random() < config.anomaly_rate:
+                        kind = rnd.choice(ANOMALY_TYPES)
+                        day_events = _inject_anomaly(rnd, kind, day_events)
+                        kinds[kind] += 1
+                    else:
+                        kinds["work"] += 1
+
+            db_date = db_dates[d]
+            events = []
+            db_timestamps = {}
+            if d <= today:
+                for sequence, (event_type, minute, is_anomaly, reason) in enumerate(
+                        sorted(day_events, key=lambda ev: ev[1]), start=1
+                ):
+                    ts, db_ts = stamp(d, minute)
+                    if ts > now:
+                        break
+                    db_timestamps[ts] = db_ts
+                    events.append(_Event(event_type, ts, is_anomaly, reason))
+                    writer.events.rows.append((
+                        employee.id, device_id, event_type, db_ts, db_date, sequence, is_anomaly, reason, db_now,
+                    ))
+
+            if schedule is not None:
+                writer.schedules.rows.append((
+                    employee.id, db_date, schedule.day_type,
+                    db_times[schedule.planned_start], db_times[schedule.planned_end], db_now,
+                ))
+
+            # materializowane są dni z wpisem w grafiku lub ze zdarzeniami (jak refresh_daily_attendance)
+            if summaries and (schedule is not None or events):
+                facts = compute_day_facts(d, schedule, events) if events else idle_facts(schedule)
+                writer.summaries.rows.append((
+                    employee.id, db_date, facts["day_type"],
+                    db_times[facts["planned_start"]], db_times[facts["planned_end"]], facts["planned_minutes"],
+                    db_timestamps.get(facts["check_in"]), db_timestamps.get(facts["check_out"]),
+                    facts["worked_minutes"], facts["break_minutes"], facts["late_diff_minutes"], facts["absence"],
+                    ops.adapt_json_value(facts["anomalies"], json_field.encoder), db_now,
+                ))
+
+        writer.maybe_flush()
+
+    writer.flush()
+    stamp.cache_clear()
+    clear_report_cache()
+    clear_lookup_caches()
+
+    return {
+        "employees": len(employees),
+        "devices": len(devices),
+        **writer.counts(),
+        "days": dict(kinds),
+        "seconds": round(clock.perf_counter() - started, 2),
+    }
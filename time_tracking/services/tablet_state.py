@@ -3,6 +3,8 @@ from dataclasses import dataclass
 from django.utils import timezone
 
 from time_tracking.models import TimeEvent
+from time_tracking.services.event_buffer import event_buffer, write_behind_enabled
+from time_tracking.services.metrics import STATE_LOOKUP_SECONDS
 
 
 @dataclass(frozen=True)
@@ -35,11 +37,59 @@ def get_employee_state(employee, day=None):
     if day is None:
         day = timezone.localdate()
 
-    events = list(
-        TimeEvent.objects
-        .filter(employee=employee, timestamp__date=day)
-        .order_by("timestamp", "id")
-    )
+    with STATE_LOOKUP_SECONDS.time(mode="sync"):
+        return compute_employee_state(load_day_events(employee, day))
+
+
+async def aget_employee_state(employee, day=None):
+    """
+    Wariant get_employee_state dla widoków async (async ORM).
+    """
+    if day is None:
+        day = timezone.localdate()
+
+    with STATE_LOOKUP_SECONDS.time(mode="async"):
+        return compute_employee_state(await aload_day_events(employee, day))
+
+
+def _day_events_qs(employee, day):
+    return TimeEvent.objects.filter(employee=employee, local_date=day).order_by("timestamp", "id")
+
+
+def _merge_pending(events, pending):
+    if pending:
+        stored = {ev.sequence for ev in events}
+        events += [ev for ev in pending if ev.sequence not in stored]
+        events.sort(key=lambda ev: ev.sequence)
+    return events
+
+
+def _pending_events(employee, day):
+    # bufor czytany PRZED bazą: zdarzenie znika z bufora dopiero po commicie,
+    # więc w najgorszym razie widzimy je dwa razy (odsiewane po sequence)
+    return event_buffer.pending_for(employee.id, day) if write_behind_enabled() else []
+
+
+def load_day_events(employee, day):
+    """
+    Zdarzenia pracownika z danego dnia, posortowane; w trybie write-behind razem
+    z jeszcze niezapisanymi zdarzeniami z bufora.
+    """
+    pending = _pending_events(employee, day)
+    return _merge_pending(list(_day_events_qs(employee, day)), pending)
+
+
+async def aload_day_events(employee, day):
+    pending = _pending_events(employee, day)
+    return _merge_pending([ev async for ev in _day_events_qs(employee, day)], pending)
+
+
+def compute_employee_state(events, now=None):
+    """
+    Stan pracownika wyliczony z już pobranych (posortowanych) zdarzeń jednego dnia.
+    """
+    if now is None:
+        now = timezone.now()
 
     if not events:
         return EmployeeState("OFF_DUTY", None, None, None, None)
@@ -57,7 +107,7 @@ def get_employee_state(employee, day=None):
 
     # czas pracy w minutach
     total_minutes = int(
-        (timezone.now() - last_check_in.timestamp).total_seconds() // 60
+        (now - last_check_in.timestamp).total_seconds() // 60
     )
 
     # sprawdzenie przerwy
@@ -0,0 +1,24 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Reentrant – zapis zdarzenia może być zagnieżdżony (np. klucz idempotencji + register_event)
+_lane = threading.RLock()
+
+
+@contextmanager
+def write_lane():
+    """
+    Serializuje transakcje zapisujące TimeEvent w obrębie procesu.
+
+    SQLite i tak dopuszcza jednego piszącego naraz; zamiast budzić N wątków w pętli
+    busy_timeout (z rosnącymi przerwami) kolejkujemy je na zwykłym locku.
+    Otwierać PRZED transakcją (poza transaction.atomic), włączane ustawieniem SQLITE_WRITE_LANE.
+    """
+    if not getattr(settings, "SQLITE_WRITE_LANE", False):
+        yield
+        return
+
+    with _lane:
+        yield
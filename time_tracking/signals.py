@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Device, Employee
+from time_tracking.models import DailyAttendance, ShiftPattern, ShiftPatternDay, TimeEvent, WorkSchedule
+from time_tracking.services.daily_attendance import refresh_daily_attendance
+from time_tracking.services.live_feed import live_feed
+from time_tracking.services.lookup_cache import invalidate_device, invalidate_employee
+
+
+def _day_of(instance):
+    if isinstance(instance, TimeEvent):
+        return instance.employee_id, instance.local_date
+    return instance.employee_id, instance.date
+
+
+@receiver(pre_save, sender=TimeEvent)
+@receiver(pre_save, sender=WorkSchedule)
+def remember_previous_day(sender, instance, **kwargs):
+    # edycja (np. w adminie) może przenieść wpis na inny dzień – stary też trzeba przeliczyć
+    instance._previous_day = None
+    if instance._state.adding or instance.pk is None:
+        return
+
+    field = "local_date" if sender is TimeEvent else "date"
+    instance._previous_day = sender.objects.filter(pk=instance.pk).values_list("employee_id", field).first()
+
+
+@receiver(post_save, sender=TimeEvent)
+@receiver(post_save, sender=WorkSchedule)
+def refresh_attendance_on_save(sender, instance, **kwargs):
+    days = {_day_of(instance)}
+    previous = getattr(instance, "_previous_day", None)
+    if previous:
+        days.add(previous)
+    refresh_daily_attendance(days)
+
+
+@receiver(post_delete, sender=TimeEvent)
+@receiver(post_delete, sender=WorkSchedule)
+def refresh_attendance_on_delete(sender, instance, origin=None, **kwargs):
+    # usuwanie pracownika kasuje kaskadowo także jego DailyAttendance
+    if isinstance(origin, Employee):
+        return
+    refresh_daily_attendance({_day_of(instance)})
+
+
+@receiver(post_save, sender=TimeEvent)
+@receiver(post_save, sender=WorkSchedule)
+@receiver(post_delete, sender=TimeEvent)
+@receiver(post_delete, sender=WorkSchedule)
+def push_live_panel_row(sender, instance, **kwargs):
+    employee_id, day = _day_of(instance)
+    if day != timezone.localdate():
+        return
+
+    event_ids = [instance.pk] if sender is TimeEvent and instance.pk else []
+    transaction.on_commit(lambda: live_feed.notify_employees([employee_id], event_ids))
+
+
+@receiver(pre_save, sender=ShiftPattern)
+def remember_previous_period(sender, instance, **kwargs):
+    # zmiana okresu (lub pracownika) wzorca – dni ze starego okresu też trzeba przeliczyć
+    instance._previous_period = None
+    if instance._state.adding or instance.pk is None:
+        return
+    instance._previous_period = (
+        ShiftPattern.objects.filter(pk=instance.pk).values_list("employee_id", "valid_from", "valid_to").first()
+    )
+
+
+@receiver(post_save, sender=ShiftPattern)
+@receiver(post_delete, sender=ShiftPattern)
+@receiver(post_save, sender=ShiftPatternDay)
+@receiver(post_delete, sender=ShiftPatternDay)
+def refresh_attendance_on_pattern_change(sender, instance, origin=None, **kwargs):
+    # kaskada z pracownika / wzorca – obsłużona przez sygnał usuwanego obiektu
+    if isinstance(origin, Employee) or (sender is ShiftPatternDay and isinstance(origin, ShiftPattern)):
+        return
+
+    pattern = instance if sender is ShiftPattern else instance.pattern
+    if sender is ShiftPatternDay:
+        # wersja wzorców (schedule_resolver.pattern_versions) to updated_at wzorca
+        ShiftPattern.objects.filter(pk=pattern.pk).update(updated_at=timezone.now())
+    periods = {(pattern.employee_id, pattern.valid_from, pattern.valid_to)}
+    previous = getattr(pattern, "_previous_period", None)
+    if previous:
+        periods.add(previous)
+
+    today = timezone.localdate()
+    days = set()
+    for employee_id, valid_from, valid_to in periods:
+        # dni bez wiersza DailyAttendance liczone są z wzorca przy odczycie – cache wzorców
+        # i dni rozpozna nową wersję wzorców (pattern_versions), nic do unieważniania
+
+        # dni ze zdarzeniami / wyjątkami mają wiersz liczony z grafiku – przeliczamy je
+        rows = DailyAttendance.objects.filter(employee_id=employee_id, date__gte=valid_from)
+        if valid_to:
+            rows = rows.filter(date__lte=valid_to)
+        days.update((employee_id, d) for d in rows.values_list("date", flat=True))
+
+        if valid_from <= today and (valid_to is None or today <= valid_to):
+            transaction.on_commit(lambda employee_id=employee_id: live_feed.notify_employees([employee_id], []))
+
+    refresh_daily_attendance(days)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_lookup(sender, instance, **kwargs):
+    # także zmiana is_active
+    invalidate_employee(instance)
+
+
+@receiver(post_save, sender=Device)
+@receiver(post_delete, sender=Device)
+def invalidate_device_lookup(sender, instance, **kwargs):
+    invalidate_device(instance)
@@ -0,0 +1,67 @@
+// Aktualizacje panelu live przez Server-Sent Events – podmieniamy tylko zmienione wiersze.
+(function () {
+    if (!window.EventSource) {
+        return;
+    }
+
+    var script = document.currentScript;
+    var source = new EventSource(script.dataset.streamUrl);
+
+    function minutesToHm(value) {
+        if (value === null || value === undefined) {
+            return "—";
+        }
+        var hours = Math.floor(value / 60);
+        var minutes = value % 60;
+        return hours + "h " + (minutes < 10 ? "0" : "") + minutes + "m";
+    }
+
+    function setText(row, field, text) {
+        var cell = row.querySelector('[data-field="' + field + '"]');
+        if (cell) {
+            cell.textContent = text;
+        }
+    }
+
+    function updateRow(data) {
+        var row = document.querySelector('tr[data-employee-id="' + data.employee_id + '"]');
+        if (!row) {
+            // nowy pracownik – najprościej przeładować całą tabelę
+            window.location.reload();
+            return;
+        }
+
+        var badge = row.querySelector('[data-field="status"]');
+        badge.className = "badge " + data.status.toLowerCase();
+        badge.textContent = data.status_label;
+
+        setText(row, "in_time", data.in_time || "—");
+        setText(row, "out_time", data.out_time || "—");
+        setText(row, "total_minutes", minutesToHm(data.total_minutes));
+        setText(row, "work_minutes", minutesToHm(data.work_minutes));
+        setText(row, "break_minutes", minutesToHm(data.break_minutes));
+        setText(row, "last_action", data.last_action || "—");
+
+        var anomalies = row.querySelector('[data-field="anomalies"]');
+        anomalies.innerHTML = "";
+        if (data.anomalies.length) {
+            var list = document.createElement("ul");
+            list.className = "anomalies";
+            data.anomalies.forEach(function (a) {
+                var item = document.createElement("li");
+                item.textContent = a;
+                list.appendChild(item);
+            });
+            anomalies.appendChild(list);
+        } else {
+            var empty = document.createElement("span");
+            empty.className = "muted";
+            empty.textContent = "—";
+            anomalies.appendChild(empty);
+        }
+    }
+
+    source.addEventListener("rows", function (e) {
+        JSON.parse(e.data).forEach(updateRow);
+    });
+})();
@@ -0,0 +1,18 @@
+import pytest
+
+from time_tracking.services.lookup_cache import clear_lookup_caches
+from time_tracking.services.report_cache import clear_report_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    # cache jest procesowy, a id w bazie testowej się powtarzają między testami
+    clear_report_cache()
+    clear_lookup_caches()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _enforce_query_budgets(settings):
+    # przekroczony budżet zapytań widoku (query_budget) oblewa test
+    settings.QUERY_BUDGET_MODE = "raise"
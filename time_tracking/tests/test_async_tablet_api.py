@@ -0,0 +1,90 @@
+import pytest
+from asgiref.sync import async_to_sync
+
+from core.models import Employee, Device
+from time_tracking.models import TimeEvent
+
+
+@pytest.mark.django_db
+class TestAsyncTabletApi:
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def _post(self, async_client, payload, **kwargs):
+        return async_to_sync(async_client.post)(
+            "/api/tablet/async/events/", payload, content_type="application/json", **kwargs
+        )
+
+    def test_status_matches_sync_endpoint(self, client, async_client, employee, device):
+        TimeEvent.objects.create(employee=employee, device=device, event_type=TimeEvent.CHECK_IN)
+        params = {"qr": employee.qr_token, "device": device.device_id}
+
+        sync_response = client.get("/api/tablet/status/", params)
+        async_response = async_to_sync(async_client.get)("/api/tablet/async/status/", params)
+
+        assert async_response.status_code == 200
+        assert async_response.json() == sync_response.json()
+        assert async_response.json()["actions"] == ["BREAK_START", "CHECK_OUT"]
+
+    def test_status_unknown_employee(self, async_client, device):
+        response = async_to_sync(async_client.get)(
+            "/api/tablet/async/status/", {"qr": "nope", "device": device.device_id}
+        )
+
+        assert response.status_code == 404
+
+    def test_event_registration_follows_state_machine(self, async_client, employee, device):
+        payload = {"qr": employee.qr_token, "device_id": device.device_id, "event_type": TimeEvent.CHECK_IN}
+
+        first = self._post(async_client, payload)
+        second = self._post(async_client, payload)
+
+        assert first.status_code == 201
+        assert first.json() == {"message": "Rozpoczęto pracę"}
+        assert second.status_code == 200
+        assert second.json() == {"message": "Praca już rozpoczęta"}
+        assert TimeEvent.objects.filter(employee=employee).count() == 1
+
+    def test_event_retry_with_idempotency_key_is_replayed(self, async_client, employee, device):
+        payload = {"qr": employee.qr_token, "device_id": device.device_id, "event_type": TimeEvent.CHECK_IN}
+
+        first = self._post(async_client, payload, headers={"Idempotency-Key": "scan-1"})
+        retry = self._post(async_client, payload, headers={"Idempotency-Key": "scan-1"})
+
+        assert retry.status_code == first.status_code == 201
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert TimeEvent.objects.filter(employee=employee).count() == 1
+
+    def test_event_key_reused_with_different_body(self, client, async_client, employee, device):
+        payload = {"qr": employee.qr_token, "device_id": device.device_id, "event_type": TimeEvent.CHECK_IN}
+        client.post("/api/tablet/events/", payload, content_type="application/json", headers={"Idempotency-Key": "k"})
+
+        replayed = self._post(async_client, payload, headers={"Idempotency-Key": "k"})
+        conflict = self._post(
+            async_client, {**payload, "event_type": TimeEvent.CHECK_OUT}, headers={"Idempotency-Key": "k"}
+        )
+
+        assert replayed["Idempotent-Replayed"] == "true"
+        assert conflict.status_code == 422
+        assert TimeEvent.objects.filter(employee=employee).count() == 1
+
+    @pytest.mark.parametrize("qr", [["x"], {"token": "x"}])
+    def test_event_with_non_string_qr(self, client, async_client, device, qr):
+        payload = {"qr": qr, "device_id": device.device_id, "event_type": TimeEvent.CHECK_IN}
+
+        response = self._post(async_client, payload)
+        sync_response = client.post("/api/tablet/events/", payload, content_type="application/json")
+
+        assert response.status_code == sync_response.status_code == 404
+
+    def test_event_missing_data(self, async_client):
+        response = self._post(async_client, {"qr": "x"})
+
+        assert response.status_code == 400
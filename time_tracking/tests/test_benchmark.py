@@ -0,0 +1,41 @@
+import copy
+
+import pytest
+
+from time_tracking.services.benchmark import BenchSize, compare_results, run_suite
+
+
+@pytest.mark.django_db
+class TestBenchmarkSuite:
+
+    @pytest.fixture
+    def results(self):
+        return run_suite(BenchSize(employees=3, days=2, events_per_day=4), repeat=1)
+
+    def test_every_case_reports_time_queries_and_memory(self, results):
+        assert results["meta"]["size"] == {"employees": 3, "days": 2, "events_per_day": 4}
+        assert {"report.events", "live_dashboard", "register_event", "api.report_csv"} <= set(results["results"])
+        for result in results["results"].values():
+            assert result["wall_ms"]["min"] <= result["wall_ms"]["median"] <= result["wall_ms"]["max"]
+            assert result["queries"] >= 1
+            assert result["peak_kib"] > 0
+
+    def test_compare_flags_regressions(self, results):
+        slower = copy.deepcopy(results)
+        slower["results"]["report.events"]["wall_ms"]["median"] += 1000
+        slower["results"]["live_dashboard"]["queries"] += 1
+
+        regressions = compare_results(slower, results)
+
+        assert compare_results(results, results) == []
+        assert {(r["case"], r["metric"]) for r in regressions} == {
+            ("report.events", "wall_ms.median"),
+            ("live_dashboard", "queries"),
+        }
+
+    def test_compare_rejects_baseline_of_other_size(self, results):
+        other = copy.deepcopy(results)
+        other["meta"]["size"]["employees"] = 1000
+
+        with pytest.raises(ValueError):
+            compare_results(results, other)
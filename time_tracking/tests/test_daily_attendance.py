@@ -0,0 +1,107 @@
+from datetime import date, time, datetime
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import DailyAttendance, WorkSchedule, TimeEvent
+from time_tracking.services.report_service import build_attendance_report
+
+
+@pytest.mark.django_db
+class TestDailyAttendance:
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(
+            first_name="Jan",
+            last_name="Kowalski",
+        )
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(
+            name="Tablet 1",
+            device_id="tablet-1",
+        )
+
+    def _event(self, employee, device, event_type, hour, minute=0):
+        return TimeEvent.objects.create(
+            employee=employee,
+            device=device,
+            event_type=event_type,
+            timestamp=timezone.make_aware(datetime(2025, 12, 14, hour, minute)),
+        )
+
+    def test_row_follows_events_and_schedule(self, employee, device):
+        d = date(2025, 12, 14)
+
+        schedule = WorkSchedule.objects.create(
+            employee=employee,
+            date=d,
+            day_type=WorkSchedule.WORK,
+            planned_start=time(8, 0),
+            planned_end=time(16, 0),
+        )
+
+        row = DailyAttendance.objects.get(employee=employee, date=d)
+        assert row.absence is True
+        assert row.planned_minutes == 480
+
+        self._event(employee, device, TimeEvent.CHECK_IN, 8, 20)
+        self._event(employee, device, TimeEvent.CHECK_OUT, 16)
+
+        row.refresh_from_db()
+        assert row.absence is False
+        assert row.worked_minutes == 460
+        assert row.late_diff_minutes == 20
+
+        schedule.delete()
+
+        row.refresh_from_db()
+        assert row.day_type == "NO_SCHEDULE"
+        assert row.late_diff_minutes is None
+
+    def test_day_without_schedule_and_events_has_no_row(self, employee, device):
+        event = self._event(employee, device, TimeEvent.CHECK_IN, 9)
+        assert DailyAttendance.objects.filter(employee=employee).exists()
+
+        event.delete()
+        assert not DailyAttendance.objects.filter(employee=employee).exists()
+
+    def test_rebuild_command_restores_rows(self, employee, device):
+        d = date(2025, 12, 14)
+        WorkSchedule.objects.create(
+            employee=employee,
+            date=d,
+            day_type=WorkSchedule.WORK,
+            planned_start=time(8, 0),
+            planned_end=time(16, 0),
+        )
+        self._event(employee, device, TimeEvent.CHECK_IN, 8)
+        self._event(employee, device, TimeEvent.BREAK_START, 12)
+
+        DailyAttendance.objects.all().delete()
+        call_command("rebuild_daily_attendance", "--from", "2025-12-01", "--to", "2025-12-31")
+
+        assert build_attendance_report(date_from=d, date_to=d) == build_attendance_report(
+            date_from=d, date_to=d, source="events"
+        )
+
+    def test_migration_backfills_days_from_before_upgrade(self, employee, device):
+        d = date(2025, 12, 14)
+        self._event(employee, device, TimeEvent.CHECK_IN, 8)
+        self._event(employee, device, TimeEvent.CHECK_OUT, 16)
+        # tabela utworzona przez 0003 na istniejącej bazie – bez wierszy
+        DailyAttendance.objects.all().delete()
+
+        migration = import_module("time_tracking.migrations.0009_backfill_daily_attendance")
+        migration.backfill_daily_attendance(apps, None)
+
+        assert DailyAttendance.objects.filter(employee=employee, date=d).exists()
+        assert build_attendance_report(date_from=d, date_to=d) == build_attendance_report(
+            date_from=d, date_to=d, source="events"
+        )
@@ -0,0 +1,151 @@
+import zlib
+from datetime import date, datetime, time
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import DailyAttendance, TimeEvent, WorkSchedule
+from time_tracking.services import event_archive
+from time_tracking.services.event_archive import archive_month, open_segment, segment_path
+from time_tracking.services.report_csv import build_attendance_csv
+from time_tracking.services.report_service import build_attendance_report
+
+AUGUST = date(2025, 8, 1)
+
+
+@pytest.mark.django_db
+class TestEventArchive:
+
+    @pytest.fixture(autouse=True)
+    def archive_dir(self, settings, tmp_path):
+        settings.EVENT_ARCHIVE_DIR = tmp_path
+        return tmp_path
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def _event(self, employee, device, event_type, d, hh, mm):
+        return TimeEvent.objects.create(
+            employee=employee,
+            device=device,
+            event_type=event_type,
+            timestamp=timezone.make_aware(datetime.combine(d, time(hh, mm))),
+        )
+
+    @pytest.fixture
+    def employees(self, device):
+        employees = []
+        for i, d in enumerate([date(2025, 8, 29), date(2025, 8, 31), date(2025, 9, 1)]):
+            emp = Employee.objects.create(first_name=f"Jan{i}", last_name="Kowalski")
+            for day in (d, date(2025, 9, 2)):
+                WorkSchedule.objects.create(
+                    employee=emp, date=day, day_type=WorkSchedule.WORK,
+                    planned_start=time(8, 0), planned_end=time(16, 0),
+                )
+                self._event(emp, device, TimeEvent.CHECK_IN, day, 8, 10 + i)
+                self._event(emp, device, TimeEvent.BREAK_START, day, 12, 0)
+                self._event(emp, device, TimeEvent.BREAK_END, day, 12, 30)
+                self._event(emp, device, TimeEvent.CHECK_OUT, day, 16, 5)
+            employees.append(emp)
+        return employees
+
+    def _reports(self):
+        kwargs = {"date_from": date(2025, 8, 25), "date_to": date(2025, 9, 5)}
+        return (
+            build_attendance_report(source="events", **kwargs),
+            build_attendance_report(source="summary", **kwargs),
+            build_attendance_csv(**kwargs),
+        )
+
+    def test_archived_month_reads_like_hot_table(self, employees):
+        before = self._reports()
+        summaries = list(DailyAttendance.objects.order_by("id").values())
+
+        moved = archive_month(AUGUST)
+
+        assert moved == 8
+        assert not TimeEvent.objects.filter(local_date__lt=date(2025, 9, 1)).exists()
+        assert TimeEvent.objects.count() == 16
+        assert segment_path(AUGUST).exists()
+        # podsumowania dni nie są przeliczane przy przenoszeniu
+        assert list(DailyAttendance.objects.order_by("id").values()) == summaries
+        assert self._reports() == before
+
+    def test_segment_keeps_event_fields(self, employees):
+        TimeEvent.objects.filter(employee=employees[0], event_type=TimeEvent.CHECK_OUT).update(
+            is_anomaly=True, anomaly_reason="Ręczna korekta – wyjście"
+        )
+        original = list(TimeEvent.objects.filter(employee=employees[0], local_date=date(2025, 8, 29)))
+
+        archive_month(AUGUST)
+        archived = open_segment(AUGUST).day_events(employees[0].id, 29)
+
+        fields = (
+            "id", "employee_id", "device_id", "event_type", "timestamp", "local_date", "sequence",
+            "is_anomaly", "anomaly_reason",
+        )
+        assert [[getattr(ev, f) for f in fields] for ev in archived] == [
+            [getattr(ev, f) for f in fields] for ev in original
+        ]
+
+    def test_refresh_of_archived_day_uses_segment(self, employees):
+        archive_month(AUGUST)
+
+        # zmiana grafiku zarchiwizowanego dnia przelicza podsumowanie ze zdarzeń z segmentu
+        schedule = WorkSchedule.objects.get(employee=employees[0], date=date(2025, 8, 29))
+        schedule.planned_start = time(8, 5)
+        schedule.save()
+
+        row = DailyAttendance.objects.get(employee=employees[0], date=date(2025, 8, 29))
+        assert row.worked_minutes == 445
+        assert row.late_diff_minutes == 5
+
+    def test_late_events_are_merged_into_existing_segment(self, employees, device):
+        archive_month(AUGUST)
+        late = self._event(employees[0], device, TimeEvent.CHECK_IN, date(2025, 8, 30), 9, 0)
+
+        assert archive_month(AUGUST) == 1
+
+        segment = open_segment(AUGUST)
+        assert segment.count() == 9
+        assert [ev.id for ev in segment.day_events(employees[0].id, 30)] == [late.id]
+
+    def test_version_1_segment_is_read_and_upgraded_on_merge(self, employees, device):
+        before = self._reports()
+        august = list(TimeEvent.objects.filter(local_date__lt=date(2025, 9, 1)).order_by("employee_id", "timestamp"))
+        # segment zapisany przed wersją 2: blok to same rekordy, bez liczby zdarzeń i anomalii
+        blocks = {}
+        for ev in august:
+            blocks.setdefault((ev.employee_id, ev.local_date.day), []).append(event_archive._RECORD_V1.pack(
+                event_archive._to_us(ev.timestamp), ev.id, ev.device_id, ev.sequence,
+                event_archive.EVENT_TYPES.index(ev.event_type),
+            ))
+        index, data, offset = [], [], 0
+        for (employee_id, day), records in sorted(blocks.items()):
+            block = zlib.compress(b"".join(records))
+            index.append(event_archive._ENTRY.pack(employee_id, day, offset, len(block)))
+            data.append(block)
+            offset += len(block)
+        segment_path(AUGUST).write_bytes(
+            event_archive._HEADER.pack(event_archive.MAGIC, 1, len(index)) + b"".join(index + data)
+        )
+        TimeEvent.objects.filter(id__in=[ev.id for ev in august]).delete()
+
+        assert open_segment(AUGUST).count() == 8
+        assert self._reports()[0] == before[0]
+
+        self._event(employees[0], device, TimeEvent.CHECK_IN, date(2025, 8, 30), 9, 0)
+        archive_month(AUGUST)
+
+        assert open_segment(AUGUST).version == event_archive.VERSION == 2
+        assert open_segment(AUGUST).count() == 9
+
+    def test_command_keeps_recent_months(self, employees):
+        call_command("archive_events", before="2025-09")
+
+        assert segment_path(AUGUST).exists()
+        assert not segment_path(date(2025, 9, 1)).exists()
+        assert TimeEvent.objects.count() == 16
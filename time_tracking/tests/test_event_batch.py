@@ -0,0 +1,92 @@
+from datetime import date
+
+import pytest
+
+from core.models import Employee, Device
+from time_tracking.models import DailyAttendance, TimeEvent
+
+
+@pytest.mark.django_db
+class TestTabletEventBatch:
+
+    URL = "/api/tablet/events/batch/"
+
+    @pytest.fixture
+    def employees(self):
+        return [
+            Employee.objects.create(first_name="Jan", last_name="Kowalski"),
+            Employee.objects.create(first_name="Anna", last_name="Nowak"),
+        ]
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def _item(self, employee, event_type, hm):
+        return {"qr": employee.qr_token, "event_type": event_type, "timestamp": f"2025-12-14T{hm}:00+00:00"}
+
+    def test_sequence_is_validated_per_employee(self, client, employees, device):
+        jan, anna = employees
+        events = [
+            self._item(jan, TimeEvent.CHECK_IN, "08:00"),
+            self._item(anna, TimeEvent.CHECK_OUT, "08:01"),  # Anna nie pracuje
+            self._item(anna, TimeEvent.CHECK_IN, "08:02"),
+            self._item(jan, TimeEvent.BREAK_START, "12:00"),
+            self._item(jan, TimeEvent.CHECK_IN, "12:10"),  # już pracuje
+            self._item(jan, TimeEvent.CHECK_OUT, "16:00"),
+            {"qr": "unknown", "event_type": TimeEvent.CHECK_IN, "timestamp": "2025-12-14T08:00:00+00:00"},
+        ]
+
+        response = client.post(
+            self.URL, {"device_id": device.device_id, "events": events}, content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["status"] for r in data["results"]] == [
+            "accepted", "rejected", "accepted", "accepted", "rejected", "accepted", "rejected",
+        ]
+        assert data["accepted"] == 4
+        assert data["results"][1]["message"] == "Nie pracujesz"
+
+        stored = list(TimeEvent.objects.filter(employee=jan).values_list("event_type", flat=True))
+        assert stored == [TimeEvent.CHECK_IN, TimeEvent.BREAK_START, TimeEvent.CHECK_OUT]
+
+        # bulk_create pomija sygnały – podsumowanie dnia i tak musi być aktualne
+        row = DailyAttendance.objects.get(employee=jan, date=date(2025, 12, 14))
+        assert row.worked_minutes == 480
+        assert row.anomalies == [{"type": "BREAK_WITHOUT_END", "detail": "Break started but not ended"}]
+
+    def test_batch_continues_from_stored_state(self, client, employees, device):
+        jan, _ = employees
+        client.post(self.URL, {"device_id": device.device_id, "events": [self._item(jan, TimeEvent.CHECK_IN, "08:00")]},
+                    content_type="application/json")
+
+        response = client.post(self.URL, {"device_id": device.device_id, "events": [
+            self._item(jan, TimeEvent.CHECK_IN, "09:00"),
+            self._item(jan, TimeEvent.CHECK_OUT, "07:00"),  # starsze niż zapisane
+            self._item(jan, TimeEvent.CHECK_OUT, "16:00"),
+        ]}, content_type="application/json")
+
+        assert [r["status"] for r in response.json()["results"]] == ["rejected", "rejected", "accepted"]
+
+    def test_unknown_device_rejects_whole_batch(self, client, employees):
+        response = client.post(self.URL, {"device_id": "nope", "events": []}, content_type="application/json")
+
+        assert response.status_code == 400
+
+    def test_wrongly_typed_values_are_rejected_per_item(self, client, employees, device):
+        jan, _ = employees
+        events = [
+            {"qr": [jan.qr_token], "event_type": TimeEvent.CHECK_IN, "timestamp": "2025-12-14T08:00:00+00:00"},
+            {"qr": jan.qr_token, "event_type": {"type": "CHECK_IN"}, "timestamp": "2025-12-14T08:00:00+00:00"},
+            self._item(jan, TimeEvent.CHECK_IN, "08:00"),
+        ]
+
+        response = client.post(
+            self.URL, {"device_id": device.device_id, "events": events}, content_type="application/json"
+        )
+        bad_device = client.post(self.URL, {"device_id": ["tablet-1"], "events": []}, content_type="application/json")
+
+        assert [r["status"] for r in response.json()["results"]] == ["rejected", "rejected", "accepted"]
+        assert bad_device.status_code == 400
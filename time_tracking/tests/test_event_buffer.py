@@ -0,0 +1,147 @@
+import json
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import DailyAttendance, TimeEvent
+from time_tracking.services.event_buffer import _try_lock, event_buffer
+from time_tracking.services.event_service import register_event, register_events_batch
+from time_tracking.services.tablet_state import get_employee_state
+
+
+@pytest.mark.django_db
+class TestEventWriteBehind:
+
+    @pytest.fixture(autouse=True)
+    def write_behind(self, settings, tmp_path):
+        settings.EVENT_WRITE_BEHIND = True
+        settings.EVENT_JOURNAL_PATH = tmp_path / "journal.jsonl"
+        settings.EVENT_FLUSH_INTERVAL_MS = 0  # bez wątku – flush w teście
+        settings.EVENT_FLUSH_MAX_EVENTS = 100
+        event_buffer.reset()
+        yield settings.EVENT_JOURNAL_PATH
+        event_buffer.reset()
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def _journal(self, path):
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    def test_event_is_journaled_and_visible_before_flush(self, employee, device, write_behind):
+        event, message = register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+
+        assert message == "Rozpoczęto pracę"
+        assert event.pk is None
+        assert not TimeEvent.objects.exists()
+        assert [r["event_type"] for r in self._journal(write_behind)] == [TimeEvent.CHECK_IN]
+
+        # stan czytany przez bufor – drugi CHECK_IN odrzucony
+        assert get_employee_state(employee).state == "WORKING"
+        event, message = register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+        assert event is None
+        assert message == "Praca już rozpoczęta"
+
+    def test_flush_inserts_batch_and_truncates_journal(
+            self, employee, device, write_behind, django_capture_on_commit_callbacks
+    ):
+        register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+        register_event(employee=employee, event_type=TimeEvent.BREAK_START, device_id=device.device_id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert event_buffer.flush() == 2
+
+        stored = list(TimeEvent.objects.filter(employee=employee).order_by("sequence"))
+        assert [(ev.event_type, ev.sequence) for ev in stored] == [(TimeEvent.CHECK_IN, 1), (TimeEvent.BREAK_START, 2)]
+        assert DailyAttendance.objects.filter(employee=employee, date=timezone.localdate()).exists()
+        assert event_buffer.pending_count() == 0
+        assert write_behind.read_text() == ""
+        assert get_employee_state(employee).state == "ON_BREAK"
+
+    def test_full_buffer_is_flushed(self, employee, device, settings, django_capture_on_commit_callbacks):
+        settings.EVENT_FLUSH_MAX_EVENTS = 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+            assert not TimeEvent.objects.exists()
+            register_event(employee=employee, event_type=TimeEvent.CHECK_OUT, device_id=device.device_id)
+
+        assert TimeEvent.objects.filter(employee=employee).count() == 2
+
+    def test_recover_replays_journal_once(self, employee, device, write_behind):
+        ts = timezone.now()
+        flushed = TimeEvent.objects.create(
+            employee=employee, device=device, event_type=TimeEvent.CHECK_IN, timestamp=ts
+        )
+        records = [
+            # zapisane w bazie przed awarią, ale jeszcze w dzienniku
+            {"employee_id": employee.id, "device_id": device.id, "event_type": TimeEvent.CHECK_IN,
+             "timestamp": ts.isoformat(), "local_date": flushed.local_date.isoformat(), "sequence": 1},
+            {"employee_id": employee.id, "device_id": device.id, "event_type": TimeEvent.CHECK_OUT,
+             "timestamp": ts.isoformat(), "local_date": flushed.local_date.isoformat(), "sequence": 2},
+        ]
+        write_behind.write_text("".join(json.dumps(r) + "\n" for r in records) + '{"employee_id": 1, "dev')
+
+        # CHECK_IN był już w bazie – dopisany zostaje tylko CHECK_OUT
+        assert event_buffer.recover() == 1
+
+        assert list(TimeEvent.objects.filter(employee=employee).values_list("event_type", flat=True)) == [
+            TimeEvent.CHECK_IN, TimeEvent.CHECK_OUT,
+        ]
+        assert write_behind.read_text() == ""
+
+    def test_batch_flushes_buffer_first(self, employee, device, django_capture_on_commit_callbacks):
+        register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            results, error = register_events_batch(device.device_id, [{
+                "qr": employee.qr_token,
+                "event_type": TimeEvent.CHECK_OUT,
+                "timestamp": timezone.now().isoformat(),
+            }])
+
+        assert error is None
+        assert results[0]["status"] == "accepted"
+        assert list(TimeEvent.objects.filter(employee=employee).values_list("sequence", flat=True)) == [1, 2]
+        assert event_buffer.pending_count() == 0
+
+    def test_event_created_outside_buffer_gets_next_sequence(
+            self, employee, device, django_capture_on_commit_callbacks
+    ):
+        register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+        manual = TimeEvent.objects.create(employee=employee, device=device, event_type=TimeEvent.CHECK_OUT)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert event_buffer.flush() == 1
+
+        assert manual.sequence == 2
+        assert TimeEvent.objects.filter(employee=employee).count() == 2
+
+    def test_flush_renumbers_taken_sequence(self, employee, device, django_capture_on_commit_callbacks):
+        register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+        # zapis z innej ścieżki, który zajął numer zdarzenia z bufora
+        TimeEvent.objects.create(employee=employee, device=device, event_type=TimeEvent.CHECK_OUT, sequence=1)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert event_buffer.flush() == 1
+
+        assert sorted(TimeEvent.objects.filter(employee=employee).values_list("event_type", "sequence")) == [
+            (TimeEvent.CHECK_IN, 2), (TimeEvent.CHECK_OUT, 1),
+        ]
+
+    def test_second_process_is_refused(self, employee, device, write_behind):
+        # inny proces trzyma dziennik
+        with open(write_behind.with_name(write_behind.name + ".lock"), "a+") as other:
+            assert _try_lock(other)
+
+            with pytest.raises(ImproperlyConfigured):
+                register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+
+        assert not TimeEvent.objects.exists()
@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+
+import pytest
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from core.models import Employee, Device
+from time_tracking.models import TimeEvent
+from time_tracking.services import event_service
+from time_tracking.services.event_service import TRANSITIONS, check_transition, register_event
+
+
+@pytest.mark.django_db
+class TestEventSequence:
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def test_events_are_numbered_per_employee_and_day(self, employee, device):
+        other = Employee.objects.create(first_name="Anna", last_name="Nowak")
+
+        register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+        register_event(employee=other, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+        register_event(employee=employee, event_type=TimeEvent.CHECK_OUT, device_id=device.device_id)
+
+        assert list(TimeEvent.objects.filter(employee=employee).values_list("sequence", flat=True)) == [1, 2]
+        assert list(TimeEvent.objects.filter(employee=other).values_list("sequence", flat=True)) == [1]
+
+    def test_duplicate_sequence_is_rejected_by_database(self, employee, device):
+        ev = TimeEvent.objects.create(employee=employee, device=device, event_type=TimeEvent.CHECK_IN)
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            TimeEvent.objects.create(
+                employee=employee, device=device, event_type=TimeEvent.CHECK_IN, sequence=ev.sequence
+            )
+
+    def test_stale_state_is_reevaluated_after_conflict(self, employee, device, monkeypatch):
+        # inny worker zapisał CHECK_IN między naszym odczytem a insertem
+        TimeEvent.objects.create(employee=employee, device=device, event_type=TimeEvent.CHECK_IN)
+        real_load = event_service.load_day_events
+        reads = []
+
+        def stale_then_real(emp, day):
+            reads.append(day)
+            return [] if len(reads) == 1 else real_load(emp, day)
+
+        monkeypatch.setattr(event_service, "load_day_events", stale_then_real)
+
+        event, message = register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+
+        assert event is None
+        assert message == "Praca już rozpoczęta"
+        assert len(reads) == 2
+        assert TimeEvent.objects.filter(employee=employee).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentRegistration:
+
+    EMPLOYEES = 4
+    SCANS_PER_EMPLOYEE = 6
+
+    def _scan(self, employee, event_type, device_id, barrier, outcomes, lock):
+        try:
+            barrier.wait()
+            while True:
+                try:
+                    event, _ = register_event(employee=employee, event_type=event_type, device_id=device_id)
+                    break
+                except OperationalError:
+                    # baza zajęta przez innego piszącego – tablet ponawia skan
+                    time.sleep(0.001)
+            with lock:
+                outcomes.append((employee.id, event_type, event is not None))
+        finally:
+            connection.close()
+
+    def _run_parallel(self, jobs, device):
+        barrier = threading.Barrier(len(jobs))
+        outcomes = []
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(target=self._scan, args=(emp, event_type, device.device_id, barrier, outcomes, lock))
+            for emp, event_type in jobs
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(outcomes) == len(jobs)
+        return outcomes
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    @pytest.fixture
+    def employees(self):
+        return [
+            Employee.objects.create(first_name="Jan", last_name=f"Kowalski {i}") for i in range(self.EMPLOYEES)
+        ]
+
+    def test_simultaneous_check_ins_store_exactly_one(self, device, employees):
+        jobs = [(emp, TimeEvent.CHECK_IN) for emp in employees for _ in range(self.SCANS_PER_EMPLOYEE)]
+
+        outcomes = self._run_parallel(jobs, device)
+
+        for emp in employees:
+            assert sum(1 for o in outcomes if o[0] == emp.id and o[2]) == 1
+            assert TimeEvent.objects.filter(employee=emp, event_type=TimeEvent.CHECK_IN).count() == 1
+
+    def test_mixed_scans_keep_per_employee_invariants(self, device, employees):
+        rnd = random.Random(12)
+        jobs = [(emp, rnd.choice(list(TRANSITIONS))) for emp in employees for _ in range(2 * self.SCANS_PER_EMPLOYEE)]
+
+        outcomes = self._run_parallel(jobs, device)
+
+        for emp in employees:
+            stored = list(TimeEvent.objects.filter(employee=emp).order_by("sequence"))
+            accepted = [o for o in outcomes if o[0] == emp.id and o[2]]
+
+            # każdy przyjęty skan zapisany dokładnie raz, numery bez dziur i duplikatów
+            assert len(stored) == len(accepted)
+            assert [ev.sequence for ev in stored] == list(range(1, len(stored) + 1))
+
+            # zapisana historia jest poprawna wg maszyny stanów (np. brak podwójnego CHECK_IN)
+            state = "OFF_DUTY"
+            for ev in stored:
+                ok, _ = check_transition(state, ev.event_type)
+                assert ok, [e.event_type for e in stored]
+                state = TRANSITIONS[ev.event_type][3]
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import IdempotencyKey, TimeEvent
+
+
+@pytest.mark.django_db
+class TestIdempotentEventRegistration:
+
+    URL = "/api/tablet/events/"
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def _post(self, client, employee, device, key, event_type=TimeEvent.CHECK_IN, url=URL):
+        return client.post(
+            url,
+            {"qr": employee.qr_token, "device_id": device.device_id, "event_type": event_type},
+            content_type="application/json",
+            headers={"Idempotency-Key": key},
+        )
+
+    def test_retry_returns_original_response_without_writing(
+            self, client, employee, device, django_assert_num_queries
+    ):
+        first = self._post(client, employee, device, "scan-1")
+        assert first.status_code == 201
+
+        with django_assert_num_queries(1):
+            retry = self._post(client, employee, device, "scan-1")
+
+        assert retry.status_code == 201
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert TimeEvent.objects.count() == 1
+
+    def test_different_key_is_evaluated_normally(self, client, employee, device):
+        self._post(client, employee, device, "scan-1")
+        second = self._post(client, employee, device, "scan-2")
+
+        assert second.status_code == 200
+        assert second.json()["message"] == "Praca już rozpoczęta"
+
+    def test_expired_key_is_reused(self, client, employee, device):
+        self._post(client, employee, device, "scan-1")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        again = self._post(client, employee, device, "scan-1", event_type=TimeEvent.CHECK_OUT)
+
+        assert again.status_code == 201
+        assert TimeEvent.objects.count() == 2
+        assert IdempotencyKey.objects.count() == 1
+
+    def test_same_key_with_different_body_is_rejected(self, client, employee, device):
+        self._post(client, employee, device, "scan-1")
+
+        response = self._post(client, employee, device, "scan-1", event_type=TimeEvent.CHECK_OUT)
+
+        assert response.status_code == 422
+        assert "Idempotent-Replayed" not in response
+        assert TimeEvent.objects.count() == 1
+
+    def test_key_is_scoped_by_device_and_endpoint(self, client, employee, device):
+        other_device = Device.objects.create(name="Tablet 2", device_id="tablet-2")
+        other = Employee.objects.create(first_name="Anna", last_name="Nowak")
+
+        self._post(client, employee, device, "scan-1")
+        from_other_device = self._post(client, other, other_device, "scan-1")
+        on_batch_endpoint = self._post(client, employee, device, "scan-1", url="/api/tablet/events/batch/")
+
+        assert from_other_device.status_code == 201
+        assert "Idempotent-Replayed" not in from_other_device
+        assert on_batch_endpoint.status_code == 400
+        assert TimeEvent.objects.filter(employee=other).count() == 1
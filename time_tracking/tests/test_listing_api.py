@@ -0,0 +1,109 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import TimeEvent, WorkSchedule
+
+
+@pytest.mark.django_db
+class TestWorkScheduleListing:
+
+    URL = "/api/admin/schedules/"
+
+    @pytest.fixture
+    def employees(self):
+        return [
+            Employee.objects.create(first_name="Jan", last_name="Kowalski"),
+            Employee.objects.create(first_name="Anna", last_name="Nowak"),
+        ]
+
+    @pytest.fixture
+    def schedules(self, employees):
+        rows = []
+        for offset in range(3):
+            for emp in employees:
+                rows.append(WorkSchedule.objects.create(
+                    employee=emp,
+                    date=date(2025, 12, 1) + timedelta(days=offset),
+                    day_type=WorkSchedule.WORK,
+                    planned_start=time(8, 0),
+                    planned_end=time(16, 0),
+                ))
+        return rows
+
+    def _all_pages(self, client, url, django_assert_num_queries=None):
+        pages = []
+        while url:
+            if django_assert_num_queries is not None:
+                # stała liczba zapytań na stronę, niezależnie od jej numeru
+                with django_assert_num_queries(1):
+                    response = client.get(url)
+            else:
+                response = client.get(url)
+            assert response.status_code == 200
+            pages.append(response.json()["results"])
+            url = response.json()["next"]
+        return pages
+
+    def test_pages_follow_date_id_order(self, client, schedules, django_assert_num_queries):
+        pages = self._all_pages(client, f"{self.URL}?limit=4", django_assert_num_queries)
+
+        assert [len(p) for p in pages] == [4, 2]
+        ids = [row["id"] for page in pages for row in page]
+        assert ids == [s.id for s in sorted(schedules, key=lambda s: (s.date, s.id))]
+
+        first = pages[0][0]
+        assert first["employee"] == "Jan Kowalski"
+        assert first["date"] == "2025-12-01"
+        assert first["planned_start"] == "08:00:00"
+
+    def test_filters_are_kept_between_pages(self, client, employees, schedules):
+        jan = employees[0]
+        pages = self._all_pages(client, f"{self.URL}?limit=2&employee_id={jan.id}&from=2025-12-02&to=2025-12-03")
+
+        rows = [row for page in pages for row in page]
+        assert [(row["employee_id"], row["date"]) for row in rows] == [
+            (jan.id, "2025-12-02"), (jan.id, "2025-12-03"),
+        ]
+
+    def test_invalid_cursor(self, client):
+        response = client.get(f"{self.URL}?cursor=nope")
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestTimeEventListing:
+
+    URL = "/api/admin/events/"
+
+    def test_events_with_equal_timestamps_are_not_skipped(self, client):
+        employee = Employee.objects.create(first_name="Jan", last_name="Kowalski")
+        device = Device.objects.create(name="Tablet 1", device_id="tablet-1")
+        ts = timezone.make_aware(datetime(2025, 12, 1, 8, 0))
+        # ten sam czas z dwóch tabletów – kolejność rozstrzyga id
+        events = [
+            TimeEvent.objects.create(employee=employee, device=device, event_type=TimeEvent.CHECK_IN, timestamp=ts),
+            TimeEvent.objects.create(employee=employee, device=device, event_type=TimeEvent.BREAK_START, timestamp=ts),
+            TimeEvent.objects.create(
+                employee=employee, device=device, event_type=TimeEvent.BREAK_END, timestamp=ts + timedelta(minutes=5)
+            ),
+        ]
+
+        first = client.get(f"{self.URL}?limit=1").json()
+        second = client.get(first["next"]).json()
+        third = client.get(second["next"]).json()
+
+        assert [p["results"][0]["id"] for p in (first, second, third)] == [ev.id for ev in events]
+        assert third["next"] is None
+        assert second["results"][0] == {
+            "id": events[1].id,
+            "employee_id": employee.id,
+            "device_id": "tablet-1",
+            "event_type": TimeEvent.BREAK_START,
+            "timestamp": first["results"][0]["timestamp"],
+            "local_date": "2025-12-01",
+            "sequence": 2,
+        }
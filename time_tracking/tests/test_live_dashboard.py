@@ -0,0 +1,65 @@
+from datetime import date, time, datetime
+
+import pytest
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import WorkSchedule, TimeEvent
+from time_tracking.services.live_dashboard import get_live_dashboard
+
+
+@pytest.mark.django_db
+class TestLiveDashboard:
+
+    DAY = date(2025, 12, 14)
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(
+            name="Tablet 1",
+            device_id="tablet-1",
+        )
+
+    def _employee(self, device, i, events):
+        emp = Employee.objects.create(first_name=f"Jan{i}", last_name="Kowalski")
+        WorkSchedule.objects.create(
+            employee=emp,
+            date=self.DAY,
+            day_type=WorkSchedule.WORK,
+            planned_start=time(8, 0),
+            planned_end=time(16, 0),
+        )
+        for hour, event_type in events:
+            TimeEvent.objects.create(
+                employee=emp,
+                device=device,
+                event_type=event_type,
+                timestamp=timezone.make_aware(datetime.combine(self.DAY, time(hour, 0))),
+            )
+        return emp
+
+    @pytest.mark.parametrize("headcount", [1, 10])
+    def test_query_count_does_not_depend_on_headcount(self, device, headcount, django_assert_num_queries):
+        for i in range(headcount):
+            self._employee(device, i, [(8, TimeEvent.CHECK_IN), (12, TimeEvent.BREAK_START)])
+
+        # pracownicy + grafiki + wersje wzorców + zdarzenia
+        with django_assert_num_queries(4):
+            rows = get_live_dashboard(self.DAY)
+
+        assert len(rows) == headcount
+
+    def test_statuses(self, device):
+        absent = self._employee(device, 0, [])
+        working = self._employee(device, 1, [(8, TimeEvent.CHECK_IN)])
+        on_break = self._employee(device, 2, [(8, TimeEvent.CHECK_IN), (12, TimeEvent.BREAK_START)])
+        done = self._employee(device, 3, [(8, TimeEvent.CHECK_IN), (16, TimeEvent.CHECK_OUT)])
+
+        rows = {r["employee_id"]: r for r in get_live_dashboard(self.DAY)}
+
+        assert rows[absent.id]["status"] == "ABSENT"
+        assert rows[working.id]["status"] == "WORKING"
+        assert rows[on_break.id]["status"] == "ON_BREAK"
+        assert rows[done.id]["status"] == "OFF_DUTY"
+        assert rows[done.id]["in_time"] == "08:00"
+        assert rows[done.id]["out_time"] == "16:00"
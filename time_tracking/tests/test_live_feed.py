@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import TimeEvent
+from time_tracking.services.event_service import register_event
+from time_tracking.services.live_feed import LiveFeed, live_feed
+
+
+@pytest.mark.django_db
+class TestLiveFeed:
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    @pytest.fixture
+    def loop(self):
+        loop = asyncio.new_event_loop()
+        yield loop
+        loop.close()
+
+    def _receive(self, loop, sub):
+        return loop.run_until_complete(asyncio.wait_for(sub.queue.get(), timeout=1))
+
+    def test_registered_event_is_pushed_once_to_all_subscribers(
+            self, employee, device, loop, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        subs = [live_feed.subscribe(loop=loop) for _ in range(3)]
+        try:
+            with django_capture_on_commit_callbacks() as callbacks:
+                register_event(employee=employee, event_type=TimeEvent.CHECK_IN, device_id=device.device_id)
+
+            # jeden wiersz liczony raz dla wszystkich klientów
+            with django_assert_num_queries(4):
+                for callback in callbacks:
+                    callback()
+
+            for sub in subs:
+                rows = self._receive(loop, sub)
+                assert [r["employee_id"] for r in rows] == [employee.id]
+                assert rows[0]["status"] == "WORKING"
+        finally:
+            for sub in subs:
+                live_feed.unsubscribe(sub)
+
+    def test_poll_picks_up_events_from_other_processes(self, employee, device, loop):
+        feed = LiveFeed(poll_seconds=0)
+        sub = feed.subscribe(loop=loop)
+
+        feed.poll()  # ustala punkt startowy
+        TimeEvent.objects.create(
+            employee=employee,
+            device=device,
+            event_type=TimeEvent.CHECK_IN,
+            timestamp=timezone.now(),
+        )
+        feed.poll()
+
+        rows = self._receive(loop, sub)
+        assert rows[0]["employee_id"] == employee.id
+
+    def test_stream_is_only_used_under_asgi(self, client, async_client):
+        wsgi_panel = client.get("/api/admin-panel/live/")
+        asgi_panel = async_to_sync(async_client.get)("/api/admin-panel/live/")
+
+        assert b"live.js" not in wsgi_panel.content
+        assert b'data-stream-url="/api/admin-panel/live/stream/"' in asgi_panel.content
+        # pod WSGI nieskończony strumień zająłby wątek – 204 kończy ponowne łączenie EventSource
+        assert client.get("/api/admin-panel/live/stream/").status_code == 204
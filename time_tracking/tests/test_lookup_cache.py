@@ -0,0 +1,76 @@
+import pytest
+
+from core.models import Employee, Device
+from time_tracking.services.lookup_cache import LookupCache, get_device, get_employee_by_qr
+
+
+@pytest.mark.django_db
+class TestLookupCache:
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(
+            first_name="Jan",
+            last_name="Kowalski",
+        )
+
+    def test_employee_is_loaded_once(self, employee, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert get_employee_by_qr(employee.qr_token) == employee
+            assert get_employee_by_qr(employee.qr_token) == employee
+
+    def test_unknown_token_is_negatively_cached(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert get_employee_by_qr("nope") is None
+            assert get_employee_by_qr("nope") is None
+
+    def test_non_string_key_is_not_looked_up(self, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert get_employee_by_qr(["x"]) is None
+            assert get_device({"id": "x"}) is None
+
+    def test_save_invalidates_entry(self, employee):
+        assert get_employee_by_qr(employee.qr_token).is_active is True
+
+        employee.is_active = False
+        employee.save()
+
+        assert get_employee_by_qr(employee.qr_token).is_active is False
+
+    def test_new_device_replaces_negative_entry(self):
+        assert get_device("tablet-9") is None
+
+        device = Device.objects.create(name="Tablet 9", device_id="tablet-9")
+
+        assert get_device("tablet-9") == device
+
+    def test_renamed_device_is_dropped_under_old_id(self):
+        device = Device.objects.create(name="Tablet 9", device_id="tablet-9")
+        assert get_device("tablet-9") == device
+
+        device.device_id = "tablet-10"
+        device.save()
+
+        assert get_device("tablet-9") is None
+        assert get_device("tablet-10") == device
+
+
+def test_lru_eviction_and_ttl():
+    cache = LookupCache(maxsize=2, ttl=60, negative_ttl=0)
+    loads = []
+
+    def loader(key):
+        loads.append(key)
+        return None if key == "missing" else key
+
+    cache.get_or_load("a", loader)
+    cache.get_or_load("b", loader)
+    cache.get_or_load("a", loader)
+    cache.get_or_load("c", loader)  # wypycha "b" (najdawniej używany)
+    cache.get_or_load("b", loader)
+
+    # negative_ttl=0 – brak obiektu nie jest trzymany
+    cache.get_or_load("missing", loader)
+    cache.get_or_load("missing", loader)
+
+    assert loads == ["a", "b", "c", "b", "missing", "missing"]
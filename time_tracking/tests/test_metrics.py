@@ -0,0 +1,193 @@
+import re
+from datetime import date, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from core.models import Device, Employee
+from time_tracking.models import TimeEvent
+from time_tracking.services import metrics
+from time_tracking.services.event_service import register_event, register_events_batch
+from time_tracking.services.live_dashboard import get_live_dashboard
+from time_tracking.services.metrics import Counter, Histogram, Registry, report_range_label
+from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.tablet_state import get_employee_state
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+@pytest.fixture
+def employee():
+    return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+
+@pytest.fixture
+def device():
+    return Device.objects.create(device_id="tablet-1", name="Tablet")
+
+
+class TestExposition:
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.register(Histogram("demo_seconds", "Demo.", ["kind"], buckets=(0.1, 1.0)))
+        histogram.observe(0.05, kind="a")
+        histogram.observe(0.5, kind="a")
+        histogram.observe(5, kind="a")
+
+        text = registry.render()
+
+        assert "# TYPE demo_seconds histogram" in text
+        assert 'demo_seconds_bucket{kind="a",le="0.1"} 1' in text
+        assert 'demo_seconds_bucket{kind="a",le="1.0"} 2' in text
+        assert 'demo_seconds_bucket{kind="a",le="+Inf"} 3' in text
+        assert 'demo_seconds_count{kind="a"} 3' in text
+        assert 'demo_seconds_sum{kind="a"} 5.55' in text
+
+    def test_counter_escapes_labels_and_checks_names(self):
+        registry = Registry()
+        counter = registry.register(Counter("demo_total", "Demo.", ["name"]))
+        counter.inc(2, name='a"b')
+
+        assert 'demo_total{name="a\\"b"} 2' in registry.render()
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+        with pytest.raises(ValueError):
+            registry.register(Counter("demo_total", "Duplicate."))
+
+    def test_disabled_metrics_are_not_recorded(self, settings):
+        settings.METRICS_ENABLED = False
+        metrics.DASHBOARD_SECONDS.observe(0.1, scope="full")
+
+        assert metrics.DASHBOARD_SECONDS.count(scope="full") == 0
+
+    @pytest.mark.parametrize("days, label", [(1, "day"), (7, "week"), (30, "month"), (90, "quarter"), (400, "longer")])
+    def test_report_range_label(self, days, label):
+        assert report_range_label(date(2024, 1, 1), date(2024, 1, 1) + timedelta(days=days - 1)) == label
+
+
+@pytest.mark.django_db
+class TestHotPaths:
+
+    def test_register_event_outcomes(self, employee, device):
+        register_event(employee, TimeEvent.CHECK_IN, device.device_id)
+        register_event(employee, TimeEvent.CHECK_IN, device.device_id)
+
+        assert metrics.REGISTER_EVENTS.value(mode="single", outcome="accepted") == 1
+        assert metrics.REGISTER_EVENTS.value(mode="single", outcome="rejected") == 1
+        assert metrics.REGISTER_EVENT_SECONDS.count(mode="single") == 2
+
+    def test_batch_outcomes_are_counted_per_item(self, employee, device):
+        now = timezone.now()
+        items = [
+            {"qr": employee.qr_token, "event_type": TimeEvent.CHECK_IN, "timestamp": now.isoformat()},
+            {"qr": "brak", "event_type": TimeEvent.CHECK_IN, "timestamp": now.isoformat()},
+        ]
+        register_events_batch(device.device_id, items)
+        register_events_batch("nieznane", items)
+
+        assert metrics.REGISTER_EVENTS.value(mode="batch", outcome="accepted") == 1
+        assert metrics.REGISTER_EVENTS.value(mode="batch", outcome="rejected") == 3
+        assert metrics.REGISTER_EVENT_SECONDS.count(mode="batch") == 2
+
+    def test_state_lookup_and_dashboard(self, employee):
+        get_employee_state(employee)
+        get_live_dashboard()
+        get_live_dashboard(employee_ids={employee.id})
+
+        assert metrics.STATE_LOOKUP_SECONDS.count(mode="sync") == 1
+        assert metrics.DASHBOARD_SECONDS.count(scope="full") == 1
+        assert metrics.DASHBOARD_SECONDS.count(scope="changed") == 1
+
+    def test_report_build_by_range(self, employee):
+        today = timezone.localdate()
+        build_attendance_report(date_from=today - timedelta(days=6), date_to=today)
+        build_attendance_report(date_from=today - timedelta(days=29), date_to=today, source="events")
+
+        assert metrics.REPORT_BUILD_SECONDS.count(range="week", source="summary") == 1
+        assert metrics.REPORT_BUILD_SECONDS.count(range="month", source="events") == 1
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+
+    def test_exposition_from_localhost(self, client, employee, device):
+        register_event(employee, TimeEvent.CHECK_IN, device.device_id)
+
+        response = client.get("/api/metrics/")
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.content.decode()
+        assert 'time_tracking_register_event_total{mode="single",outcome="accepted"} 1' in body
+        assert "# TYPE time_tracking_report_build_seconds histogram" in body
+
+    def test_hidden_from_other_addresses(self, client):
+        response = client.get("/api/metrics/", REMOTE_ADDR="10.0.0.5")
+
+        assert response.status_code == 404
+
+    def test_hidden_behind_reverse_proxy(self, client):
+        response = client.get("/api/metrics/", HTTP_X_FORWARDED_FOR="203.0.113.7")
+
+        assert response.status_code == 404
+
+    def test_token_replaces_address_check(self, client, settings):
+        settings.METRICS_TOKEN = "sekret"
+
+        assert client.get("/api/metrics/").status_code == 404
+        assert client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer zly").status_code == 404
+        response = client.get(
+            "/api/metrics/", REMOTE_ADDR="10.0.0.5", HTTP_X_FORWARDED_FOR="203.0.113.7",
+            HTTP_AUTHORIZATION="Bearer sekret",
+        )
+        assert response.status_code == 200
+
+    def test_request_histogram_by_url_name(self, client, employee):
+        client.get("/api/admin-panel/live/")
+        client.get("/api/admin-panel/live/")
+
+        assert metrics.HTTP_REQUEST_SECONDS.count(view="admin-live-panel") == 2
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def _phases(self, response):
+        return {
+            name: float(duration)
+            for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response["Server-Timing"])
+        }
+
+    def test_api_request_is_split(self, client, employee, device):
+        response = client.get("/api/tablet/status/", {"qr": employee.qr_token, "device": device.device_id})
+
+        phases = self._phases(response)
+        assert set(phases) == {"db", "compute", "render", "total"}
+        assert phases["db"] + phases["compute"] + phases["render"] == pytest.approx(phases["total"], abs=0.05)
+        assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* queries"', response["Server-Timing"])
+
+    @pytest.mark.parametrize("path", ["/api/tablet/status/", "/api/tablet/async/status/"])
+    def test_phases_under_asgi(self, async_client, employee, device, path):
+        response = async_to_sync(async_client.get)(path, {"qr": employee.qr_token, "device": device.device_id})
+
+        assert set(self._phases(response)) == {"db", "compute", "render", "total"}
+        assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* queries"', response["Server-Timing"])
+
+    def test_template_render_is_measured(self, client, employee):
+        response = client.get("/api/admin-panel/live/")
+
+        assert self._phases(response)["render"] > 0
+
+    def test_disabled(self, client, settings):
+        settings.SERVER_TIMING_ENABLED = False
+
+        response = client.get("/api/admin-panel/live/")
+
+        assert "Server-Timing" not in response
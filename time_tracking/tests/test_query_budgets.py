@@ -0,0 +1,171 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.utils import timezone
+
+from core.models import Device, Employee
+from time_tracking.models import TimeEvent
+from time_tracking.services.query_budget import (
+    QueryBudget,
+    QueryBudgetExceeded,
+    QueryRecorder,
+    check_budget,
+    count_chunk,
+    fingerprint,
+    recording,
+)
+from time_tracking.services import report_service
+from time_tracking.services.report_cache import clear_report_cache
+from time_tracking.services.synthetic_data import DataConfig, generate_data
+
+
+@pytest.mark.django_db
+class TestViewQueryBudgets:
+    """
+    Budżety widoków sprawdzane na danych z wieloma pracownikami – N+1 przekracza budżet.
+    """
+
+    @pytest.fixture
+    def data(self):
+        today = timezone.localdate()
+        generate_data(DataConfig(employees=12, date_from=today - timedelta(days=14), date_to=today))
+        return {"from": str(today - timedelta(days=14)), "to": str(today)}
+
+    def test_tablet_status(self, client, data):
+        employee = Employee.objects.first()
+        device = Device.objects.first()
+
+        response = client.get("/api/tablet/status/", {"qr": employee.qr_token, "device": device.device_id})
+
+        assert response.status_code == 200
+
+    def test_tablet_events(self, client, data):
+        device = Device.objects.first()
+        for employee in Employee.objects.all()[:3]:
+            state = client.get("/api/tablet/status/", {"qr": employee.qr_token, "device": device.device_id})
+            response = client.post(
+                "/api/tablet/events/",
+                {"qr": employee.qr_token, "device_id": device.device_id, "event_type": state.json()["actions"][0]},
+                content_type="application/json",
+            )
+            assert response.status_code == 201
+
+    def test_tablet_events_batch(self, client, data):
+        employees = [Employee.objects.create(first_name="Nowy", last_name=f"Pracownik {i}") for i in range(3)]
+        device = Device.objects.first()
+        now = timezone.now()
+        events = [
+            {"qr": employee.qr_token, "event_type": event_type, "timestamp": (now + timedelta(seconds=i)).isoformat()}
+            for employee in employees
+            for i, event_type in enumerate((TimeEvent.CHECK_IN, TimeEvent.BREAK_START, TimeEvent.BREAK_END))
+        ]
+
+        response = client.post(
+            "/api/tablet/events/batch/", {"device_id": device.device_id, "events": events},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.json()["accepted"] == 9
+
+    def test_reports(self, client, data):
+        assert client.get("/api/admin/reports/attendance/", data).status_code == 200
+        response = client.get("/api/admin/reports/attendance.csv/", data)
+        assert b"".join(response.streaming_content)
+
+    def test_reports_in_many_chunks(self, client, data, monkeypatch):
+        # 12 pracowników × 15 dni w paczkach po 4 – zimny cache w każdej paczce
+        monkeypatch.setattr(report_service, "CHUNK_EMPLOYEE_DAYS", 4 * 15)
+
+        assert client.get("/api/admin/reports/attendance/", data).status_code == 200
+        clear_report_cache()
+        response = client.get("/api/admin/reports/attendance.csv/", data)
+        assert b"".join(response.streaming_content)
+
+    def test_live_panel_and_schedules(self, client, data):
+        assert client.get("/api/admin-panel/live/").status_code == 200
+        assert client.get("/api/admin/schedules/", data).status_code == 200
+
+
+@pytest.mark.django_db
+class TestQueryBudgetReport:
+
+    def _record(self, n):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for i in range(n):
+                Employee.objects.filter(id=i).exists()
+            Device.objects.count()
+        return recorder
+
+    def test_repeated_queries_are_grouped_by_fingerprint(self):
+        recorder = self._record(5)
+
+        [repeated] = recorder.repeated()
+        assert recorder.count == 6
+        assert repeated["count"] == 5
+        assert "core_employee" in repeated["fingerprint"]
+
+    def test_raise_mode_dumps_repeated_queries(self):
+        recorder = self._record(5)
+
+        with pytest.raises(QueryBudgetExceeded, match=r"6 queries \(budget 2\)[\s\S]*5x"):
+            check_budget("GET /x/", QueryBudget(queries=2), recorder, mode="raise")
+
+    def test_budget_grows_with_chunks(self):
+        recorder = self._record(6)
+        budget = QueryBudget(queries=1, per_chunk=3)
+
+        with pytest.raises(QueryBudgetExceeded, match=r"7 queries \(budget 4 for 1 chunks\)"):
+            with recording(recorder):
+                count_chunk()
+            check_budget("GET /x/", budget, recorder, mode="raise")
+
+        with recording(recorder):
+            count_chunk()
+        check_budget("GET /x/", budget, recorder, mode="raise")
+
+    def test_warn_mode_logs(self, caplog):
+        recorder = self._record(3)
+
+        with caplog.at_level(logging.WARNING):
+            check_budget("GET /x/", QueryBudget(queries=2), recorder, mode="warn")
+            check_budget("GET /y/", QueryBudget(queries=10), recorder, mode="warn")
+
+        assert [r.getMessage().splitlines()[0] for r in caplog.records] == [
+            "Query budget exceeded for GET /x/: 4 queries (budget 2), "
+            f"{recorder.sql_ms:.1f} ms SQL"
+        ]
+
+    def test_middleware_raises_over_budget(self, client, settings, monkeypatch):
+        from time_tracking.api.views import TabletStatusView
+
+        monkeypatch.setattr(TabletStatusView, "query_budget", QueryBudget(queries=0))
+        employee = Employee.objects.create(first_name="Jan", last_name="Kowalski")
+        Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/api/tablet/status/", {"qr": employee.qr_token, "device": "tablet-1"})
+
+        settings.QUERY_BUDGET_MODE = "off"
+        assert client.get("/api/tablet/status/", {"qr": employee.qr_token, "device": "tablet-1"}).status_code == 200
+
+    def test_middleware_measures_sync_view_under_asgi(self, async_client, monkeypatch):
+        from time_tracking.api.views import TabletStatusView
+
+        # pod ASGI middleware jest async, a widok synchroniczny wykonuje się w innym wątku
+        monkeypatch.setattr(TabletStatusView, "query_budget", QueryBudget(queries=0))
+        employee = Employee.objects.create(first_name="Jan", last_name="Kowalski")
+        Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+        with pytest.raises(QueryBudgetExceeded):
+            async_to_sync(async_client.get)("/api/tablet/status/", {"qr": employee.qr_token, "device": "tablet-1"})
+
+    def test_fingerprint_collapses_values_and_in_lists(self):
+        a = fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21")
+        b = fingerprint("SELECT * FROM t WHERE id IN (%s) AND name = 'yy'  LIMIT 5")
+
+        assert a == b == "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?"
@@ -0,0 +1,53 @@
+from datetime import date, time, datetime
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import WorkSchedule, TimeEvent
+from time_tracking.services.report_csv import build_attendance_csv, iter_attendance_csv
+
+
+@pytest.mark.django_db
+class TestAttendanceCSV:
+
+    @pytest.fixture
+    def employees(self):
+        device = Device.objects.create(name="Tablet 1", device_id="tablet-1")
+        employees = []
+        for i in range(3):
+            emp = Employee.objects.create(first_name=f"Jan{i}", last_name="Kowalski")
+            WorkSchedule.objects.create(
+                employee=emp,
+                date=date(2025, 12, 14),
+                day_type=WorkSchedule.WORK,
+                planned_start=time(8, 0),
+                planned_end=time(16, 0),
+            )
+            TimeEvent.objects.create(
+                employee=emp,
+                device=device,
+                event_type=TimeEvent.CHECK_IN,
+                timestamp=timezone.make_aware(datetime(2025, 12, 14, 8, 0)),
+            )
+            employees.append(emp)
+        return employees
+
+    def test_csv_is_yielded_employee_by_employee(self, employees):
+        chunks = list(iter_attendance_csv(date_from=date(2025, 12, 14), date_to=date(2025, 12, 15)))
+
+        # nagłówek + po jednym kawałku na pracownika
+        assert len(chunks) == 1 + len(employees)
+        assert chunks[0].startswith("Employee,Date")
+        assert all(chunk.count("\r\n") == 2 for chunk in chunks[1:])
+
+    def test_csv_endpoint_streams(self, client, employees):
+        response = client.get("/api/admin/reports/attendance.csv/?from=2025-12-14&to=2025-12-15")
+
+        assert isinstance(response, StreamingHttpResponse)
+        assert response["Content-Type"] == "text/csv"
+
+        content = b"".join(response.streaming_content).decode()
+        assert content == build_attendance_csv(date_from=date(2025, 12, 14), date_to=date(2025, 12, 15))
+        assert "Check in exists but no check out" in content
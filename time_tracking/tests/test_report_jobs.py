@@ -0,0 +1,203 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import ReportJob, TimeEvent, WorkSchedule
+from time_tracking.services.report_csv import build_attendance_csv
+from time_tracking.services import report_jobs
+from time_tracking.services.event_buffer import _try_lock
+from time_tracking.services.report_jobs import submit_report_job
+from time_tracking.services.report_service import build_attendance_report
+
+DATE_FROM = date(2025, 12, 1)
+DATE_TO = date(2025, 12, 3)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReportJobs:
+
+    URL = "/api/admin/reports/jobs/"
+
+    @pytest.fixture(autouse=True)
+    def job_dir(self, settings, tmp_path):
+        settings.REPORT_JOB_DIR = tmp_path
+        return tmp_path
+
+    @pytest.fixture(autouse=True)
+    def executor(self, monkeypatch):
+        # baza testowa w pamięci nie czeka na blokady – jeden wątek zapisujący naraz
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(report_jobs, "_executor", executor)
+        # każdy test to osobny "proces" z własnym plikiem blokady w REPORT_JOB_DIR
+        monkeypatch.setattr(report_jobs, "_owner", None)
+        monkeypatch.setattr(report_jobs, "_owner_file", None)
+        yield executor
+        executor.shutdown(wait=True)
+        if report_jobs._owner_file is not None:
+            report_jobs._owner_file.close()
+
+    @pytest.fixture
+    def employees(self):
+        device = Device.objects.create(name="Tablet 1", device_id="tablet-1")
+        employees = []
+        for i in range(3):
+            emp = Employee.objects.create(first_name="Jan", last_name=f"Kowalski{i}")
+            WorkSchedule.objects.create(
+                employee=emp, date=DATE_FROM, day_type=WorkSchedule.WORK,
+                planned_start=time(8, 0), planned_end=time(16, 0),
+            )
+            for event_type, hh in ((TimeEvent.CHECK_IN, 8), (TimeEvent.CHECK_OUT, 16)):
+                TimeEvent.objects.create(
+                    employee=emp, device=device, event_type=event_type,
+                    timestamp=timezone.make_aware(datetime.combine(DATE_FROM, time(hh, 10 * i))),
+                )
+            employees.append(emp)
+        return employees
+
+    def _wait(self, client, job_id):
+        # pula ma jeden wątek – pusty task kończy się po zleconych wcześniej; odpytywanie w trakcie
+        # liczenia kończyłoby się "database table is locked" (wspólny cache bazy w pamięci)
+        report_jobs._executor.submit(lambda: None).result(timeout=10)
+        job = client.get(f"{self.URL}{job_id}/").json()
+        assert job["status"] not in (ReportJob.PENDING, ReportJob.RUNNING), "report job did not finish"
+        return job
+
+    def test_json_job(self, client, employees):
+        response = client.post(self.URL, {"from": str(DATE_FROM), "to": str(DATE_TO)}, content_type="application/json")
+
+        assert response.status_code == 202
+        job = self._wait(client, response.json()["id"])
+        assert job["status"] == ReportJob.DONE
+        assert job["progress"] == {"processed": 3, "total": 3}
+
+        download = client.get(job["download"])
+        assert download.status_code == 200
+        assert json.loads(b"".join(download.streaming_content)) == build_attendance_report(
+            date_from=DATE_FROM, date_to=DATE_TO
+        )
+
+    def test_csv_job(self, client, employees):
+        response = client.post(
+            self.URL, {"from": str(DATE_FROM), "to": str(DATE_TO), "format": "csv"}, content_type="application/json"
+        )
+
+        job = self._wait(client, response.json()["id"])
+        download = client.get(job["download"])
+
+        assert download["Content-Type"] == "text/csv"
+        assert b"".join(download.streaming_content).decode() == build_attendance_csv(
+            date_from=DATE_FROM, date_to=DATE_TO
+        )
+
+    def test_identical_submissions_share_a_job(self, client, employees):
+        kwargs = {"fmt": ReportJob.JSON, "date_from": DATE_FROM, "date_to": DATE_TO}
+
+        # w jednej transakcji zadanie jeszcze nie wystartowało (start po commicie)
+        with transaction.atomic():
+            first, created_first = submit_report_job(**kwargs)
+            second, created_second = submit_report_job(**kwargs)
+            other, _ = submit_report_job(**kwargs, employee_id=employees[0].id)
+
+            download = client.get(f"{self.URL}{first.id}/download/")
+            assert download.status_code == 409
+
+        assert (created_first, created_second) == (True, False)
+        assert second.id == first.id
+        assert other.id != first.id
+
+        assert self._wait(client, first.id)["status"] == ReportJob.DONE
+        self._wait(client, other.id)
+        # zakończone zadanie nie jest współdzielone – nowe zlecenie liczy od nowa
+        again, created = submit_report_job(**kwargs)
+        assert created and again.id != first.id
+        self._wait(client, again.id)
+
+    def test_stale_job_is_replaced(self, client, employees):
+        stale, _ = submit_report_job(fmt=ReportJob.CSV, date_from=DATE_FROM, date_to=DATE_TO)
+        self._wait(client, stale.id)
+        ReportJob.objects.filter(id=stale.id).update(
+            status=ReportJob.RUNNING, updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        job, created = submit_report_job(fmt=ReportJob.CSV, date_from=DATE_FROM, date_to=DATE_TO)
+
+        assert created
+        assert ReportJob.objects.get(id=stale.id).status == ReportJob.FAILED
+        assert self._wait(client, job.id)["status"] == ReportJob.DONE
+
+    def _queued(self, owner):
+        # czeka w kolejce puli (tu: nie została jej oddana) – bez postępu od dawna
+        queued = ReportJob.objects.create(
+            params_key=report_jobs._params_key(ReportJob.CSV, DATE_FROM, DATE_TO, None),
+            format=ReportJob.CSV, date_from=DATE_FROM, date_to=DATE_TO, owner=owner,
+        )
+        ReportJob.objects.filter(id=queued.id).update(updated_at=timezone.now() - timedelta(hours=1))
+        return queued
+
+    def test_queued_job_of_live_process_is_shared(self, employees, job_dir):
+        # inny żywy proces: trzyma blokadę swojego pliku
+        (job_dir / "workers").mkdir()
+        with open(job_dir / "workers" / "123-cafebabe.lock", "a+") as lock_file:
+            assert _try_lock(lock_file)
+            queued = self._queued("123-cafebabe")
+
+            job, created = submit_report_job(fmt=ReportJob.CSV, date_from=DATE_FROM, date_to=DATE_TO)
+
+        assert not created and job.id == queued.id
+
+    def test_job_of_dead_process_is_replaced(self, client, employees, job_dir):
+        # proces po restarcie: plik blokady został, ale nikt go już nie trzyma
+        (job_dir / "workers").mkdir()
+        (job_dir / "workers" / "123-deadbeef.lock").touch()
+        queued = self._queued("123-deadbeef")
+
+        job, created = submit_report_job(fmt=ReportJob.CSV, date_from=DATE_FROM, date_to=DATE_TO)
+
+        assert created
+        assert ReportJob.objects.get(id=queued.id).status == ReportJob.FAILED
+        assert not (job_dir / "workers" / "123-deadbeef.lock").exists()
+        assert self._wait(client, job.id)["status"] == ReportJob.DONE
+
+    def test_executor_start_fails_orphaned_jobs(self, monkeypatch, employees):
+        queued = self._queued("")
+        running = ReportJob.objects.create(
+            params_key="json:x", format=ReportJob.JSON, date_from=DATE_FROM, date_to=DATE_TO,
+            status=ReportJob.RUNNING, owner="123-deadbeef",
+        )
+        live = ReportJob.objects.create(
+            params_key="json:y", format=ReportJob.JSON, date_from=DATE_FROM, date_to=DATE_TO,
+            owner=report_jobs._get_owner(),
+        )
+        monkeypatch.setattr(report_jobs, "_executor", None)
+
+        report_jobs._get_executor().shutdown(wait=True)
+
+        statuses = dict(ReportJob.objects.values_list("id", "status"))
+        assert statuses[queued.id] == statuses[running.id] == ReportJob.FAILED
+        assert statuses[live.id] == ReportJob.PENDING
+
+    def test_invalid_parameters(self, client):
+        response = client.post(
+            self.URL, {"from": "2025-12-05", "to": "2025-12-01"}, content_type="application/json"
+        )
+
+        assert response.status_code == 400
+        assert not ReportJob.objects.exists()
+
+    def test_non_positive_employee_id(self, client):
+        response = client.post(
+            self.URL, {"from": "2025-12-01", "to": "2025-12-05", "employee_id": -1},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert not ReportJob.objects.exists()
+
+    def test_integrity_error_without_active_job_is_raised(self, employees):
+        with pytest.raises(IntegrityError):
+            submit_report_job(fmt=ReportJob.CSV, date_from=DATE_FROM, date_to=DATE_TO, employee_id=-1)
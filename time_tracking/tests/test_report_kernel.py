@@ -0,0 +1,87 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import TimeEvent, WorkSchedule
+from time_tracking.services.event_archive import archive_month
+from time_tracking.services.report_service import build_attendance_report
+
+pytest.importorskip("numpy")
+
+DATE_FROM = date(2025, 11, 24)
+DATE_TO = date(2025, 12, 7)
+EVENT_TYPES = [TimeEvent.CHECK_IN, TimeEvent.CHECK_OUT, TimeEvent.BREAK_START, TimeEvent.BREAK_END]
+
+
+@pytest.mark.django_db
+class TestNumpyReportKernel:
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def _random_stream(self, rng, device, employees=12):
+        events = []
+        for i in range(employees):
+            emp = Employee.objects.create(first_name=f"Jan{i}", last_name="Kowalski")
+            d = DATE_FROM
+            while d <= DATE_TO:
+                day_type = rng.choice([WorkSchedule.WORK, WorkSchedule.WORK, WorkSchedule.OFF, WorkSchedule.LEAVE])
+                day_type = day_type if rng.random() < 0.9 else None
+                if day_type is not None:
+                    planned = day_type == WorkSchedule.WORK
+                    WorkSchedule.objects.create(
+                        employee=emp, date=d, day_type=day_type,
+                        planned_start=time(rng.randint(6, 9), rng.choice([0, 15, 30])) if planned else None,
+                        planned_end=time(16, 0) if planned else None,
+                    )
+
+                if rng.random() < 0.8:
+                    # typowy dzień z szumem albo zupełnie losowy strumień (anomalie przerw, duplikaty)
+                    if rng.random() < 0.5:
+                        types = [TimeEvent.CHECK_IN, TimeEvent.BREAK_START, TimeEvent.BREAK_END, TimeEvent.CHECK_OUT]
+                    else:
+                        types = [rng.choice(EVENT_TYPES) for _ in range(rng.randint(1, 9))]
+                    start = timezone.make_aware(datetime.combine(d, time(rng.randint(5, 10))))
+                    offsets = sorted(rng.randint(0, 10 * 3600 * 10**6) for _ in types)
+                    if rng.random() < 0.2 and len(offsets) > 1:
+                        offsets[1] = offsets[0]  # ten sam czas – kolejność rozstrzyga id
+                    for seq, (event_type, offset) in enumerate(zip(rng.sample(types, len(types)), offsets), 1):
+                        anomaly = rng.random() < 0.1
+                        events.append(TimeEvent(
+                            employee=emp, device=device, event_type=event_type,
+                            timestamp=start + timedelta(microseconds=offset),
+                            local_date=d, sequence=seq,
+                            is_anomaly=anomaly,
+                            anomaly_reason=rng.choice(["", "Ręczna korekta"]) if anomaly else "",
+                        ))
+                d += timedelta(days=1)
+        TimeEvent.objects.bulk_create(events)
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_event_source_on_random_streams(self, device, seed):
+        self._random_stream(random.Random(seed), device)
+        kwargs = {"date_from": DATE_FROM, "date_to": DATE_TO}
+
+        expected = build_attendance_report(source="events", **kwargs)
+
+        assert build_attendance_report(source="numpy", **kwargs) == expected
+
+    def test_reads_archived_events(self, settings, tmp_path, device):
+        settings.EVENT_ARCHIVE_DIR = tmp_path
+        self._random_stream(random.Random(7), device, employees=4)
+        kwargs = {"date_from": DATE_FROM, "date_to": DATE_TO}
+        expected = build_attendance_report(source="events", **kwargs)
+
+        archive_month(date(2025, 11, 1))
+
+        assert build_attendance_report(source="numpy", **kwargs) == expected
+
+    def test_no_events(self):
+        Employee.objects.create(first_name="Jan", last_name="Kowalski")
+        kwargs = {"date_from": DATE_FROM, "date_to": DATE_TO}
+
+        assert build_attendance_report(source="numpy", **kwargs) == build_attendance_report(source="events", **kwargs)
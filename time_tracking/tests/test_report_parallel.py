@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import TimeEvent, WorkSchedule
+from time_tracking.services import report_parallel
+from time_tracking.services.report_csv import build_attendance_csv
+from time_tracking.services.report_service import build_attendance_report
+
+DAY = date(2025, 12, 1)
+
+
+def _create_employees():
+    device = Device.objects.create(name="Tablet 1", device_id="tablet-1")
+    employees = []
+    for i in range(13):
+        # nazwiska w innej kolejności niż id – raport sortuje po nazwisku
+        emp = Employee.objects.create(first_name="Jan", last_name=f"Kowalski{(i * 7) % 13:02d}")
+        WorkSchedule.objects.create(
+            employee=emp, date=DAY, day_type=WorkSchedule.WORK,
+            planned_start=time(8, 0), planned_end=time(16, 0),
+        )
+        TimeEvent.objects.create(
+            employee=emp, device=device, event_type=TimeEvent.CHECK_IN,
+            timestamp=timezone.make_aware(datetime.combine(DAY, time(8, i))),
+        )
+        employees.append(emp)
+    return employees
+
+
+@pytest.mark.django_db(transaction=True)
+class TestParallelReport:
+
+    @pytest.fixture
+    def executors(self, monkeypatch, settings):
+        settings.REPORT_PARALLEL_MIN_EMPLOYEES = 5
+        created = []
+
+        # testowa baza jest w pamięci procesu – shardy liczą wątki zamiast procesów
+        def executor(workers):
+            created.append(workers)
+            return ThreadPoolExecutor(max_workers=workers)
+
+        monkeypatch.setattr(report_parallel, "_executor", executor)
+        return created
+
+    @pytest.fixture
+    def employees(self):
+        return _create_employees()
+
+    def test_parallel_report_matches_serial(self, employees, executors):
+        kwargs = {"date_from": date(2025, 11, 30), "date_to": date(2025, 12, 2)}
+
+        for source in ("summary", "events"):
+            serial = build_attendance_report(source=source, workers=1, **kwargs)
+            assert build_attendance_report(source=source, workers=3, **kwargs) == serial
+
+        assert build_attendance_csv(workers=3, **kwargs) == build_attendance_csv(workers=1, **kwargs)
+        assert executors == [3, 3, 3]
+
+    def test_small_reports_stay_serial(self, employees, executors, settings):
+        settings.REPORT_PARALLEL_MIN_EMPLOYEES = 100
+
+        report = build_attendance_report(date_from=DAY, date_to=DAY, workers=4)
+
+        assert len(report["employees"]) == 13
+        assert executors == []
+
+    def test_workers_default_to_settings(self, employees, executors, settings):
+        settings.REPORT_WORKERS = 2
+
+        build_attendance_report(date_from=DAY, date_to=DAY)
+
+        assert executors == [2]
+
+    def test_shards_keep_order(self):
+        items = list(range(10))
+
+        shards = report_parallel._shards(items, 2)
+
+        assert [x for shard in shards for x in shard] == items
+        assert len(shards) == 5
+
+
+@pytest.mark.slow
+class TestParallelReportProcesses:
+    """
+    Prawdziwa pula procesów (spawn) – workery czytają bazę z pliku, bo baza testowa
+    w pamięci nie jest widoczna poza procesem.
+    """
+
+    @pytest.fixture
+    def file_database(self, tmp_path, django_db_blocker):
+        conn = connections["default"]
+        original = conn.settings_dict["NAME"], conn.connection
+        with django_db_blocker.unblock():
+            # połączenia z bazą w pamięci nie zamykamy – zniknęłaby baza pozostałych testów
+            conn.connection = None
+            conn.settings_dict["NAME"] = str(tmp_path / "reports.sqlite3")
+            try:
+                call_command("migrate", verbosity=0)
+                yield
+            finally:
+                conn.close()
+                conn.settings_dict["NAME"], conn.connection = original
+
+    def test_worker_processes_match_serial(self, file_database, settings):
+        settings.REPORT_PARALLEL_MIN_EMPLOYEES = 5
+        settings.REPORT_WORKER_START_METHOD = "spawn"
+        _create_employees()
+        kwargs = {"date_from": date(2025, 11, 30), "date_to": date(2025, 12, 2), "source": "events"}
+
+        parallel = build_attendance_report(workers=2, **kwargs)
+
+        assert parallel == build_attendance_report(workers=1, **kwargs)
+        assert len(parallel["employees"]) == 13
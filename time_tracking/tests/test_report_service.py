@@ -5,6 +5,8 @@ from django.utils import timezone
 
 from core.models import Employee, Device
 from time_tracking.models import WorkSchedule, TimeEvent
+from time_tracking.services.report_cache import get_report_cache_stats
+from time_tracking.services import report_service
 from time_tracking.services.report_service import build_attendance_report
 
 
@@ -112,3 +114,116 @@ class TestAttendanceReport:
 
         assert day["absence"] is True
         assert day["actual"]["worked_minutes"] == 0
+
+    def test_query_count_does_not_depend_on_employee_count(self, device, django_assert_num_queries):
+        d = date(2025, 12, 17)
+
+        for i in range(5):
+            emp = Employee.objects.create(first_name=f"Jan{i}", last_name="Nowak")
+            WorkSchedule.objects.create(
+                employee=emp,
+                date=d,
+                day_type=WorkSchedule.WORK,
+                planned_start=time(8, 0),
+                planned_end=time(16, 0),
+            )
+            TimeEvent.objects.create(
+                employee=emp,
+                device=device,
+                event_type=TimeEvent.CHECK_IN,
+                timestamp=timezone.make_aware(datetime(2025, 12, 17, 8, 30)),
+            )
+
+        # pracownicy + wersje wzorców + podsumowania dni
+        with django_assert_num_queries(3):
+            report = build_attendance_report(date_from=d, date_to=d)
+
+        # pracownicy + grafiki + wersje wzorców + zdarzenia
+        with django_assert_num_queries(4):
+            replayed = build_attendance_report(date_from=d, date_to=d, source="events")
+
+        assert report == replayed
+        assert len(report["employees"]) == 5
+        assert all(e["totals"]["late_minutes"] == 30 for e in report["employees"])
+
+    def test_long_range_shrinks_employee_chunk(self, device, monkeypatch, django_assert_num_queries):
+        d_from, d_to = date(2025, 12, 1), date(2025, 12, 5)
+        for i in range(5):
+            emp = Employee.objects.create(first_name=f"Jan{i}", last_name="Nowak")
+            TimeEvent.objects.create(
+                employee=emp,
+                device=device,
+                event_type=TimeEvent.CHECK_IN,
+                timestamp=timezone.make_aware(datetime(2025, 12, 2, 8, 0)),
+            )
+        whole = build_attendance_report(date_from=d_from, date_to=d_to, source="events")
+
+        # 10 dni pracowników na paczkę przy 5-dniowym zakresie = paczki po 2 pracowników
+        monkeypatch.setattr(report_service, "CHUNK_EMPLOYEE_DAYS", 10)
+        # pracownicy + 3 paczki × (grafiki + wersje wzorców + zdarzenia)
+        with django_assert_num_queries(10):
+            chunked = build_attendance_report(date_from=d_from, date_to=d_to, source="events")
+
+        assert chunked == whole
+
+    def test_events_are_bucketed_by_local_date(self, employee, device, settings):
+        settings.TIME_ZONE = "Europe/Warsaw"
+        d = date(2025, 12, 18)
+
+        # 00:30 czasu lokalnego to jeszcze poprzedni dzień w UTC
+        TimeEvent.objects.create(
+            employee=employee,
+            device=device,
+            event_type=TimeEvent.CHECK_IN,
+            timestamp=timezone.make_aware(datetime(2025, 12, 18, 0, 30)),
+        )
+
+        report = build_attendance_report(
+            date_from=d,
+            date_to=d,
+            employee_id=employee.id,
+        )
+
+        day = report["employees"][0]["days"][0]
+
+        assert TimeEvent.objects.get().local_date == d
+        assert day["actual"]["check_in"] is not None
+
+    def test_repeated_range_is_served_from_day_cache(self, employee, device, settings, django_assert_num_queries):
+        d = date(2025, 12, 19)
+        WorkSchedule.objects.create(
+            employee=employee,
+            date=d,
+            day_type=WorkSchedule.WORK,
+            planned_start=time(8, 0),
+            planned_end=time(16, 0),
+        )
+        TimeEvent.objects.create(
+            employee=employee,
+            device=device,
+            event_type=TimeEvent.CHECK_IN,
+            timestamp=timezone.make_aware(datetime(2025, 12, 19, 8, 10)),
+        )
+
+        first = build_attendance_report(date_from=d, date_to=d)
+
+        # pracownicy + wersje wzorców – dni z cache
+        with django_assert_num_queries(2):
+            second = build_attendance_report(date_from=d, date_to=d)
+
+        assert first == second
+        assert get_report_cache_stats()["hits"] == 1
+
+        # zmiana progu nie wymaga unieważnienia
+        settings.LATE_THRESHOLD_MINUTES = 15
+        assert build_attendance_report(date_from=d, date_to=d)["employees"][0]["days"][0]["lateness_minutes"] == 0
+
+        # nowe zdarzenie unieważnia dzień
+        TimeEvent.objects.create(
+            employee=employee,
+            device=device,
+            event_type=TimeEvent.CHECK_OUT,
+            timestamp=timezone.make_aware(datetime(2025, 12, 19, 16, 10)),
+        )
+        day = build_attendance_report(date_from=d, date_to=d)["employees"][0]["days"][0]
+        assert day["actual"]["worked_minutes"] == 480
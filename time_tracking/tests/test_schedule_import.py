@@ -0,0 +1,140 @@
+import io
+import json
+from datetime import date, datetime, time
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import DailyAttendance, TimeEvent, WorkSchedule
+from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.schedule_import import CSV, JSONL, import_schedules, iter_rows
+
+DAY = date(2025, 12, 1)
+
+
+def _csv(*lines):
+    return io.BytesIO(("employee_id,date,day_type,planned_start,planned_end\n" + "\n".join(lines) + "\n").encode())
+
+
+@pytest.mark.django_db
+class TestScheduleImport:
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    def test_csv_upserts_and_reports_row_errors(self, employee):
+        WorkSchedule.objects.create(employee=employee, date=DAY, day_type=WorkSchedule.LEAVE)
+
+        result = import_schedules(iter_rows(_csv(
+            f"{employee.id},2025-12-01,WORK,08:00,16:00",
+            f"{employee.id},2025-12-02,WORK,08:00,16:00",
+            f"{employee.id},2025-12-03,WORK,,",
+            f"{employee.id},2025-13-01,OFF,,",
+            f"{employee.id},2025-12-04,OFF,08:00,16:00",
+            "999999,2025-12-05,OFF,,",
+            f"{employee.id},2025-12-06,leave,,",
+            f"{employee.id},2025-12-07,OFF,,",
+        ), CSV), chunk_size=3)
+
+        assert (result["created"], result["updated"]) == (3, 1)
+        assert [error["row"] for error in result["errors"]] == [4, 5, 6, 7]
+        assert result["error_count"] == 4
+        assert all(error["errors"] for error in result["errors"])
+        assert dict(WorkSchedule.objects.values_list("date", "day_type")) == {
+            date(2025, 12, 1): "WORK",
+            date(2025, 12, 2): "WORK",
+            date(2025, 12, 6): "LEAVE",
+            date(2025, 12, 7): "OFF",
+        }
+
+    def test_later_row_wins_within_file(self, employee):
+        rows = [
+            json.dumps({"employee_id": employee.id, "date": "2025-12-01", "day_type": "WORK",
+                        "planned_start": "08:00", "planned_end": "16:00"}),
+            "{not json",
+            json.dumps({"employee_id": employee.id, "date": "2025-12-01", "day_type": "LEAVE"}),
+        ]
+
+        result = import_schedules(iter_rows(io.BytesIO("\n".join(rows).encode()), JSONL))
+
+        assert (result["created"], result["updated"]) == (1, 0)
+        assert [error["row"] for error in result["errors"]] == [2]
+        assert WorkSchedule.objects.get(employee=employee, date=DAY).day_type == WorkSchedule.LEAVE
+
+    def test_wrong_value_types_are_row_errors(self, employee):
+        rows = [
+            {"employee_id": employee.id, "date": "2025-12-01", "day_type": 5},
+            {"employee_id": employee.id, "date": "2025-12-02", "day_type": "WORK",
+             "planned_start": "25:00", "planned_end": "16:00"},
+            {"employee_id": 10 ** 30, "date": "2025-12-03", "day_type": "OFF"},
+            {"employee_id": employee.id, "date": "2025-12-04", "day_type": "OFF"},
+        ]
+
+        result = import_schedules(
+            iter_rows(io.BytesIO("\n".join(json.dumps(row) for row in rows).encode()), JSONL),
+            chunk_size=2,
+        )
+
+        assert [error["row"] for error in result["errors"]] == [1, 2, 3]
+        assert result["errors"][0]["errors"] == ["day_type: must be one of LEAVE, OFF, WORK."]
+        assert result["errors"][1]["errors"] == ["planned_start: invalid time, use HH:MM."]
+        assert result["created"] == 1
+
+    def test_import_refreshes_daily_attendance_and_report(self, employee, device):
+        TimeEvent.objects.create(
+            employee=employee, device=device, event_type=TimeEvent.CHECK_IN,
+            timestamp=timezone.make_aware(datetime.combine(DAY, time(8, 20))),
+        )
+        WorkSchedule.objects.create(
+            employee=employee, date=DAY, day_type=WorkSchedule.WORK,
+            planned_start=time(8, 0), planned_end=time(16, 0),
+        )
+        report = build_attendance_report(date_from=DAY, date_to=DAY, employee_id=employee.id, source="summary")
+        assert report["employees"][0]["days"][0]["lateness_minutes"] == 20
+
+        import_schedules(iter_rows(_csv(f"{employee.id},2025-12-01,WORK,08:30,16:30"), CSV))
+
+        assert DailyAttendance.objects.get(employee=employee, date=DAY).late_diff_minutes == -10
+        report = build_attendance_report(date_from=DAY, date_to=DAY, employee_id=employee.id, source="summary")
+        assert report["employees"][0]["days"][0]["lateness_minutes"] == 0
+
+    def test_dry_run_does_not_write(self, employee):
+        result = import_schedules(iter_rows(_csv(f"{employee.id},2025-12-01,OFF,,"), CSV), dry_run=True)
+
+        assert result["created"] == 1
+        assert not WorkSchedule.objects.exists()
+
+    def test_api_upload(self, client, employee):
+        upload = SimpleUploadedFile("grafik.csv", _csv(f"{employee.id},2025-12-01,OFF,,", "x,y,z,,").read())
+
+        response = client.post("/api/admin/schedules/import/", {"file": upload})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["created"], body["updated"], body["error_count"]) == (1, 0, 1)
+        assert body["errors"][0]["row"] == 3
+
+    def test_api_rejects_unknown_format(self, client):
+        upload = SimpleUploadedFile("grafik.xlsx", b"")
+
+        response = client.post("/api/admin/schedules/import/", {"file": upload})
+
+        assert response.status_code == 400
+
+    def test_command(self, employee, tmp_path):
+        path = tmp_path / "grafik.jsonl"
+        path.write_text(json.dumps({"employee_id": employee.id, "date": "2025-12-01", "day_type": "OFF"}) + "\n")
+        out = io.StringIO()
+
+        call_command("import_schedules", str(path), stdout=out)
+
+        assert "Created 1, updated 0, rejected 0" in out.getvalue()
+        assert WorkSchedule.objects.filter(employee=employee, date=DAY).exists()
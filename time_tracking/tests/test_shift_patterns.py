@@ -0,0 +1,163 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from core.models import Employee, Device
+from time_tracking.models import DailyAttendance, ShiftPattern, ShiftPatternDay, TimeEvent, WorkSchedule
+from time_tracking.services.live_dashboard import get_live_dashboard
+from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.schedule_resolver import load_effective_schedules
+
+MONDAY = date(2025, 12, 1)
+
+
+@pytest.mark.django_db
+class TestShiftPatterns:
+
+    @pytest.fixture
+    def employee(self):
+        return Employee.objects.create(first_name="Jan", last_name="Kowalski")
+
+    @pytest.fixture
+    def device(self):
+        return Device.objects.create(name="Tablet 1", device_id="tablet-1")
+
+    @pytest.fixture
+    def weekly(self, employee):
+        # pon-pt 8-16, weekend wolny
+        pattern = ShiftPattern.objects.create(employee=employee, name="Etat", valid_from=MONDAY)
+        for i in range(5):
+            ShiftPatternDay.objects.create(
+                pattern=pattern, day_index=i, day_type=WorkSchedule.WORK,
+                planned_start=time(8, 0), planned_end=time(16, 0),
+            )
+        return pattern
+
+    def _event(self, employee, device, event_type, d, hh, mm=0):
+        return TimeEvent.objects.create(
+            employee=employee, device=device, event_type=event_type,
+            timestamp=timezone.make_aware(datetime.combine(d, time(hh, mm))),
+        )
+
+    def _days(self, source, employee, d_from=MONDAY, d_to=MONDAY + timedelta(days=6)):
+        report = build_attendance_report(date_from=d_from, date_to=d_to, employee_id=employee.id, source=source)
+        return report["employees"][0]["days"]
+
+    def test_week_is_resolved_from_pattern_and_exceptions(self, employee, device, weekly):
+        wednesday = MONDAY + timedelta(days=2)
+        WorkSchedule.objects.create(employee=employee, date=wednesday, day_type=WorkSchedule.LEAVE)
+        self._event(employee, device, TimeEvent.CHECK_IN, MONDAY, 8, 20)
+        self._event(employee, device, TimeEvent.CHECK_OUT, MONDAY, 16, 0)
+
+        days = self._days("summary", employee)
+
+        assert [d["day_type"] for d in days] == ["WORK", "WORK", "LEAVE", "WORK", "WORK", "OFF", "OFF"]
+        assert days[0]["lateness_minutes"] == 20
+        assert days[0]["planned"]["minutes"] == 480
+        assert [d["absence"] for d in days] == [False, True, False, True, True, False, False]
+        assert days == self._days("events", employee)
+        # materializowane są tylko dni ze zdarzeniami i wyjątki – nie każdy dzień wzorca
+        assert sorted(DailyAttendance.objects.values_list("date", flat=True)) == [MONDAY, wednesday]
+
+    def test_rotating_pattern(self, employee):
+        # 4 dni pracy, 4 wolne – cykl liczony od anchor_date, także przed nią
+        pattern = ShiftPattern.objects.create(
+            employee=employee, valid_from=date(2025, 11, 1), valid_to=date(2025, 12, 31),
+            cycle_days=8, anchor_date=date(2025, 12, 3),
+        )
+        for i in range(4):
+            ShiftPatternDay.objects.create(
+                pattern=pattern, day_index=i, day_type=WorkSchedule.WORK,
+                planned_start=time(6, 0), planned_end=time(18, 0),
+            )
+
+        schedules = load_effective_schedules([employee.id], date(2025, 10, 31), date(2026, 1, 1))
+
+        def day_type(d):
+            schedule = schedules.get(employee.id, d)
+            return schedule.day_type if schedule else None
+
+        cycle = [day_type(date(2025, 12, 3) + timedelta(days=i)) for i in range(9)]
+        assert cycle == ["WORK"] * 4 + ["OFF"] * 4 + ["WORK"]
+        assert day_type(date(2025, 12, 2)) == "OFF"
+        assert day_type(date(2025, 11, 28)) == "WORK"
+        assert day_type(date(2025, 10, 31)) is None
+        assert day_type(date(2026, 1, 1)) is None
+
+    def test_pattern_change_invalidates_cached_days(self, employee, device, weekly):
+        self._event(employee, device, TimeEvent.CHECK_IN, MONDAY, 8, 20)
+        before = self._days("summary", employee)
+        assert before[1]["planned"]["start"] == "08:00:00"
+
+        ShiftPatternDay.objects.filter(pattern=weekly).update(planned_start=time(8, 30))
+        # update() nie wysyła sygnałów – zapis wzorca przelicza dni
+        weekly.save()
+
+        after = self._days("summary", employee)
+        assert after[0]["lateness_minutes"] == 0
+        assert after[1]["planned"]["start"] == "08:30:00"
+        assert after == self._days("events", employee)
+        assert DailyAttendance.objects.get(employee=employee, date=MONDAY).late_diff_minutes == -10
+
+    def test_pattern_change_from_other_process_is_seen(self, employee, weekly):
+        before = self._days("summary", employee)
+        assert before[1]["planned"]["start"] == "08:00:00"
+
+        # zapis w innym workerze: sygnały (i lokalne unieważnienia) tego procesu się nie wykonują,
+        # w bazie zmienia się tylko dzień wzorca i updated_at wzorca
+        ShiftPatternDay.objects.filter(pattern=weekly).update(planned_start=time(9, 0))
+        ShiftPattern.objects.filter(pk=weekly.pk).update(updated_at=timezone.now())
+
+        after = self._days("summary", employee)
+        assert after[1]["planned"]["start"] == "09:00:00"
+        assert after == self._days("events", employee)
+
+    def test_pattern_day_edit_changes_pattern_version(self, employee, weekly):
+        self._days("summary", employee)
+        day = weekly.days.get(day_index=1)
+        day.day_type = WorkSchedule.OFF
+        day.planned_start = day.planned_end = None
+        day.save()
+
+        assert self._days("summary", employee)[1]["day_type"] == "OFF"
+
+    def test_deleted_exception_falls_back_to_pattern(self, employee, weekly):
+        leave = WorkSchedule.objects.create(employee=employee, date=MONDAY, day_type=WorkSchedule.LEAVE)
+        assert self._days("summary", employee)[0]["day_type"] == "LEAVE"
+
+        leave.delete()
+
+        assert self._days("summary", employee)[0]["day_type"] == "WORK"
+        assert not DailyAttendance.objects.exists()
+
+    def test_live_dashboard_uses_pattern(self, employee, weekly):
+        rows = get_live_dashboard(MONDAY)
+
+        assert rows[0]["status"] == "ABSENT"
+
+    def test_overlapping_patterns_are_rejected(self, employee, weekly):
+        other = ShiftPattern(
+            employee=employee, valid_from=MONDAY + timedelta(days=30), valid_to=MONDAY + timedelta(days=60)
+        )
+
+        with pytest.raises(ValidationError):
+            other.full_clean()
+
+    def test_effective_schedule_api(self, client, employee, weekly):
+        WorkSchedule.objects.create(
+            employee=employee, date=MONDAY, day_type=WorkSchedule.WORK,
+            planned_start=time(10, 0), planned_end=time(18, 0),
+        )
+
+        response = client.get(f"/api/admin/schedules/effective/?from={MONDAY}&to={MONDAY + timedelta(days=1)}")
+
+        assert response.status_code == 200
+        [row] = response.json()["results"]
+        assert row["days"] == [
+            {"date": "2025-12-01", "day_type": "WORK", "planned_start": "10:00:00", "planned_end": "18:00:00",
+             "source": "exception"},
+            {"date": "2025-12-02", "day_type": "WORK", "planned_start": "08:00:00", "planned_end": "16:00:00",
+             "source": "pattern"},
+        ]
@@ -0,0 +1,104 @@
+import io
+from dataclasses import replace
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Device, Employee
+from time_tracking.models import DailyAttendance, TimeEvent, WorkSchedule
+from time_tracking.services.daily_attendance import refresh_daily_attendance
+from time_tracking.services.event_archive import archive_month, archived_months, month_start
+from time_tracking.services.event_buffer import event_buffer
+from time_tracking.services.report_service import build_attendance_report
+from time_tracking.services.synthetic_data import ANOMALY_TYPES, DataConfig, clear_data, generate_data
+
+
+@pytest.mark.django_db
+class TestSyntheticData:
+
+    @pytest.fixture(autouse=True)
+    def data_files(self, settings, tmp_path):
+        # clear_data usuwa segmenty archiwum i dziennik write-behind
+        settings.EVENT_ARCHIVE_DIR = tmp_path / "archive"
+        settings.EVENT_JOURNAL_PATH = tmp_path / "journal.jsonl"
+        event_buffer.reset()
+        yield tmp_path
+        event_buffer.reset()
+
+    @pytest.fixture
+    def config(self):
+        today = timezone.localdate()
+        return DataConfig(employees=10, date_from=today - timedelta(days=28), date_to=today - timedelta(days=1))
+
+    def _report(self, config, source):
+        return build_attendance_report(date_from=config.date_from, date_to=config.date_to, source=source)
+
+    def test_counts_match_database(self, config):
+        stats = generate_data(config)
+
+        assert stats["employees"] == Employee.objects.count() == 10
+        assert stats["events"] == TimeEvent.objects.count() > 0
+        assert stats["schedules"] == WorkSchedule.objects.count()
+        assert stats["summaries"] == DailyAttendance.objects.count()
+
+    def test_all_anomaly_types_are_generated(self, config):
+        config = replace(config, anomaly_rate=1.0, absence_rate=0.0)
+        generate_data(config)
+
+        found = {
+            anomaly["type"]
+            for employee in self._report(config, "events")["employees"]
+            for day in employee["days"]
+            for anomaly in day["anomalies"]
+        }
+        assert set(ANOMALY_TYPES) <= found
+
+    def test_summaries_match_refresh(self, config):
+        generate_data(config)
+        generated = self._report(config, "summary")
+
+        refresh_daily_attendance(DailyAttendance.objects.values_list("employee_id", "date"))
+
+        assert self._report(config, "summary") == generated == self._report(config, "events")
+
+    def test_same_seed_same_data(self, config):
+        first = generate_data(config)
+        events = list(TimeEvent.objects.order_by("id").values_list("event_type", "timestamp", "sequence"))
+
+        clear_data()
+        second = generate_data(config)
+
+        assert {**first, "seconds": 0} == {**second, "seconds": 0}
+        assert list(TimeEvent.objects.order_by("id").values_list("event_type", "timestamp", "sequence")) == events
+
+    def test_command_clears_existing_data(self):
+        out = io.StringIO()
+        call_command("generate_data", "--employees", "2", "--days", "3", stdout=out)
+        call_command("generate_data", "--clear", "--employees", "3", "--days", "3", stdout=out)
+
+        assert Employee.objects.count() == 3
+        assert "Created 3 employees" in out.getvalue()
+
+    def test_command_runs_again_without_clear(self):
+        out = io.StringIO()
+        call_command("generate_data", "--employees", "2", "--days", "3", stdout=out)
+        call_command("generate_data", "--employees", "2", "--days", "3", stdout=out)
+
+        assert Employee.objects.count() == 4
+        assert Employee.objects.values("qr_token").distinct().count() == 4
+        assert Device.objects.count() == 5
+
+    def test_clear_removes_archive_and_journal(self, config, data_files):
+        generate_data(config)
+        archive_month(month_start(config.date_from))
+        journal = data_files / "journal.jsonl"
+        journal.write_text('{"employee_id": 1}\n', encoding="utf-8")
+
+        clear_data()
+        generate_data(config)
+
+        assert archived_months() == []
+        assert journal.read_text(encoding="utf-8") == ""
+        assert self._report(config, "events") == self._report(config, "summary")
@@ -1,23 +1,73 @@
+import asyncio
+import json
 from datetime import timedelta
 
-from django.http import Http404
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import render
+from django.template.response import TemplateResponse
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 
 from core.models import Employee
 from time_tracking.services.live_dashboard import get_live_dashboard
+from time_tracking.services.live_feed import live_feed
+from time_tracking.services.query_budget import with_query_budget
 from time_tracking.services.report_service import build_attendance_report
 
 
+def _is_asgi(request):
+    return isinstance(request, ASGIRequest)
+
+
+@with_query_budget(queries=4)
 def live_panel_view(request):
     rows = get_live_dashboard()
-    return render(request, "admin_panel/live.html", {
-        "rows": rows
+    # TemplateResponse: renderowanie po widoku, osobno w nagłówku Server-Timing
+    return TemplateResponse(request, "admin_panel/live.html", {
+        "rows": rows,
+        # SSE tylko pod ASGI – pod WSGI (runserver, gunicorn) strumień zająłby wątek workera na stałe
+        "live_updates": _is_asgi(request),
     })
 
 
+async def _live_events(feed):
+    sub = feed.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                rows = await asyncio.wait_for(sub.queue.get(), timeout=feed.poll_seconds)
+            except asyncio.TimeoutError:
+                # zmiany z innych procesów + keep-alive dla proxy
+                await sync_to_async(feed.poll)()
+                yield ": keep-alive\n\n"
+                continue
+
+            yield f"event: rows\ndata: {json.dumps(rows)}\n\n"
+    finally:
+        feed.unsubscribe(sub)
+
+
+async def live_stream_view(request):
+    """
+    Server-Sent Events dla panelu live – wymaga serwera ASGI (rekrutacja.asgi).
+    Wysyła tylko wiersze pracowników, których stan się zmienił.
+
+    Pod WSGI nieskończony strumień blokowałby wątek workera – 204, na które EventSource
+    nie próbuje się ponownie łączyć.
+    """
+    if not _is_asgi(request):
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(_live_events(live_feed), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def employee_report_view(request):
     employee_id = request.GET.get("employee")
     if not employee_id:
@@ -7,6 +7,7 @@ from time_tracking.web.tablet_views import (
 )
 from time_tracking.web.admin_views import (
     live_panel_view,
+    live_stream_view,
     employee_report_view,
     custom_report_view,
 )
@@ -20,6 +21,7 @@ urlpatterns = [
 
     # ADMIN PANEL – HTML
     path("admin-panel/live/", live_panel_view, name="admin-live-panel"),
+    path("admin-panel/live/stream/", live_stream_view, name="admin-live-stream"),
     path("admin-panel/reports/", employee_report_view, name="employee-report"),
     path("admin-panel/reports/custom/", custom_report_view, name="custom-report"),
 ]